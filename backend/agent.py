@@ -8,8 +8,9 @@ from livekit.agents import (
     cli,
     function_tool
 )
-from livekit.plugins import openai, silero
+from livekit.plugins import silero
 from assistant_functions import AssistantFnc
+from model_providers import get_voice_plugins
 from prompts import WELCOME_MESSAGE, INSTRUCTIONS
 import os
 import asyncio
@@ -20,9 +21,8 @@ LIVEKIT_URL = os.environ.get("LIVEKIT_URL", "wss://launch-65q9o9la.livekit.cloud
 LIVEKIT_API_KEY = os.environ.get("LIVEKIT_API_KEY", "APIBAfXa36Hgo2j")
 LIVEKIT_API_SECRET = os.environ.get("LIVEKIT_API_SECRET", "hLSaGpDgyKProcV263Ddvl3ceWemIXa0qKI91sAiAgL")
 
-# OpenAI configuration
-if "OPENAI_API_KEY" not in os.environ:
-    raise ValueError("Please set the OPENAI_API_KEY environment variable")
+# Speech and LLM plugins come from model_providers.get_voice_plugins(), which checks
+# MODEL_PROVIDER and the OpenAI key when a session starts
 
 class SocialWorkerAssistant(Agent):
     def __init__(self, assistant_fnc: AssistantFnc) -> None:
@@ -81,37 +81,35 @@ class SocialWorkerAssistant(Agent):
 
 async def entrypoint(ctx: JobContext):
     try:
-    print("Connecting to room...")
-    await ctx.connect()
-    print("Connected to room successfully")
-    
-    assistant_fnc = AssistantFnc()
-    agent = SocialWorkerAssistant(assistant_fnc)
-    print("Created agent instance")
-    
+        print("Connecting to room...")
+        await ctx.connect()
+        print("Connected to room successfully")
+
+        assistant_fnc = AssistantFnc()
+        agent = SocialWorkerAssistant(assistant_fnc)
+        print("Created agent instance")
+
         # Initialize the session with proper configuration
-    session = AgentSession(
-        vad=silero.VAD.load(),
-        stt=openai.STT(model="whisper-1"),
-            llm=openai.LLM(model="gpt-4o"),
-            tts=openai.TTS(voice="shimmer", model="tts-1"),
-    )
-    print("Created agent session")
+        session = AgentSession(
+            vad=silero.VAD.load(),
+            **get_voice_plugins(),
+        )
+        print("Created agent session")
 
-    print("Starting session...")
-    await session.start(
-        agent=agent,
+        print("Starting session...")
+        await session.start(
+            agent=agent,
             room=ctx.room
-    )
-    print("Session started successfully")
-    
+        )
+        print("Session started successfully")
+
         # Wait a moment for the session to fully initialize
         await asyncio.sleep(1)
-        
+
         print("Saying welcome message...")
         await session.say(WELCOME_MESSAGE, allow_interruptions=True)
-    print("Welcome message sent")
-        
+        print("Welcome message sent")
+
     except Exception as e:
         print(f"Error in entrypoint: {e}")
         raise
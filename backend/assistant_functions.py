@@ -1,24 +1,29 @@
+import asyncio
 import json
 import os
 import logging
-from openai import OpenAI
+from client_store import get_client_store
+from llm_gateway import get_gateway
 
 logger = logging.getLogger(__name__)
 
 class AssistantFnc:
-    def __init__(self):
+    def __init__(self, gateway=None):
+        # Model calls share the process-wide LLM gateway unless one is injected
+        self.gateway = gateway
         self.conversation_history = []
         self.current_client = None
-        self.openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
     async def lookup_client(self, client_id: str) -> dict:
         """Look up a client by their ID number."""
-        clients_data = self.load_clients()
-        for client in clients_data.get('clients', []):
-            if str(client.get('id', '')) == client_id:
-                self.current_client = client
-                return client
-        return {"error": "Client not found"}
+        try:
+            client = await asyncio.to_thread(get_client_store().get_client, int(client_id))
+        except ValueError:
+            client = None
+        if client is None:
+            return {"error": "Client not found"}
+        self.current_client = client
+        return client
 
     async def get_case_history(self) -> dict:
         """Get the case history for the current client."""
@@ -34,21 +39,9 @@ class AssistantFnc:
         return self.load_resources()
     
     async def translate_text(self, text: str, target_language: str) -> dict:
-        """Translate text to the specified language using OpenAI."""
+        """Translate text to the specified language through the LLM gateway."""
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": f"You are a professional translator. Translate the following text to {target_language}. Maintain the original meaning and tone. Only return the translated text, nothing else."
-                    },
-                    {"role": "user", "content": text}
-                ],
-                temperature=0.3
-            )
-            
-            translated_text = response.choices[0].message.content.strip()
+            translated_text = await (self.gateway or get_gateway()).translate(text, target_language)
             return {
                 "original": text,
                 "translated": translated_text,
@@ -90,7 +83,7 @@ class AssistantFnc:
                 "4. Track client progress and resource assignments"
             ],
             "total_resources": len(self.load_resources().get('resources', [])),
-            "total_clients": len(self.load_clients().get('clients', []))
+            "total_clients": await asyncio.to_thread(get_client_store().count_clients)
         }
     
     async def search_resources_by_category(self, category: str) -> dict:
@@ -109,8 +102,7 @@ class AssistantFnc:
     
     async def get_client_statistics(self) -> dict:
         """Get statistics about clients in the system."""
-        clients_data = self.load_clients()
-        clients = clients_data.get('clients', [])
+        clients = await asyncio.to_thread(get_client_store().list_clients)
         
         stats = {
             "total_clients": len(clients),
@@ -132,17 +124,6 @@ class AssistantFnc:
         
         return stats
 
-    def load_clients(self):
-        """Load clients from JSON file."""
-        try:
-            if os.path.exists('clients.json'):
-                with open('clients.json', 'r') as f:
-                    return json.load(f)
-            return {'clients': []}
-        except Exception as e:
-            logger.error(f"Error loading clients: {e}")
-            return {'clients': []}
-
     def load_resources(self):
         """Load resources from JSON file."""
         try:
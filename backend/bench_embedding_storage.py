@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Memory / latency / recall trade-off of reduced-dimension and quantized embedding storage.
+
+Every combination of output width (EMBEDDING_DIMENSIONS) and storage format
+(VECTOR_QUANTIZATION, with and without rescoring) is built as a NumpyVectorStore over
+the resource catalog and queried with every client in clients.json for every category.
+recall@5 is measured against exact float32 search at full width with the same filter.
+
+With recorded embeddings, shorter widths are derived from the full-width vectors by
+truncating and re-normalizing, which is how text-embedding-3 shortens vectors, so one
+set of embeddings covers every width. The hashed stub is embedded natively at each
+width instead, since its buckets do not survive truncation. Rescoring reads full-precision vectors from an
+on-disk embedding cache, as the matcher does, so its cost is in the latency numbers.
+
+Runs offline by default with the local provider's hashed embeddings; with
+--embeddings recorded, real vectors come from the matcher's embedding cache (only
+texts never seen before need an OpenAI API key). For end-to-end recall against the
+labeled set, run bench_matcher.py with EMBEDDING_DIMENSIONS / VECTOR_QUANTIZATION set.
+
+Usage:
+    python bench_embedding_storage.py [--embeddings stub|recorded] [--repeats 10] [--output report.json]
+"""
+import argparse
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_core.embeddings import Embeddings
+
+from bench_vector_store import percentile
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+CLIENTS_FILE = SCRIPT_DIR / 'clients.json'
+CATEGORIES = ['housing', 'food', 'transportation']
+FULL_DIMENSIONS = 3072
+DIMENSIONS = [3072, 1024, 512, 256]
+# (quantization, rescore_oversample)
+STORAGE = [('none', 0), ('float16', 0), ('float16', 4), ('int8', 0), ('int8', 4)]
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """Serves vectors resolved before timing starts, truncated to the given width and re-normalized."""
+
+    def __init__(self, vectors, dimensions):
+        self.vectors = vectors
+        self.dimensions = dimensions
+
+    def _shorten(self, text):
+        vector = np.asarray(self.vectors[text][:self.dimensions], dtype=np.float32)
+        return (vector / (np.linalg.norm(vector) or 1.0)).tolist()
+
+    def embed_documents(self, texts):
+        return [self._shorten(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._shorten(text)
+
+
+def load_catalog_and_queries(matcher_module):
+    """Chunks the catalog the way the matcher does and builds one question per client and category."""
+    with open(matcher_module.RESOURCES_FILE) as f:
+        resources = json.load(f)
+    documents, ids = [], []
+    for resource in resources:
+        docs, chunk_ids = matcher_module.split_resource(resource)
+        documents.extend(docs)
+        ids.extend(chunk_ids)
+
+    with open(CLIENTS_FILE) as f:
+        clients = json.load(f).get('clients', [])
+    question_builder = matcher_module.RAGResourceMatcher.__new__(matcher_module.RAGResourceMatcher)
+    queries = [
+        (question_builder._build_client_question(client, category), category)
+        for client in clients for category in CATEGORIES
+    ]
+    return documents, ids, queries
+
+
+def resolve_vectors(matcher_module, args, texts):
+    """Vectors for every text at every width: {dimensions: {text: vector}}."""
+    if args.embeddings == 'stub':
+        from model_providers import HashingEmbeddings
+        return {
+            dimensions: dict(zip(texts, HashingEmbeddings(dimensions=dimensions).embed_documents(texts)))
+            for dimensions in DIMENSIONS
+        }
+    from langchain_openai import OpenAIEmbeddings
+    from model_providers import EMBEDDING_MODEL
+    cached = matcher_module.build_cached_embeddings(OpenAIEmbeddings(model=EMBEDDING_MODEL))
+    full = dict(zip(texts, cached.embed_documents(texts)))
+    return {dimensions: full for dimensions in DIMENSIONS}
+
+
+def result_ids(results):
+    return [doc.metadata.get('chunk_id') for doc in results]
+
+
+def run_config(documents, ids, queries, vectors, dimensions, quantization, oversample, truth, repeats, cache_dir):
+    """Builds one store configuration and measures its vector memory, query latency and recall@5."""
+    from vector_store import NumpyVectorStore
+
+    precomputed = PrecomputedEmbeddings(vectors, dimensions)
+    # Rescoring re-reads full-precision document vectors through a disk cache, like the matcher
+    store_embeddings = CacheBackedEmbeddings.from_bytes_store(
+        precomputed, LocalFileStore(str(cache_dir)), namespace=f"bench-{dimensions}"
+    )
+    store = NumpyVectorStore.from_documents(
+        documents, store_embeddings, ids=ids, quantization=quantization, rescore_oversample=oversample
+    )
+    query_vectors = [precomputed.embed_query(question) for question, _ in queries]
+
+    latencies, recalls = [], []
+    for repeat in range(repeats):
+        for (question, category), query_vector, expected in zip(queries, query_vectors, truth):
+            start = time.perf_counter()
+            results = store.similarity_search_by_vector(query_vector, k=5, filter={'category': category})
+            latencies.append((time.perf_counter() - start) * 1000)
+            if repeat == 0:
+                found = set(result_ids(results)).intersection(expected)
+                recalls.append(len(found) / max(1, min(5, len(expected))))
+
+    return {
+        'dimensions': dimensions,
+        'quantization': quantization,
+        'rescore_oversample': oversample,
+        'vector_kb': round(store.nbytes / 1024, 1),
+        'query_ms_p50': round(percentile(latencies, 50), 3),
+        'query_ms_p95': round(percentile(latencies, 95), 3),
+        'recall_at_5': round(sum(recalls) / len(recalls), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--embeddings', choices=['stub', 'recorded'], default='stub',
+                        help='stub: offline hashed embeddings; recorded: real model via the on-disk cache')
+    parser.add_argument('--repeats', type=int, default=10, help='Passes over the query set per configuration')
+    parser.add_argument('--output', help='Write the JSON report to this path')
+    args = parser.parse_args()
+
+    import rag_resource_matcher as matcher_module
+
+    documents, ids, queries = load_catalog_and_queries(matcher_module)
+    for doc, chunk_id in zip(documents, ids):
+        doc.metadata['chunk_id'] = chunk_id
+    vectors = resolve_vectors(matcher_module, args, [doc.page_content for doc in documents] + [q for q, _ in queries])
+
+    # Ground truth: exact float32 search at full width
+    from vector_store import NumpyVectorStore
+    exact = NumpyVectorStore.from_documents(documents, PrecomputedEmbeddings(vectors[FULL_DIMENSIONS], FULL_DIMENSIONS), ids=ids)
+    truth = [
+        result_ids(exact.similarity_search_by_vector(vectors[FULL_DIMENSIONS][question], k=5, filter={'category': category}))
+        for question, category in queries
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for dimensions in DIMENSIONS:
+            for quantization, oversample in STORAGE:
+                logging.info(f"Benchmarking {dimensions} dims, {quantization}, rescore x{oversample}...")
+                results.append(run_config(
+                    documents, ids, queries, vectors[dimensions], dimensions, quantization, oversample,
+                    truth, args.repeats, Path(cache_dir),
+                ))
+
+    columns = ['dimensions', 'quantization', 'rescore_oversample', 'vector_kb', 'query_ms_p50', 'query_ms_p95', 'recall_at_5']
+    print(' | '.join(f"{c:>18}" for c in columns))
+    for result in results:
+        print(' | '.join(f"{result[c]:>18}" for c in columns))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'embeddings': args.embeddings, 'chunks': len(documents), 'queries': len(queries),
+                       'results': results}, f, indent=2)
+        logging.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Retrieval quality and per-stage latency benchmark for the resource matcher.
+
+Queries are the seeded client profiles from seed_clients.py, scored against the
+hand-labeled relevant resources in benchmark_labels.json. For every query the
+matcher's pipeline is run stage by stage (question build, eligibility filter,
+embed, search, LLM) and timed; quality is reported as recall@5 and MRR.
+
+Runs offline by default with the local model provider's stand-ins: hashed word-feature
+embeddings and a templated LLM.
+With --embeddings recorded, the real embedding model is used through the on-disk
+embedding cache, so only texts never seen before need an OpenAI API key.
+
+The JSON report is written with sorted keys so reports from two commits diff cleanly;
+--baseline prints the change in headline metrics against an earlier report.
+
+Usage:
+    python bench_matcher.py [--embeddings stub|recorded] [--llm stub|openai]
+                            [--repeats 5] [--output report.json] [--baseline old.json]
+"""
+import argparse
+import json
+import logging
+import subprocess
+import time
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+from model_providers import EMBEDDING_DIMENSIONS, EMBEDDING_MODEL, HashingEmbeddings, LocalChatModel, embedding_model_name
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+LABELS_FILE = SCRIPT_DIR / 'benchmark_labels.json'
+STAGES = ['build_question', 'filter', 'embed', 'search', 'llm', 'total']
+RECALL_K = 5
+
+
+class RecordedEmbeddings(Embeddings):
+    """Real embeddings served through the on-disk embedding cache (documents and queries)."""
+
+    def __init__(self, matcher_module):
+        from langchain_openai import OpenAIEmbeddings
+        self.model = EMBEDDING_MODEL
+        self.dimensions = EMBEDDING_DIMENSIONS
+        self._cached = matcher_module.build_cached_embeddings(
+            OpenAIEmbeddings(model=self.model, dimensions=self.dimensions)
+        )
+
+    def embed_documents(self, texts):
+        return self._cached.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self._cached.embed_documents([text])[0]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def unique_resource_ids(documents):
+    """Resource ids in rank order, with repeated chunks of the same resource collapsed."""
+    seen = []
+    for doc in documents:
+        resource_id = str(doc.metadata.get('id'))
+        if resource_id not in seen:
+            seen.append(resource_id)
+    return seen
+
+
+def load_queries():
+    """Pairs each labeled query with a client built from its seeded profile."""
+    from seed_clients import PROFILES, create_detailed_client
+    profiles = {profile['name']: profile for profile in PROFILES}
+    with open(LABELS_FILE) as f:
+        labels = json.load(f)['queries']
+    queries = []
+    for label in labels:
+        client = create_detailed_client(profiles[label['profile']])
+        queries.append((label, client))
+    return queries
+
+
+def run_query(matcher, matcher_module, client, resource_type):
+    """Runs one match through the pipeline stage by stage. Returns (documents, timings in ms)."""
+    timings = {}
+
+    start = time.perf_counter()
+    question = matcher._build_client_question(client, resource_type)
+    timings['build_question'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    eligible_ids = matcher._eligible_ids(client)
+    search_filter = matcher._search_filter(resource_type, eligible_ids)
+    timings['filter'] = time.perf_counter() - start
+
+    # Measure a cold query embedding every time
+    matcher.query_cache.clear()
+    start = time.perf_counter()
+    query_vector = None if eligible_ids == [] else matcher._query_vector(question)
+    timings['embed'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    documents = []
+    if eligible_ids != []:
+        documents = matcher._fuse(
+            question,
+            matcher._vector_hits(query_vector, search_filter),
+            search_filter,
+            lexical=query_vector is None or matcher_module.RETRIEVAL_MODE == 'hybrid',
+        )
+    timings['search'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher._generate_llm_summary(question, documents, resource_type)
+    timings['llm'] = time.perf_counter() - start
+
+    timings['total'] = sum(timings.values())
+    return documents, {stage: seconds * 1000 for stage, seconds in timings.items()}
+
+
+def score(retrieved_ids, relevant_ids):
+    """recall@K (capped so a perfect top-K scores 1.0 even with more relevant items) and reciprocal rank."""
+    relevant = set(relevant_ids)
+    hits = len(relevant.intersection(retrieved_ids[:RECALL_K]))
+    recall = hits / min(RECALL_K, len(relevant)) if relevant else 0.0
+    reciprocal_rank = next(
+        (1.0 / rank for rank, resource_id in enumerate(retrieved_ids, start=1) if resource_id in relevant), 0.0
+    )
+    return recall, reciprocal_rank
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmark(args):
+    import rag_resource_matcher as matcher_module
+
+    embeddings = HashingEmbeddings(EMBEDDING_DIMENSIONS or 512) if args.embeddings == 'stub' else RecordedEmbeddings(matcher_module)
+    llm = LocalChatModel() if args.llm == 'stub' else None
+
+    start = time.perf_counter()
+    matcher = matcher_module.RAGResourceMatcher(llm=llm, embeddings=embeddings)
+    build_seconds = time.perf_counter() - start
+
+    queries = load_queries()
+    latencies = {stage: [] for stage in STAGES}
+    per_query = []
+    for repeat in range(args.repeats):
+        for label, client in queries:
+            documents, timings = run_query(matcher, matcher_module, client, label['resource_type'])
+            for stage, ms in timings.items():
+                latencies[stage].append(ms)
+            if repeat == 0:
+                retrieved_ids = unique_resource_ids(documents)
+                recall, reciprocal_rank = score(retrieved_ids, label['relevant'])
+                per_query.append({
+                    'profile': label['profile'],
+                    'resource_type': label['resource_type'],
+                    'recall_at_5': round(recall, 4),
+                    'reciprocal_rank': round(reciprocal_rank, 4),
+                    'retrieved': retrieved_ids,
+                })
+
+    return {
+        'config': {
+            'commit': git_commit(),
+            'embeddings': embedding_model_name(embeddings),
+            'llm': args.llm,
+            'retrieval_mode': matcher_module.RETRIEVAL_MODE,
+            'vector_store_backend': matcher_module.VECTOR_STORE_BACKEND,
+            'vector_quantization': matcher_module.VECTOR_QUANTIZATION,
+            'resource_score_aggregation': matcher_module.RESOURCE_SCORE_AGGREGATION,
+            'mmr_lambda': matcher_module.MMR_LAMBDA,
+            'top_k': matcher_module.TOP_K,
+            'repeats': args.repeats,
+            'queries': len(queries),
+        },
+        'build_seconds': round(build_seconds, 3),
+        'quality': {
+            'recall_at_5': round(sum(q['recall_at_5'] for q in per_query) / len(per_query), 4),
+            'mrr': round(sum(q['reciprocal_rank'] for q in per_query) / len(per_query), 4),
+            'queries': per_query,
+        },
+        'latency_ms': {
+            stage: {
+                'p50': round(percentile(values, 50), 3),
+                'p95': round(percentile(values, 95), 3),
+                'p99': round(percentile(values, 99), 3),
+                'mean': round(sum(values) / len(values), 3),
+            }
+            for stage, values in latencies.items()
+        },
+    }
+
+
+def print_report(report, baseline=None):
+    def delta(current, previous):
+        return f" ({current - previous:+.4f})" if previous is not None else ""
+
+    quality = report['quality']
+    base_quality = baseline['quality'] if baseline else {}
+    print(f"recall@{RECALL_K}: {quality['recall_at_5']:.4f}{delta(quality['recall_at_5'], base_quality.get('recall_at_5'))}")
+    print(f"MRR:       {quality['mrr']:.4f}{delta(quality['mrr'], base_quality.get('mrr'))}")
+    print(f"{'stage':>16} | {'p50 ms':>10} | {'p95 ms':>10} | {'p99 ms':>10}")
+    for stage in STAGES:
+        row = report['latency_ms'][stage]
+        base_row = (baseline or {}).get('latency_ms', {}).get(stage, {})
+        cells = [
+            f"{row[p]:.3f}" + (f" ({row[p] - base_row[p]:+.3f})" if p in base_row else "")
+            for p in ('p50', 'p95', 'p99')
+        ]
+        print(f"{stage:>16} | " + " | ".join(f"{c:>10}" for c in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--embeddings', choices=['stub', 'recorded'], default='stub',
+                        help='stub: offline hashed embeddings; recorded: real model via the on-disk cache')
+    parser.add_argument('--llm', choices=['stub', 'openai'], default='stub', help='Model used for the summary stage')
+    parser.add_argument('--repeats', type=int, default=5, help='Passes over the labeled query set')
+    parser.add_argument('--output', help='Write the JSON report to this path')
+    parser.add_argument('--baseline', help='Earlier JSON report to compare against')
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        logging.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
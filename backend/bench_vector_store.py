@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vector store backends (Chroma vs NumPy) on the real resource catalog.
+
+Each backend runs in its own subprocess so import time and memory are measured in
+isolation. Document and query embeddings come from the on-disk embedding cache, so
+only the first run needs an OpenAI API key; query latency never includes network time.
+
+Usage:
+    python bench_vector_store.py [--repeats 20] [--output report.json]
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SCRIPT_DIR = Path(__file__).parent.absolute()
+CLIENTS_FILE = SCRIPT_DIR / 'clients.json'
+BACKENDS = ['chroma', 'numpy']
+CATEGORIES = ['housing', 'food', 'transportation']
+
+
+def current_rss_mb():
+    """Returns the current resident set size of this process in MB."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_backend(backend, repeats):
+    """Builds one backend over the catalog and times filtered top-k queries against it."""
+    os.environ['VECTOR_STORE_BACKEND'] = backend
+    import rag_resource_matcher as matcher_module
+
+    # Only the backend's own import is timed; the matcher module is common to both
+    rss_start = current_rss_mb()
+    start = time.perf_counter()
+    if backend == 'numpy':
+        import vector_store  # noqa: F401
+    else:
+        import langchain_chroma  # noqa: F401
+    import_seconds = time.perf_counter() - start
+    rss_after_import = current_rss_mb()
+
+    from langchain_core.embeddings import Embeddings
+    from langchain_openai import OpenAIEmbeddings
+    from model_providers import EMBEDDING_MODEL
+
+    with open(matcher_module.RESOURCES_FILE) as f:
+        resources = json.load(f)
+    documents, ids = [], []
+    for resource in resources:
+        docs, chunk_ids = matcher_module.split_resource(resource)
+        documents.extend(docs)
+        ids.extend(chunk_ids)
+
+    with open(CLIENTS_FILE) as f:
+        clients = json.load(f).get('clients', [])
+    question_builder = matcher_module.RAGResourceMatcher.__new__(matcher_module.RAGResourceMatcher)
+    queries = [
+        (question_builder._build_client_question(client, category), category)
+        for client in clients for category in CATEGORIES
+    ]
+
+    # Resolve every vector up front (from the disk cache) so timings exclude the API
+    cached = matcher_module.build_cached_embeddings(OpenAIEmbeddings(model=EMBEDDING_MODEL))
+    texts = [doc.page_content for doc in documents] + [q for q, _ in queries]
+    vectors = dict(zip(texts, cached.embed_documents(texts)))
+
+    class PrecomputedEmbeddings(Embeddings):
+        def embed_documents(self, texts):
+            return [vectors[t] for t in texts]
+
+        def embed_query(self, text):
+            return vectors[text]
+
+    rss_before_build = current_rss_mb()
+    start = time.perf_counter()
+    store = matcher_module.create_vector_store(documents, PrecomputedEmbeddings(), ids)
+    build_seconds = time.perf_counter() - start
+    rss_after_build = current_rss_mb()
+
+    latencies = []
+    for _ in range(repeats):
+        for question, category in queries:
+            query_vector = vectors[question]
+            start = time.perf_counter()
+            store.similarity_search_by_vector(query_vector, k=matcher_module.TOP_K, filter={'category': category})
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'backend': backend,
+        'chunks': len(documents),
+        'queries': len(latencies),
+        'import_seconds': round(import_seconds, 3),
+        'build_seconds': round(build_seconds, 3),
+        'query_ms_p50': round(percentile(latencies, 50), 3),
+        'query_ms_p95': round(percentile(latencies, 95), 3),
+        'query_ms_mean': round(sum(latencies) / len(latencies), 3),
+        'rss_mb_imports': round(rss_after_import - rss_start, 1),
+        'rss_mb_index': round(rss_after_build - rss_before_build, 1),
+        'rss_mb_total': round(rss_after_build, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=BACKENDS, help='Run a single backend in this process and print JSON')
+    parser.add_argument('--repeats', type=int, default=20, help='Passes over the query set per backend')
+    parser.add_argument('--output', help='Write the combined JSON report to this path')
+    args = parser.parse_args()
+
+    if args.backend:
+        print(json.dumps(run_backend(args.backend, args.repeats)))
+        return
+
+    results = []
+    for backend in BACKENDS:
+        logging.info(f"Benchmarking {backend} backend...")
+        proc = subprocess.run(
+            [sys.executable, __file__, '--backend', backend, '--repeats', str(args.repeats)],
+            cwd=SCRIPT_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            logging.error(f"{backend} benchmark failed:\n{proc.stderr}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    columns = ['backend', 'import_seconds', 'build_seconds', 'query_ms_p50', 'query_ms_p95',
+               'rss_mb_imports', 'rss_mb_index', 'rss_mb_total']
+    print(' | '.join(f"{c:>14}" for c in columns))
+    for result in results:
+        print(' | '.join(f"{result[c]:>14}" for c in columns))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import base64
+import binascii
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from client_store import PageKey
+
+# Fields of the default client list row: enough to show and pick a client, without
+# notes, intake sections or the assigned resources
+SUMMARY_FIELDS = (
+    'id', 'firstName', 'lastName', 'dateOfBirth', 'gender', 'phoneNumber', 'email',
+    'needs', 'is_veteran', 'createdAt', 'lastUpdated', 'resourceCount',
+)
+
+# Computed fields that can be projected like stored ones
+DERIVED_FIELDS = {
+    'resourceCount': lambda client: len(client.get('resources', [])),
+}
+
+# fields= value for whole client documents
+ALL_FIELDS = '*'
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(key: PageKey, order: str = 'recent') -> str:
+    """Opaque, URL-safe cursor for a page key in the given list order."""
+    return base64.urlsafe_b64encode(json.dumps([order, *key], separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, order: str = 'recent') -> PageKey:
+    """The page key of a cursor, which must come from a list in the same order."""
+    try:
+        cursor_order, sort_value, client_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(sort_value, str) or not isinstance(client_id, int):
+            raise ValueError(cursor)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if cursor_order != order:
+        raise InvalidCursorError(f"Cursor is for sort={cursor_order}, not sort={order}")
+    return sort_value, client_id
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Field paths from a fields= value; None means the whole document."""
+    if fields is None:
+        return SUMMARY_FIELDS
+    if fields.strip() == ALL_FIELDS:
+        return None
+    paths = tuple(path.strip() for path in fields.split(',') if path.strip())
+    # Rows are always addressable by id
+    return paths if 'id' in paths else ('id', *paths)
+
+
+def project_client(client: Dict[str, Any], paths: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """
+    The client reduced to the given paths. Dotted paths select nested fields
+    ('socialHistory.housingStatus') and keep their nesting; missing fields are left out.
+    """
+    if paths is None:
+        return client
+    row: Dict[str, Any] = {}
+    for path in paths:
+        if path in DERIVED_FIELDS:
+            row[path] = DERIVED_FIELDS[path](client)
+            continue
+        *parents, leaf = path.split('.')
+        source, target = client, row
+        for part in parents:
+            source = source.get(part) if isinstance(source, dict) else None
+            if not isinstance(source, dict):
+                break
+            target = target.setdefault(part, {})
+        else:
+            if leaf in source:
+                target[leaf] = source[leaf]
+    return row
@@ -0,0 +1,1149 @@
+import contextlib
+import copy
+import heapq
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: the journal directory is not locked
+    fcntl = None
+
+# --- Configuration ---
+SCRIPT_DIR = Path(__file__).parent.absolute()
+# Legacy caseload file; imported into the database once, on first start
+CLIENTS_FILE = SCRIPT_DIR / 'clients.json'
+CLIENT_DB_FILE = Path(os.environ.get("CLIENT_DB_FILE", SCRIPT_DIR / 'clients.db'))
+# 'sqlite' (CLIENT_DB_FILE), 'json' (clients.json, cached in memory between changes) or
+# 'journal' (append-only event log plus snapshots in CLIENT_JOURNAL_DIR)
+CLIENT_STORE_BACKEND = os.environ.get("CLIENT_STORE_BACKEND", "sqlite").lower()
+CLIENT_JOURNAL_DIR = Path(os.environ.get("CLIENT_JOURNAL_DIR", SCRIPT_DIR / 'client_journal'))
+# Journal backend: events appended between snapshots (a snapshot rewrites the whole caseload)
+JOURNAL_SNAPSHOT_EVERY = int(os.environ.get("JOURNAL_SNAPSHOT_EVERY", 1000))
+# JSON and journal backends, group commit: after the first queued change, wait up to this long for more
+# before writing them out together, and write at most this many changes per flush
+GROUP_COMMIT_DELAY_MS = float(os.environ.get("GROUP_COMMIT_DELAY_MS", 2))
+GROUP_COMMIT_MAX_BATCH = int(os.environ.get("GROUP_COMMIT_MAX_BATCH", 256))
+# --- End Configuration ---
+
+
+class ClientNotFoundError(LookupError):
+    pass
+
+
+class ResourceNotFoundError(LookupError):
+    pass
+
+
+class StoreLockedError(RuntimeError):
+    """The store's files are in use by another process."""
+
+
+class Commit(NamedTuple):
+    """Outcome of a mutation."""
+    value: Any
+    # Store version whose durable write includes the change; None when nothing was written
+    version: Optional[int]
+
+
+class ClientFilter(NamedTuple):
+    """Filters for ClientStore.page_clients(); an empty field does not filter."""
+    # Any of these terms is one of the client's needs (see _client_needs)
+    needs: Tuple[str, ...] = ()
+    veteran: Optional[bool] = None
+    # Any assigned resource has one of these statuses
+    resource_statuses: Tuple[str, ...] = ()
+    # Case-insensitive part of the client's name, phone number or email
+    search: str = ''
+    # Flagged for violence or not safe at home (see _is_urgent)
+    urgent: Optional[bool] = None
+
+
+# Client list orders: most recently updated first, or by last then first name
+CLIENT_ORDERS = ('recent', 'name')
+
+# Position in the client list: the sort value (lastUpdated, or the name key) and id
+# of the last client on the previous page
+PageKey = Tuple[str, int]
+
+
+class ClientStore:
+    """
+    Caseload storage. Clients and their assigned resources go in and come out in
+    the same JSON shapes the API has always used: a client dict carrying its
+    'resources' list (once it has any) and 'lastUpdated'.
+    """
+
+    def list_clients(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def get_client(self, client_id: int) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def get_clients(self, client_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """The clients with the given ids, by id; ids with no client are left out."""
+        raise NotImplementedError
+
+    def count_clients(self, filters: ClientFilter = ClientFilter()) -> int:
+        """The number of clients matching filters."""
+        raise NotImplementedError
+
+    def page_clients(self, limit: int, after: Optional[PageKey] = None,
+                     filters: ClientFilter = ClientFilter(),
+                     order: str = 'recent') -> Tuple[List[Dict[str, Any]], Optional[PageKey]]:
+        """
+        Up to limit clients matching filters, starting after the given key. 'recent'
+        order is most recently updated first (ties by descending id); 'name' is by last
+        then first name (ties by ascending id). Returns the page and the key to continue
+        from, or None when there are no more matching clients.
+        """
+        raise NotImplementedError
+
+    # Mutations return once the change is durable, as a Commit carrying its version
+
+    def add_client(self, client: Dict[str, Any]) -> Commit:
+        """Stores a new client under the next unused id; the value is the client with that id."""
+        raise NotImplementedError
+
+    def delete_client(self, client_id: int) -> Commit:
+        """Removes a client; the value is the removed client, or None if there was no such client."""
+        raise NotImplementedError
+
+    def add_resource(self, client_id: int, entry: Dict[str, Any]) -> Commit:
+        """
+        Assigns a resource to a client; the value is the resource. An already assigned
+        resource is returned unchanged, with version None.
+        """
+        raise NotImplementedError
+
+    def update_resource_status(self, client_id: int, resource_id: str, status: str, notes: Optional[str] = None) -> Commit:
+        """Sets the status (and notes, if given) of an assigned resource; the value is the resource."""
+        raise NotImplementedError
+
+    def recent_resource_updates(self, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        """The most recently updated resource assignments across all clients, and their total count."""
+        raise NotImplementedError
+
+    def status_history(self, client_id: int, resource_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Status transitions of an assigned resource, oldest first, each {'status', 'at'}
+        plus 'notes' when given; None if this backend keeps no history. Raises
+        ClientNotFoundError / ResourceNotFoundError for an unknown client or resource.
+        """
+        return None
+
+    def reset(self, clients: List[Dict[str, Any]], next_id: int) -> Commit:
+        """Replaces the whole caseload, keeping each client's id (seeding and imports)."""
+        raise NotImplementedError
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+
+def _client_needs(client: Dict[str, Any]) -> List[str]:
+    """
+    The client's needs, normalized to lowercase alphanumerics: its 'needs' entries plus
+    the presenting concerns flagged on intake, so 'housing' finds both "housing
+    assistance" and presentingConcerns.housingInstability.
+    """
+    needs = [_normalize(need) for need in client.get('needs') or [] if isinstance(need, str)]
+    concerns = client.get('presentingConcerns')
+    if isinstance(concerns, dict):
+        needs.extend(_normalize(key) for key, flagged in concerns.items() if flagged is True and key != 'other')
+    return needs
+
+
+def _client_name_key(client: Dict[str, Any]) -> str:
+    return f"{client.get('lastName') or ''} {client.get('firstName') or ''}".strip().lower()
+
+
+def _client_search_text(client: Dict[str, Any]) -> str:
+    """What the search filter looks in: name, phone number and email, lowercased."""
+    name = f"{client.get('firstName') or ''} {client.get('lastName') or ''}".strip()
+    return "\n".join(str(value).lower() for value in (name, client.get('phoneNumber'), client.get('email')) if value)
+
+
+def _is_urgent(client: Dict[str, Any]) -> bool:
+    """Domestic violence flagged on intake, experiencing violence, or not safe at home."""
+    concerns = client.get('presentingConcerns')
+    risk = client.get('riskAndSafety')
+    concerns = concerns if isinstance(concerns, dict) else {}
+    risk = risk if isinstance(risk, dict) else {}
+    return bool(concerns.get('domesticViolence') or risk.get('experiencingViolence') or not risk.get('safeInCurrentEnvironment'))
+
+
+def _client_columns(client: Dict[str, Any]) -> Tuple[str, str, str, bool, bool]:
+    """The SQLite backend's derived clients columns (CLIENT_COLUMNS) for a client."""
+    return (
+        _client_name_key(client),
+        _client_search_text(client),
+        "|".join(_client_needs(client)),
+        bool(client.get('is_veteran')),
+        _is_urgent(client),
+    )
+
+
+def _client_sort_key(client: Dict[str, Any], order: str = 'recent') -> PageKey:
+    if order == 'name':
+        return _client_name_key(client), client['id']
+    return client.get('lastUpdated') or '', client['id']
+
+
+def _check_order(order: str) -> None:
+    if order not in CLIENT_ORDERS:
+        raise ValueError(f"order must be one of {', '.join(CLIENT_ORDERS)}, got '{order}'")
+
+
+def _matches(client: Dict[str, Any], filters: ClientFilter) -> bool:
+    if filters.veteran is not None and bool(client.get('is_veteran')) != filters.veteran:
+        return False
+    if filters.urgent is not None and _is_urgent(client) != filters.urgent:
+        return False
+    if filters.search and filters.search.lower() not in _client_search_text(client):
+        return False
+    if filters.needs:
+        needs = _client_needs(client)
+        if not any(_normalize(term) in need for term in filters.needs for need in needs):
+            return False
+    if filters.resource_statuses:
+        statuses = {resource.get('status', 'pending') for resource in client.get('resources', [])}
+        if statuses.isdisjoint(filters.resource_statuses):
+            return False
+    return True
+
+
+def _resource_update_row(client: Dict[str, Any], resource: Dict[str, Any]) -> Dict[str, Any]:
+    """One row of the dashboard's resource status feed."""
+    return {
+        'client_id': client['id'],
+        'client_name': f"{client.get('firstName', '')} {client.get('lastName', '')}",
+        'resource_name': resource.get('resource_name', ''),
+        'organization': resource.get('organization', ''),
+        'status': resource.get('status', 'pending'),
+        'added_date': resource.get('added_date', ''),
+        'last_updated': resource.get('last_updated', ''),
+        'category': resource.get('category', 'housing'),
+    }
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    -- The client document without id, resources and lastUpdated, which live in columns/rows
+    data TEXT NOT NULL,
+    -- '' when the client has no lastUpdated, so the column orders and compares without NULLs
+    last_updated TEXT NOT NULL DEFAULT '',
+    -- Derived from data on every write (see _client_columns) so listing filters and the
+    -- name order read plain columns instead of parsing each row's JSON
+    name_key TEXT NOT NULL DEFAULT '',
+    search_text TEXT NOT NULL DEFAULT '',
+    needs TEXT NOT NULL DEFAULT '',
+    is_veteran INTEGER NOT NULL DEFAULT 0,
+    urgent INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS client_resources (
+    client_id INTEGER NOT NULL REFERENCES clients (id) ON DELETE CASCADE,
+    resource_id TEXT,
+    data TEXT NOT NULL,
+    status TEXT,
+    last_updated TEXT,
+    PRIMARY KEY (client_id, resource_id)
+);
+CREATE INDEX IF NOT EXISTS client_resources_last_updated ON client_resources (last_updated);
+CREATE TABLE IF NOT EXISTS resource_status_history (
+    client_id INTEGER NOT NULL REFERENCES clients (id) ON DELETE CASCADE,
+    resource_id TEXT,
+    status TEXT,
+    notes TEXT,
+    at TEXT
+);
+CREATE INDEX IF NOT EXISTS resource_status_history_resource ON resource_status_history (client_id, resource_id);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Created once the clients table has its derived columns (see _upgrade_clients_table).
+# The rowid (id) ends every index, so each one also serves the (value, id) keyset order.
+CLIENT_INDEXES = """
+CREATE INDEX IF NOT EXISTS clients_last_updated ON clients (last_updated);
+CREATE INDEX IF NOT EXISTS clients_name_key ON clients (name_key);
+CREATE INDEX IF NOT EXISTS clients_veteran ON clients (is_veteran, last_updated);
+CREATE INDEX IF NOT EXISTS clients_urgent ON clients (urgent, last_updated);
+"""
+
+# Derived clients columns, in the order _client_columns() returns them
+CLIENT_COLUMNS = ('name_key', 'search_text', 'needs', 'is_veteran', 'urgent')
+CLIENT_COLUMN_TYPES = {
+    'name_key': "TEXT NOT NULL DEFAULT ''",
+    'search_text': "TEXT NOT NULL DEFAULT ''",
+    'needs': "TEXT NOT NULL DEFAULT ''",
+    'is_veteran': "INTEGER NOT NULL DEFAULT 0",
+    'urgent': "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+class SQLiteClientStore(ClientStore):
+    """
+    Clients in SQLite (WAL mode), looked up by primary key instead of scanning the
+    caseload. Each client is one JSON document row; each assigned resource is its own
+    row keyed by (client_id, resource_id), so a status change rewrites one small row
+    rather than the whole caseload. Ids are never reused after a delete. The listing's
+    filters and orders read columns derived from the document on every write, and
+    pages walk an index instead of sorting the table.
+
+    Connections are per thread; WAL lets readers proceed while a write commits, and
+    writers queue on the database lock for up to the 5s connection timeout.
+    """
+
+    def __init__(self, db_file: Path = CLIENT_DB_FILE, legacy_file: Optional[Path] = CLIENTS_FILE):
+        self.db_file = Path(db_file)
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+        self._upgrade_clients_table()
+        self._connection().executescript(CLIENT_INDEXES)
+        if legacy_file is not None:
+            self._migrate_from_json(Path(legacy_file))
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; _transaction() opens explicit transactions
+            conn = sqlite3.connect(self.db_file, timeout=5.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # NORMAL is durable across application crashes in WAL mode and avoids an fsync per commit
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        # IMMEDIATE takes the write lock up front, so read-then-write cannot deadlock
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _upgrade_clients_table(self) -> None:
+        """
+        Brings a database created before the derived columns existed up to date: adds
+        and fills the columns, and replaces NULL last_updated values with ''.
+        """
+        with self._transaction() as conn:
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(clients)")}
+            missing = [column for column in CLIENT_COLUMNS if column not in existing]
+            for column in missing:
+                conn.execute(f"ALTER TABLE clients ADD COLUMN {column} {CLIENT_COLUMN_TYPES[column]}")
+            if missing:
+                rows = conn.execute("SELECT id, data FROM clients").fetchall()
+                assignments = ", ".join(f"{column} = ?" for column in CLIENT_COLUMNS)
+                conn.executemany(
+                    f"UPDATE clients SET {assignments} WHERE id = ?",
+                    [(*_client_columns(json.loads(row['data'])), row['id']) for row in rows],
+                )
+                logging.info(f"Added listing columns to {len(rows)} clients in {self.db_file}")
+            conn.execute("UPDATE clients SET last_updated = '' WHERE last_updated IS NULL")
+
+    def _migrate_from_json(self, legacy_file: Path) -> None:
+        """Imports clients.json once; later starts (even with an emptied database) skip it."""
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM store_meta WHERE key = 'migrated_from'").fetchone():
+                return
+            imported = 0
+            if legacy_file.exists():
+                with open(legacy_file, 'r') as f:
+                    legacy = json.load(f)
+                self._replace_all(conn, legacy.get('clients', []), legacy.get('next_id', 1))
+                imported = len(legacy.get('clients', []))
+            conn.execute("INSERT INTO store_meta (key, value) VALUES ('migrated_from', ?)", (str(legacy_file),))
+        if imported:
+            logging.info(f"Imported {imported} clients from {legacy_file} into {self.db_file}")
+
+    def _bump_version(self, conn: sqlite3.Connection) -> int:
+        """Advances the store version inside the current write transaction."""
+        conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0)")
+        conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'version'")
+        return int(conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()[0])
+
+    def _replace_all(self, conn: sqlite3.Connection, clients: List[Dict[str, Any]], next_id: int) -> None:
+        conn.execute("DELETE FROM resource_status_history")
+        conn.execute("DELETE FROM client_resources")
+        conn.execute("DELETE FROM clients")
+        for client in clients:
+            self._insert_client(conn, client, client_id=client['id'])
+        # Keep handing out ids from next_id, as clients.json did
+        seq = max(next_id - 1, max((client['id'] for client in clients), default=0))
+        if conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'clients'", (seq,)).rowcount == 0:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('clients', ?)", (seq,))
+
+    def _insert_client(self, conn: sqlite3.Connection, client: Dict[str, Any], client_id: Optional[int] = None) -> int:
+        document = {k: v for k, v in client.items() if k not in ('id', 'resources', 'lastUpdated')}
+        cursor = conn.execute(
+            f"INSERT INTO clients (id, data, last_updated, {', '.join(CLIENT_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (client_id, json.dumps(document), client.get('lastUpdated') or '', *_client_columns(document)),
+        )
+        for resource in client.get('resources', []):
+            self._insert_resource(conn, cursor.lastrowid, resource)
+        return cursor.lastrowid
+
+    def _insert_resource(self, conn: sqlite3.Connection, client_id: int, resource: Dict[str, Any]) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO client_resources (client_id, resource_id, data, status, last_updated) VALUES (?, ?, ?, ?, ?)",
+            (client_id, resource.get('resource_id'), json.dumps(resource), resource.get('status'), resource.get('last_updated')),
+        )
+        self._insert_status(conn, client_id, resource.get('resource_id'), resource.get('status', 'pending'),
+                            resource.get('last_updated') or resource.get('added_date'))
+
+    def _insert_status(self, conn: sqlite3.Connection, client_id: int, resource_id: Any, status: str,
+                       at: Optional[str], notes: Optional[str] = None) -> None:
+        conn.execute(
+            "INSERT INTO resource_status_history (client_id, resource_id, status, notes, at) VALUES (?, ?, ?, ?, ?)",
+            (client_id, resource_id, status, notes or None, at),
+        )
+
+    def _client_from_row(self, row: sqlite3.Row, resources: List[Dict[str, Any]]) -> Dict[str, Any]:
+        client = {'id': row['id'], **json.loads(row['data'])}
+        if resources:
+            client['resources'] = resources
+        if row['last_updated']:
+            client['lastUpdated'] = row['last_updated']
+        return client
+
+    def _resources_by_client(self, conn: sqlite3.Connection, client_ids: Optional[List[int]] = None) -> Dict[int, List[Dict[str, Any]]]:
+        # rowid order is assignment order
+        if client_ids is None:
+            rows = conn.execute("SELECT client_id, data FROM client_resources ORDER BY rowid").fetchall()
+        else:
+            placeholders = ",".join("?" * len(client_ids))
+            rows = conn.execute(
+                f"SELECT client_id, data FROM client_resources WHERE client_id IN ({placeholders}) ORDER BY rowid",
+                client_ids,
+            ).fetchall()
+        resources: Dict[int, List[Dict[str, Any]]] = {}
+        for row in rows:
+            resources.setdefault(row['client_id'], []).append(json.loads(row['data']))
+        return resources
+
+    def list_clients(self) -> List[Dict[str, Any]]:
+        conn = self._connection()
+        rows = conn.execute("SELECT id, data, last_updated FROM clients ORDER BY id").fetchall()
+        resources = self._resources_by_client(conn)
+        return [self._client_from_row(row, resources.get(row['id'], [])) for row in rows]
+
+    def get_client(self, client_id: int) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        row = conn.execute("SELECT id, data, last_updated FROM clients WHERE id = ?", (client_id,)).fetchone()
+        if row is None:
+            return None
+        return self._client_from_row(row, self._resources_by_client(conn, [client_id]).get(client_id, []))
+
+    def get_clients(self, client_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        client_ids = list(set(client_ids))
+        if not client_ids:
+            return {}
+        conn = self._connection()
+        placeholders = ",".join("?" * len(client_ids))
+        rows = conn.execute(f"SELECT id, data, last_updated FROM clients WHERE id IN ({placeholders})", client_ids).fetchall()
+        resources = self._resources_by_client(conn, [row['id'] for row in rows])
+        return {row['id']: self._client_from_row(row, resources.get(row['id'], [])) for row in rows}
+
+    def count_clients(self, filters: ClientFilter = ClientFilter()) -> int:
+        conditions, params = self._filter_conditions(filters)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._connection().execute(f"SELECT COUNT(*) FROM clients {where}", params).fetchone()[0]
+
+    def page_clients(self, limit: int, after: Optional[PageKey] = None,
+                     filters: ClientFilter = ClientFilter(),
+                     order: str = 'recent') -> Tuple[List[Dict[str, Any]], Optional[PageKey]]:
+        _check_order(order)
+        conn = self._connection()
+        conditions, params = self._filter_conditions(filters)
+        if order == 'name':
+            sort_value, direction, beyond = "name_key", "ASC", ">"
+        else:
+            sort_value, direction, beyond = "last_updated", "DESC", "<"
+        if after is not None:
+            conditions.append(f"({sort_value}, id) {beyond} (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # One extra row tells whether another page follows
+        rows = conn.execute(
+            f"SELECT id, data, last_updated FROM clients {where} ORDER BY {sort_value} {direction}, id {direction} LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        page = rows[:limit]
+        resources = self._resources_by_client(conn, [row['id'] for row in page]) if page else {}
+        clients = [self._client_from_row(row, resources.get(row['id'], [])) for row in page]
+        return clients, (_client_sort_key(clients[-1], order) if len(rows) > limit else None)
+
+    @staticmethod
+    def _filter_conditions(filters: ClientFilter) -> Tuple[List[str], List[Any]]:
+        """WHERE conditions on the clients table, and their parameters, for filters."""
+        conditions, params = [], []
+        if filters.veteran is not None:
+            conditions.append("is_veteran = ?")
+            params.append(filters.veteran)
+        if filters.needs:
+            # Substring matches, as in _matches(): 'housing' finds 'seniorhousing'
+            conditions.append("(" + " OR ".join("instr(needs, ?) > 0" for _ in filters.needs) + ")")
+            params.extend(_normalize(term) for term in filters.needs)
+        if filters.resource_statuses:
+            placeholders = ",".join("?" * len(filters.resource_statuses))
+            conditions.append(
+                "EXISTS (SELECT 1 FROM client_resources r WHERE r.client_id = clients.id "
+                f"AND COALESCE(r.status, 'pending') IN ({placeholders}))"
+            )
+            params.extend(filters.resource_statuses)
+        if filters.search:
+            conditions.append("instr(search_text, ?) > 0")
+            params.append(filters.search.lower())
+        if filters.urgent is not None:
+            conditions.append("urgent = ?")
+            params.append(filters.urgent)
+        return conditions, params
+
+    def add_client(self, client: Dict[str, Any]) -> Commit:
+        with self._transaction() as conn:
+            client_id = self._insert_client(conn, client)
+            version = self._bump_version(conn)
+        return Commit({**client, 'id': client_id}, version)
+
+    def delete_client(self, client_id: int) -> Commit:
+        with self._transaction() as conn:
+            client = self.get_client(client_id)
+            if client is None:
+                return Commit(None, None)
+            # Assigned resources go with it (ON DELETE CASCADE)
+            conn.execute("DELETE FROM clients WHERE id = ?", (client_id,))
+            version = self._bump_version(conn)
+        return Commit(client, version)
+
+    def add_resource(self, client_id: int, entry: Dict[str, Any]) -> Commit:
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM clients WHERE id = ?", (client_id,)).fetchone() is None:
+                raise ClientNotFoundError(client_id)
+            existing = conn.execute(
+                "SELECT data FROM client_resources WHERE client_id = ? AND resource_id IS ?",
+                (client_id, entry.get('resource_id')),
+            ).fetchone()
+            if existing is not None:
+                return Commit(json.loads(existing['data']), None)
+            self._insert_resource(conn, client_id, entry)
+            conn.execute("UPDATE clients SET last_updated = ? WHERE id = ?", (_now(), client_id))
+            version = self._bump_version(conn)
+        return Commit(entry, version)
+
+    def update_resource_status(self, client_id: int, resource_id: str, status: str, notes: Optional[str] = None) -> Commit:
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM clients WHERE id = ?", (client_id,)).fetchone() is None:
+                raise ClientNotFoundError(client_id)
+            row = conn.execute(
+                "SELECT data FROM client_resources WHERE client_id = ? AND resource_id = ?", (client_id, resource_id)
+            ).fetchone()
+            if row is None:
+                raise ResourceNotFoundError(resource_id)
+            resource = json.loads(row['data'])
+            now = _now()
+            resource['status'] = status
+            resource['last_updated'] = now
+            if notes:
+                resource['notes'] = notes
+            conn.execute(
+                "UPDATE client_resources SET data = ?, status = ?, last_updated = ? WHERE client_id = ? AND resource_id = ?",
+                (json.dumps(resource), status, now, client_id, resource_id),
+            )
+            conn.execute("UPDATE clients SET last_updated = ? WHERE id = ?", (now, client_id))
+            self._insert_status(conn, client_id, resource_id, status, now, notes)
+            version = self._bump_version(conn)
+        return Commit(resource, version)
+
+    def status_history(self, client_id: int, resource_id: str) -> Optional[List[Dict[str, Any]]]:
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM clients WHERE id = ?", (client_id,)).fetchone() is None:
+            raise ClientNotFoundError(client_id)
+        if conn.execute(
+            "SELECT 1 FROM client_resources WHERE client_id = ? AND resource_id = ?", (client_id, resource_id)
+        ).fetchone() is None:
+            raise ResourceNotFoundError(resource_id)
+        rows = conn.execute(
+            "SELECT status, notes, at FROM resource_status_history WHERE client_id = ? AND resource_id = ? ORDER BY rowid",
+            (client_id, resource_id),
+        ).fetchall()
+        history = []
+        for row in rows:
+            transition = {'status': row['status'], 'at': row['at']}
+            if row['notes']:
+                transition['notes'] = row['notes']
+            history.append(transition)
+        return history
+
+    def recent_resource_updates(self, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT r.data AS resource, c.id, c.data FROM client_resources r JOIN clients c ON c.id = r.client_id "
+            "ORDER BY COALESCE(r.last_updated, '') DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+        total = conn.execute("SELECT COUNT(*) FROM client_resources").fetchone()[0]
+        updates = [
+            _resource_update_row({'id': row['id'], **json.loads(row['data'])}, json.loads(row['resource']))
+            for row in rows
+        ]
+        return updates, total
+
+    def reset(self, clients: List[Dict[str, Any]], next_id: int) -> Commit:
+        with self._transaction() as conn:
+            self._replace_all(conn, clients, next_id)
+            version = self._bump_version(conn)
+        return Commit(None, version)
+
+
+def _atomic_write_json(path: Path, data: Dict[str, Any], indent: Optional[int] = 2) -> None:
+    """Writes data to path via a synced temp file and rename, so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    # Persist the rename itself (not supported on every platform)
+    with contextlib.suppress(OSError):
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class _InMemoryClientStore(ClientStore):
+    """
+    Caseload held in memory with an id index; reads never touch the disk beyond what
+    _refresh() needs, and return copies so the cache cannot be mutated from outside.
+
+    Every mutation is a typed event (client_added, client_deleted, resource_assigned,
+    status_changed, caseload_reset) applied by a single writer thread (group commit):
+    it takes every change queued within GROUP_COMMIT_DELAY_MS of the first, applies
+    them in order and hands the batch to _persist() once. Each event is serialized as it
+    is recorded, before later changes in the batch can modify the objects it refers to. Concurrent requests cannot
+    overwrite each other's changes, a burst costs one durable write, and each caller
+    gets back the version its change was written in. Subclasses decide how state is
+    loaded and how a batch is made durable.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._data: Dict[str, Any] = {'clients': [], 'next_id': 1, 'version': 0}
+        self._by_id: Dict[int, Dict[str, Any]] = {}
+        # (client_id, resource_id) -> status transitions; None when the backend keeps none
+        self._history: Optional[Dict[Tuple[int, Any], List[Dict[str, Any]]]] = None
+        self._queue: "queue.Queue[Tuple[Callable[[], Tuple[Optional[Dict[str, Any]], Any]], Future]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    # --- Backend hooks ---
+
+    def _refresh(self) -> None:
+        """Brings the in-memory caseload up to date with storage (called under the lock)."""
+        raise NotImplementedError
+
+    def _persist(self, records: List[str]) -> None:
+        """
+        Makes an applied batch durable, given its events as compact JSON lines;
+        self._data['version'] is already the batch's version.
+        """
+        raise NotImplementedError
+
+    def _invalidate(self) -> None:
+        """Drops the in-memory caseload after a failed write so the next access reloads it."""
+        raise NotImplementedError
+
+    # --- State ---
+
+    def _set_state(self, data: Dict[str, Any]) -> None:
+        data.setdefault('version', 0)
+        self._data = data
+        self._by_id = {client['id']: client for client in data['clients']}
+
+    def _client(self, client_id: int) -> Dict[str, Any]:
+        client = self._by_id.get(client_id)
+        if client is None:
+            raise ClientNotFoundError(client_id)
+        return client
+
+    def _resource(self, client_id: int, resource_id: Any) -> Dict[str, Any]:
+        client = self._client(client_id)
+        resource = next((r for r in client.get('resources', []) if r['resource_id'] == resource_id), None)
+        if resource is None:
+            raise ResourceNotFoundError(resource_id)
+        return resource
+
+    def _record_status(self, client_id: int, resource: Dict[str, Any], at: Optional[str], notes: Any = None) -> None:
+        if self._history is None:
+            return
+        transition = {'status': resource.get('status', 'pending'), 'at': at}
+        if notes:
+            transition['notes'] = notes
+        self._history.setdefault((client_id, resource.get('resource_id')), []).append(transition)
+
+    def _apply(self, event: Dict[str, Any]) -> Any:
+        """Applies one event to the in-memory caseload and returns the mutation's value."""
+        kind = event['type']
+        if kind == 'client_added':
+            client = event['client']
+            self._data['clients'].append(client)
+            self._by_id[client['id']] = client
+            self._data['next_id'] = max(self._data['next_id'], client['id'] + 1)
+            return client
+        if kind == 'client_deleted':
+            client = self._by_id.pop(event['client_id'])
+            self._data['clients'] = [c for c in self._data['clients'] if c['id'] != event['client_id']]
+            if self._history is not None:
+                for resource in client.get('resources', []):
+                    self._history.pop((client['id'], resource.get('resource_id')), None)
+            return client
+        if kind == 'resource_assigned':
+            client = self._client(event['client_id'])
+            resource = event['resource']
+            client.setdefault('resources', []).append(resource)
+            client['lastUpdated'] = event['at']
+            self._record_status(client['id'], resource, resource.get('last_updated') or resource.get('added_date') or event['at'])
+            return resource
+        if kind == 'status_changed':
+            resource = self._resource(event['client_id'], event['resource_id'])
+            resource['status'] = event['status']
+            resource['last_updated'] = event['at']
+            if event.get('notes'):
+                resource['notes'] = event['notes']
+            self._client(event['client_id'])['lastUpdated'] = event['at']
+            self._record_status(event['client_id'], resource, event['at'], event.get('notes'))
+            return resource
+        if kind == 'caseload_reset':
+            self._set_state({'clients': event['clients'], 'next_id': event['next_id'], 'version': self._data['version']})
+            if self._history is not None:
+                self._history = {}
+                for client in event['clients']:
+                    for resource in client.get('resources', []):
+                        self._record_status(client['id'], resource, resource.get('last_updated') or resource.get('added_date'))
+            return None
+        raise ValueError(f"Unknown client store event type '{kind}'")
+
+    # --- Group commit ---
+
+    def _submit(self, change: Callable[[], Tuple[Optional[Dict[str, Any]], Any]]) -> Commit:
+        """
+        Queues a change for the writer and waits until it is durable. change runs on the
+        writer thread under the lock and returns (event, None) to apply an event, or
+        (None, value) when there is nothing to write; it raises if the change cannot apply.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="client-store-writer", daemon=True)
+                self._writer.start()
+        self._queue.put((change, future))
+        return future.result()
+
+    def _next_batch(self) -> List[Tuple[Callable[[], Tuple[Optional[Dict[str, Any]], Any]], Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + GROUP_COMMIT_DELAY_MS / 1000
+        while len(batch) < GROUP_COMMIT_MAX_BATCH:
+            try:
+                # Whatever queued up while the previous batch was writing is taken without waiting
+                batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                results = self._commit_batch(batch)
+            except Exception as e:
+                # Storage could not even be read (e.g. a corrupt file): fail the whole batch,
+                # keep the writer alive for the next one
+                logging.error(f"Failed to commit {len(batch)} client changes: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for future, commit in results:
+                future.set_result(commit)
+
+    def _commit_batch(self, batch: List[Tuple[Callable[[], Tuple[Optional[Dict[str, Any]], Any]], Future]]) -> List[Tuple[Future, Commit]]:
+        """Applies and persists one batch; returns the commits of the changes that went through."""
+        with self._lock:
+            self._refresh()
+            version = self._data['version'] + 1
+            applied, records = [], []
+            for change, future in batch:
+                try:
+                    event, value = change()
+                    if event is not None:
+                        event.update(version=version)
+                        # Applying hands the event's objects to the live state, where
+                        # later changes in this batch may modify them
+                        record = json.dumps(event, separators=(',', ':'))
+                        value = self._apply(event)
+                        records.append(record)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                applied.append((future, value, event is not None))
+            if records:
+                self._data['version'] = version
+                try:
+                    self._persist(records)
+                except Exception as e:
+                    logging.error(f"Failed to persist {len(records)} client changes, discarding them: {e}")
+                    self._invalidate()
+                    for future, _, _ in applied:
+                        future.set_exception(e)
+                    return []
+            # Copy while holding the lock; the next batch may change these objects
+            return [(future, Commit(copy.deepcopy(value), version if changed else None)) for future, value, changed in applied]
+
+    # --- Reads ---
+
+    def list_clients(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._data['clients'])
+
+    def get_client(self, client_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._by_id.get(client_id))
+
+    def get_clients(self, client_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return {client_id: copy.deepcopy(self._by_id[client_id]) for client_id in set(client_ids) if client_id in self._by_id}
+
+    def count_clients(self, filters: ClientFilter = ClientFilter()) -> int:
+        with self._lock:
+            self._refresh()
+            if filters == ClientFilter():
+                return len(self._data['clients'])
+            return sum(1 for client in self._data['clients'] if _matches(client, filters))
+
+    def page_clients(self, limit: int, after: Optional[PageKey] = None,
+                     filters: ClientFilter = ClientFilter(),
+                     order: str = 'recent') -> Tuple[List[Dict[str, Any]], Optional[PageKey]]:
+        _check_order(order)
+        sort_key = lambda client: _client_sort_key(client, order)
+        # 'recent' pages run down from the key, 'name' pages up from it
+        descending = order == 'recent'
+        with self._lock:
+            self._refresh()
+            candidates = (
+                client for client in self._data['clients']
+                if (after is None or (sort_key(client) < tuple(after) if descending else sort_key(client) > tuple(after)))
+                and _matches(client, filters)
+            )
+            # One extra client tells whether another page follows
+            page = (heapq.nlargest if descending else heapq.nsmallest)(limit + 1, candidates, key=sort_key)
+            clients = copy.deepcopy(page[:limit])
+        return clients, (sort_key(clients[-1]) if len(page) > limit else None)
+
+    def recent_resource_updates(self, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            self._refresh()
+            updates = [
+                _resource_update_row(client, resource)
+                for client in self._data['clients'] for resource in client.get('resources', [])
+            ]
+        updates.sort(key=lambda row: row.get('last_updated', ''), reverse=True)
+        return updates[:limit], len(updates)
+
+    def status_history(self, client_id: int, resource_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            self._refresh()
+            self._resource(client_id, resource_id)
+            if self._history is None:
+                return None
+            return copy.deepcopy(self._history.get((client_id, resource_id), []))
+
+    # --- Mutations ---
+
+    def add_client(self, client: Dict[str, Any]) -> Commit:
+        client = copy.deepcopy(client)
+
+        def change():
+            return {'type': 'client_added', 'client': {**client, 'id': self._data['next_id']}}, None
+        return self._submit(change)
+
+    def delete_client(self, client_id: int) -> Commit:
+        def change():
+            if client_id not in self._by_id:
+                return None, None
+            return {'type': 'client_deleted', 'client_id': client_id}, None
+        return self._submit(change)
+
+    def add_resource(self, client_id: int, entry: Dict[str, Any]) -> Commit:
+        entry = copy.deepcopy(entry)
+
+        def change():
+            client = self._client(client_id)
+            for resource in client.get('resources', []):
+                if resource['resource_id'] == entry.get('resource_id'):
+                    return None, resource
+            return {'type': 'resource_assigned', 'client_id': client_id, 'resource': entry, 'at': _now()}, None
+        return self._submit(change)
+
+    def update_resource_status(self, client_id: int, resource_id: str, status: str, notes: Optional[str] = None) -> Commit:
+        def change():
+            self._resource(client_id, resource_id)
+            return {
+                'type': 'status_changed', 'client_id': client_id, 'resource_id': resource_id,
+                'status': status, 'notes': notes, 'at': _now(),
+            }, None
+        return self._submit(change)
+
+    def reset(self, clients: List[Dict[str, Any]], next_id: int) -> Commit:
+        clients = copy.deepcopy(clients)
+
+        def change():
+            return {'type': 'caseload_reset', 'clients': clients, 'next_id': next_id}, None
+        return self._submit(change)
+
+
+class JsonClientStore(_InMemoryClientStore):
+    """
+    Clients in clients.json. Reads cost a stat() of the file: it is reparsed only
+    when its mtime or size no longer match the last load or save, i.e. when another
+    process (a seed script, a hand edit) changed it. Each group-committed batch
+    rewrites the file once, atomically (temp file, fsync, rename). A file that does
+    not parse is never overwritten: reads and writes raise until it is fixed.
+    """
+
+    def __init__(self, clients_file: Path = CLIENTS_FILE):
+        super().__init__()
+        self.clients_file = Path(clients_file)
+        self._stat: Optional[Tuple[int, int]] = None
+
+    def _file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.clients_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self) -> None:
+        stat = self._file_stat()
+        if stat is not None and stat == self._stat:
+            return
+        data = {'clients': [], 'next_id': 1}
+        if stat is not None:
+            try:
+                with open(self.clients_file, 'r') as f:
+                    data = json.load(f)
+            except json.JSONDecodeError as e:
+                # Serving a stale or empty caseload would let the next write overwrite the
+                # file, so reads and writes fail until it parses again
+                raise ValueError(f"Could not parse {self.clients_file}: {e}") from e
+        self._set_state(data)
+        self._stat = stat
+
+    def _persist(self, records: List[str]) -> None:
+        _atomic_write_json(self.clients_file, self._data)
+        self._stat = self._file_stat()
+
+    def _invalidate(self) -> None:
+        self._stat = None
+
+
+class JournalClientStore(_InMemoryClientStore):
+    """
+    Clients as an append-only journal of typed events plus periodic snapshots.
+
+    A batch of changes is appended to journal.ndjson (one compact JSON event per
+    line) and fsynced, so a write costs the size of the change rather than of the
+    caseload. Every JOURNAL_SNAPSHOT_EVERY events the full state, status history
+    included, is written to snapshot.json and the journal starts over. Startup loads
+    the snapshot and replays the journal's tail; events already in the snapshot are
+    skipped by version, and a torn last line from a crash mid-append is cut off.
+
+    The journal is owned by one process, which holds an exclusive lock on the journal
+    directory for as long as the store is open; opening it from a second process (a
+    seed script, the voice agent) raises StoreLockedError. Use the sqlite backend when
+    several processes share the caseload.
+    """
+
+    def __init__(self, journal_dir: Path = CLIENT_JOURNAL_DIR, legacy_file: Optional[Path] = CLIENTS_FILE,
+                 snapshot_every: Optional[int] = None):
+        super().__init__()
+        self.journal_dir = Path(journal_dir)
+        self.snapshot_file = self.journal_dir / 'snapshot.json'
+        self.journal_file = self.journal_dir / 'journal.ndjson'
+        self.legacy_file = Path(legacy_file) if legacy_file is not None else None
+        self.snapshot_every = snapshot_every or JOURNAL_SNAPSHOT_EVERY
+        self._history = {}
+        self._loaded = False
+        self._journal = None
+        self._events_since_snapshot = 0
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_file = self._acquire_directory_lock()
+
+    def _acquire_directory_lock(self):
+        lock_file = open(self.journal_dir / '.lock', 'a')
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise StoreLockedError(
+                f"{self.journal_dir} is in use by another process; the journal backend serves one process "
+                "(stop the server first, or use CLIENT_STORE_BACKEND=sqlite)"
+            )
+        return lock_file
+
+    def close(self) -> None:
+        """Closes the journal and releases the directory lock."""
+        with self._lock:
+            self._invalidate()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def _refresh(self) -> None:
+        if self._loaded:
+            return
+        if self._lock_file is None:
+            raise StoreLockedError(f"The client journal in {self.journal_dir} has been closed")
+        self._history = {}
+        if self.snapshot_file.exists():
+            with open(self.snapshot_file, 'r') as f:
+                snapshot = json.load(f)
+            self._set_state(snapshot['caseload'])
+            for entry in snapshot.get('history', []):
+                self._history[(entry['client_id'], entry['resource_id'])] = entry['transitions']
+        elif self.legacy_file is not None and self.legacy_file.exists() and not self.journal_file.exists():
+            # First start: the legacy caseload becomes the initial snapshot
+            with open(self.legacy_file, 'r') as f:
+                legacy = json.load(f)
+            self._set_state({'clients': [], 'next_id': 1})
+            self._apply({'type': 'caseload_reset', 'clients': legacy.get('clients', []), 'next_id': legacy.get('next_id', 1)})
+            self._write_snapshot()
+            logging.info(f"Imported {len(legacy.get('clients', []))} clients from {self.legacy_file} into {self.journal_dir}")
+        else:
+            self._set_state({'clients': [], 'next_id': 1})
+        self._events_since_snapshot = self._replay()
+        self._loaded = True
+        if self._events_since_snapshot >= self.snapshot_every:
+            self._compact()
+
+    def _replay(self) -> int:
+        """Applies journal events newer than the loaded snapshot; returns how many."""
+        if not self.journal_file.exists():
+            return 0
+        snapshot_version = self._data['version']
+        replayed, offset = 0, 0
+        with open(self.journal_file, 'rb') as f:
+            lines = f.readlines()
+        for number, line in enumerate(lines):
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                if number < len(lines) - 1:
+                    raise ValueError(f"Corrupt event on line {number + 1} of {self.journal_file}")
+                # Torn final append from a crash; it was never acknowledged
+                logging.warning(f"Dropping incomplete last event in {self.journal_file}")
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(offset)
+                break
+            offset += len(line)
+            if event['version'] > snapshot_version:
+                self._apply(event)
+                self._data['version'] = event['version']
+                replayed += 1
+        if replayed:
+            logging.info(f"Replayed {replayed} client events from {self.journal_file}")
+        return replayed
+
+    def _persist(self, records: List[str]) -> None:
+        if self._journal is None:
+            self._journal = open(self.journal_file, 'a')
+        self._journal.write("".join(record + "\n" for record in records))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._events_since_snapshot += len(records)
+        if self._events_since_snapshot >= self.snapshot_every:
+            # The batch is already durable in the journal; a failed snapshot is retried next time
+            try:
+                self._compact()
+            except Exception as e:
+                logging.error(f"Failed to snapshot the client journal: {e}")
+
+    def _write_snapshot(self) -> None:
+        history = [
+            {'client_id': client_id, 'resource_id': resource_id, 'transitions': transitions}
+            for (client_id, resource_id), transitions in self._history.items()
+        ]
+        _atomic_write_json(self.snapshot_file, {'caseload': self._data, 'history': history}, indent=None)
+
+    def _compact(self) -> None:
+        """Snapshots the state, then starts an empty journal."""
+        self._write_snapshot()
+        # A crash before the swap only leaves events the snapshot's version already covers
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        open(self.journal_file, 'w').close()
+        self._events_since_snapshot = 0
+        logging.info(f"Compacted the client journal into {self.snapshot_file}")
+
+    def _invalidate(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self._loaded = False
+
+
+STORE_BACKENDS = ('sqlite', 'json', 'journal')
+_store: Optional[ClientStore] = None
+_store_lock = threading.Lock()
+
+
+def get_client_store() -> ClientStore:
+    """The process-wide client store for CLIENT_STORE_BACKEND, created on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if CLIENT_STORE_BACKEND not in STORE_BACKENDS:
+                raise ValueError(f"CLIENT_STORE_BACKEND must be one of {', '.join(STORE_BACKENDS)}, got '{CLIENT_STORE_BACKEND}'")
+            if CLIENT_STORE_BACKEND == 'sqlite':
+                _store = SQLiteClientStore()
+            elif CLIENT_STORE_BACKEND == 'journal':
+                _store = JournalClientStore()
+            else:
+                _store = JsonClientStore()
+        return _store
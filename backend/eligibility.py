@@ -0,0 +1,238 @@
+import math
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Tri-state values for free-text yes/no fields
+YES, NO, UNKNOWN = 1, 0, -1
+
+
+class ResourceEligibility(NamedTuple):
+    """A resource's free-text eligibility fields, normalized to typed values."""
+    resource_id: str
+    min_age: float
+    max_age: float
+    veterans_only: bool
+    disability_required: bool
+    insurance_required: int
+    accepts_without_id: int
+    accepts_undocumented: int
+    ada_accessible: int
+    advance_booking_required: int
+
+
+class ClientEligibility(NamedTuple):
+    """The client attributes that hard eligibility rules are checked against."""
+    age: Optional[int]
+    is_veteran: bool
+    has_disability: bool
+    uninsured: bool
+
+    @classmethod
+    def from_client(cls, client_data: Dict[str, Any], age: Optional[int]) -> "ClientEligibility":
+        insurance = (client_data.get('socialHistory') or {}).get('healthInsurance') or {}
+        return cls(
+            age=age or None,
+            is_veteran=bool(client_data.get('is_veteran')),
+            has_disability=bool(client_data.get('has_disability')),
+            uninsured=bool(insurance.get('none')),
+        )
+
+
+def _text(resource: Dict[str, Any], field: str) -> str:
+    value = resource.get(field)
+    return str(value).strip().lower() if value is not None else ""
+
+
+def _tristate(text: str, yes: str, no: str) -> int:
+    """Classifies free text as YES/NO/UNKNOWN. The yes pattern wins when both match."""
+    if not text or text in ("not specified", "none", "n/a"):
+        return UNKNOWN
+    if re.search(yes, text):
+        return YES
+    if re.search(no, text):
+        return NO
+    return UNKNOWN
+
+
+def parse_age_range(age_group: str) -> Tuple[float, float]:
+    """Parses an age_group string into (min_age, max_age). Unrecognized text is unbounded."""
+    text = age_group.strip().lower()
+    # "18–25 or women with children": the alternative widens the group beyond the range
+    if not text or " or women" in text or text.startswith(("all", "any", "famil")):
+        return 0.0, math.inf
+    if text == "adults":
+        return 18.0, math.inf
+    match = re.search(r"(\d+)\s*(?:–|-|to)\s*(\d+)", text)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    match = re.search(r"(\d+)\s*(?:\+|or older|and older|on up)", text)
+    if match:
+        return float(match.group(1)), math.inf
+    match = re.search(r"(\d+)\s*(?:and under|or younger)", text)
+    if match:
+        return 0.0, float(match.group(1))
+    return 0.0, math.inf
+
+
+def normalize_resource(resource_id: str, resource: Dict[str, Any]) -> ResourceEligibility:
+    """Normalizes one catalog resource's eligibility fields."""
+    age_group = _text(resource, 'age_group')
+    target_population = _text(resource, 'target_population')
+    eligibility = _text(resource, 'eligibility')
+    min_age, max_age = parse_age_range(age_group)
+
+    veterans_only = bool(
+        re.search(r"\bveterans?\b", f"{age_group} | {target_population}")
+        and "includ" not in target_population
+    )
+    disability_required = bool(
+        "with documented disability" in age_group
+        or re.search(r"^individuals with (?:verified )?disabilit", target_population)
+        or re.search(r"(?<!no )proof of disability required|must meet ada", eligibility)
+    )
+
+    return ResourceEligibility(
+        resource_id=resource_id,
+        min_age=min_age,
+        max_age=max_age,
+        veterans_only=veterans_only,
+        disability_required=disability_required,
+        insurance_required=_tristate(_text(resource, 'insurance_required'), r"^yes", r"^(?:no|none)"),
+        accepts_without_id=_tristate(_text(resource, 'accepts_clients_without_id'), r"^yes", r"^no\b"),
+        accepts_undocumented=_tristate(
+            _text(resource, 'immigration_status'),
+            r"^(?:accepted|yes|none required|any)|accepts? undocumented|all immigration",
+            r"^no\b|citizen|haven't accepted",
+        ),
+        ada_accessible=_tristate(
+            _text(resource, 'ada_accessible'),
+            r"^yes|no restrictions|accommodates all|accept all",
+            r"^no\b|must be able to walk|must be ambulatory|climb stairs",
+        ),
+        advance_booking_required=_tristate(
+            _text(resource, 'advance_booking_required'),
+            r"^yes|^reservations|appointment",
+            r"^no\b|^mix of walk-ins",
+        ),
+    )
+
+
+class _Columns(NamedTuple):
+    """Column-oriented view of the index, rebuilt and swapped on every write."""
+    ids: np.ndarray
+    min_age: np.ndarray
+    max_age: np.ndarray
+    veterans_only: np.ndarray
+    disability_required: np.ndarray
+    insurance_required: np.ndarray
+
+
+class EligibilityIndex:
+    """
+    Typed eligibility columns for every catalog resource.
+
+    The free-text fields are parsed once at load time. A client's hard constraints
+    (age, veteran status, disability, insurance) then become one vectorized boolean
+    mask over all resources, applied as a search filter before similarity scoring,
+    so ineligible resources never take top-k slots or prompt tokens.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: Dict[str, ResourceEligibility] = {}
+        self._columns = self._build_columns([])
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def upsert(self, resource_id: str, resource: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records[resource_id] = normalize_resource(resource_id, resource)
+            self._columns = self._build_columns(list(self._records.values()))
+
+    def upsert_many(self, resources: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            for resource_id, resource in resources.items():
+                self._records[resource_id] = normalize_resource(resource_id, resource)
+            self._columns = self._build_columns(list(self._records.values()))
+
+    def delete(self, resource_id: str) -> None:
+        with self._lock:
+            if self._records.pop(resource_id, None) is not None:
+                self._columns = self._build_columns(list(self._records.values()))
+
+    def get(self, resource_id: str) -> Optional[ResourceEligibility]:
+        return self._records.get(resource_id)
+
+    @staticmethod
+    def _build_columns(records: List[ResourceEligibility]) -> _Columns:
+        return _Columns(
+            ids=np.array([r.resource_id for r in records], dtype=object),
+            min_age=np.array([r.min_age for r in records], dtype=np.float64),
+            max_age=np.array([r.max_age for r in records], dtype=np.float64),
+            veterans_only=np.array([r.veterans_only for r in records], dtype=bool),
+            disability_required=np.array([r.disability_required for r in records], dtype=bool),
+            insurance_required=np.array([r.insurance_required for r in records], dtype=np.int8),
+        )
+
+    def mask(self, client: ClientEligibility) -> np.ndarray:
+        """Boolean mask over resources (in index order) the client is eligible for."""
+        return self._mask(self._columns, client)
+
+    @staticmethod
+    def _mask(cols: _Columns, client: ClientEligibility) -> np.ndarray:
+        mask = np.ones(len(cols.ids), dtype=bool)
+        if client.age is not None:
+            mask &= (cols.min_age <= client.age) & (client.age <= cols.max_age)
+        if not client.is_veteran:
+            mask &= ~cols.veterans_only
+        if not client.has_disability:
+            mask &= ~cols.disability_required
+        if client.uninsured:
+            mask &= cols.insurance_required != YES
+        return mask
+
+    def eligible_ids(self, client: ClientEligibility) -> Optional[List[str]]:
+        """Ids of resources the client is eligible for, or None when nothing is excluded."""
+        cols = self._columns
+        mask = self._mask(cols, client)
+        if mask.all():
+            return None
+        return cols.ids[mask].tolist()
+
+
+def _age_label(min_age: float, max_age: float) -> Optional[str]:
+    if min_age <= 0 and math.isinf(max_age):
+        return None
+    if math.isinf(max_age):
+        return f"serves ages {min_age:g}+"
+    if min_age <= 0:
+        return f"serves ages up to {max_age:g}"
+    return f"serves ages {min_age:g}-{max_age:g}"
+
+
+def describe_match(record: ResourceEligibility, client: ClientEligibility) -> List[str]:
+    """Short phrases naming the eligibility fields on which a resource fits the client."""
+    reasons = []
+    if client.age is not None:
+        age_label = _age_label(record.min_age, record.max_age)
+        if age_label:
+            reasons.append(age_label)
+    if record.veterans_only and client.is_veteran:
+        reasons.append("serves veterans")
+    if record.disability_required and client.has_disability:
+        reasons.append("serves clients with disabilities")
+    if client.uninsured and record.insurance_required == NO:
+        reasons.append("no insurance required")
+    if record.accepts_without_id == YES:
+        reasons.append("accepts clients without ID")
+    if record.accepts_undocumented == YES:
+        reasons.append("no immigration status requirement")
+    if client.has_disability and record.ada_accessible == YES:
+        reasons.append("ADA accessible")
+    if record.advance_booking_required == NO:
+        reasons.append("walk-ins welcome")
+    return reasons
@@ -0,0 +1,133 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+# Kept deliberately small: negations ("no", "not", "without") carry meaning in client notes
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in",
+    "is", "it", "its", "of", "on", "or", "that", "the", "their", "this", "to", "was", "with",
+})
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric tokens, minus stopwords. ZIP codes and numbers are kept whole."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class LexicalIndex:
+    """
+    In-process BM25 inverted index over document chunks.
+
+    Exact terms such as "veteran", "Vietnamese", "no ID" or a ZIP code score directly
+    instead of being blurred by an embedding. Building the index is pure Python over
+    the catalog text, so it takes milliseconds and needs no network.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._documents: Dict[str, Document] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_documents(self, documents: List[Document], ids: List[str]) -> None:
+        """Indexes documents under the given ids, replacing any existing entry with the same id."""
+        with self._lock:
+            for doc_id, document in zip(ids, documents):
+                self._remove(doc_id)
+                term_counts = Counter(tokenize(document.page_content))
+                for term, count in term_counts.items():
+                    self._postings.setdefault(term, {})[doc_id] = count
+                length = sum(term_counts.values())
+                self._doc_lengths[doc_id] = length
+                self._total_length += length
+                self._documents[doc_id] = document
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+        for term in set(tokenize(document.page_content)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+
+    def search(
+        self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Returns the top-k documents by BM25 score, restricted to documents matching the metadata filter."""
+        query_terms = Counter(tokenize(query))
+        with self._lock:
+            if not self._documents or not query_terms or k <= 0:
+                return []
+            doc_count = len(self._documents)
+            avg_length = self._total_length / doc_count or 1.0
+            scores: Dict[str, float] = {}
+            for term, query_count in query_terms.items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, term_count in postings.items():
+                    if filter and not _matches(self._documents[doc_id], filter):
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    weight = idf * term_count * (self.k1 + 1) / (term_count + norm)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + query_count * weight
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self._documents[doc_id], score) for doc_id, score in ranked]
+
+
+def _matches(document: Document, filter: Dict[str, Any]) -> bool:
+    """Evaluates a Chroma-style metadata filter (equality, $in, top-level $and) against a document."""
+    clauses = filter["$and"] if "$and" in filter else [filter]
+    for clause in clauses:
+        for key, condition in clause.items():
+            value = document.metadata.get(key)
+            if isinstance(condition, dict) and "$in" in condition:
+                if value not in condition["$in"]:
+                    return False
+            elif value != condition:
+                return False
+    return True
+
+
+def reciprocal_rank_scores(
+    rankings: List[List[Document]],
+    key: Callable[[Document], Hashable],
+    k: int = 60,
+) -> List[Tuple[Document, float]]:
+    """
+    Merges ranked document lists with reciprocal rank fusion: each document scores
+    sum(1 / (k + rank)) over the lists it appears in. Only ranks are used, so BM25 and
+    cosine scores never need to be put on the same scale. Returns (document, score), best first.
+    """
+    scores: Dict[Hashable, float] = {}
+    documents: Dict[Hashable, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, start=1):
+            doc_key = key(document)
+            scores[doc_key] = scores.get(doc_key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(doc_key, document)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return [(documents[doc_key], scores[doc_key]) for doc_key in fused]
+
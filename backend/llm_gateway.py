@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import logging
+import os
+import random
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+import openai
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+
+import model_providers
+
+
+class RouteLimits(NamedTuple):
+    # Seconds per attempt, and calls allowed in flight before new ones are shed
+    timeout: float
+    concurrency: int
+
+
+# --- Configuration ---
+# Shared HTTP connection pool for every model API call in the process
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", 50))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+LLM_KEEPALIVE_SECONDS = float(os.environ.get("LLM_KEEPALIVE_SECONDS", 60))
+# Retries after a timeout, connection error, 429 or 5xx, with full-jitter exponential backoff
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 2))
+LLM_RETRY_BASE_SECONDS = float(os.environ.get("LLM_RETRY_BASE_SECONDS", 0.5))
+LLM_RETRY_MAX_SECONDS = float(os.environ.get("LLM_RETRY_MAX_SECONDS", 8))
+# Retry-After sent with a 429 when a route is saturated
+LLM_RETRY_AFTER_SECONDS = int(os.environ.get("LLM_RETRY_AFTER_SECONDS", 2))
+# Per-route defaults; override with LLM_TIMEOUT_<ROUTE> / LLM_CONCURRENCY_<ROUTE>,
+# e.g. LLM_TIMEOUT_TRANSLATE=10 or LLM_CONCURRENCY_MATCH=32
+DEFAULT_ROUTES = {
+    'help_chat': RouteLimits(timeout=30, concurrency=8),
+    'voice_assistant': RouteLimits(timeout=20, concurrency=8),
+    'chat_followup': RouteLimits(timeout=30, concurrency=8),
+    'translate': RouteLimits(timeout=20, concurrency=8),
+    'tts': RouteLimits(timeout=30, concurrency=4),
+    'match': RouteLimits(timeout=60, concurrency=16),
+}
+ROUTES = {
+    route: RouteLimits(
+        timeout=float(os.environ.get(f"LLM_TIMEOUT_{route.upper()}", limits.timeout)),
+        concurrency=int(os.environ.get(f"LLM_CONCURRENCY_{route.upper()}", limits.concurrency)),
+    )
+    for route, limits in DEFAULT_ROUTES.items()
+}
+# --- End Configuration ---
+
+# Failures worth another attempt; anything else (bad request, auth) is raised at once
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    httpx.TransportError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class GatewayOverloadedError(Exception):
+    """A route already has its maximum number of calls in flight."""
+
+    def __init__(self, route: str, retry_after: int):
+        super().__init__(f"Too many concurrent '{route}' requests, please retry shortly")
+        self.route = route
+        self.retry_after = retry_after
+
+
+class GatewayTimeoutError(Exception):
+    """Every attempt at a call ran past the route's timeout."""
+
+
+class LLMGateway:
+    """
+    Single entry point for model API calls.
+
+    One httpx connection pool (keep-alive, bounded) is shared by every chat model,
+    translation and speech call. Each route has its own per-attempt timeout and a
+    semaphore: calls beyond its concurrency are rejected with GatewayOverloadedError
+    instead of queueing, and retryable failures are retried with jittered backoff.
+    Chat models handed out for code that calls them directly (the resource matcher)
+    use the same pool and retry inside the OpenAI SDK, which also jitters its backoff.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, RouteLimits]] = None):
+        self.routes = dict(routes or ROUTES)
+        limits = httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+        )
+        timeout = max(route.timeout for route in self.routes.values())
+        # The sync pool serves the matcher's threadpool paths; everything else is async
+        self.http_client = httpx.Client(limits=limits, timeout=timeout)
+        self.http_async_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        # Retries happen in _call, so the SDK client does not retry on its own
+        self._openai_client = model_providers.get_openai_client(http_client=self.http_async_client, max_retries=0)
+        self._semaphores = {route: asyncio.Semaphore(route_limits.concurrency) for route, route_limits in self.routes.items()}
+        self._chat_models: Dict[Tuple[float, Optional[str]], BaseChatModel] = {}
+
+    def chat_model(self, temperature: float = 0, route: Optional[str] = None) -> BaseChatModel:
+        """
+        Pooled chat model. Without a route it is for chat(), which applies timeouts and
+        retries itself; with a route the model enforces that route's timeout and retries.
+        """
+        key = (temperature, route)
+        if key not in self._chat_models:
+            options = {'max_retries': 0}
+            if route:
+                options = {'timeout': self.routes[route].timeout, 'max_retries': LLM_MAX_RETRIES}
+            self._chat_models[key] = model_providers.get_chat_model(
+                temperature=temperature,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client,
+                **options,
+            )
+        return self._chat_models[key]
+
+    def embeddings(self):
+        """Embeddings for the configured provider on the shared pool."""
+        return model_providers.get_embeddings(http_client=self.http_client, http_async_client=self.http_async_client)
+
+    def saturated(self, route: str) -> bool:
+        """True when every slot of the route is taken, i.e. admit() would shed the call."""
+        return self._semaphores[route].locked()
+
+    @contextlib.asynccontextmanager
+    async def admit(self, route: str) -> AsyncIterator[None]:
+        """Holds one of the route's slots, or raises GatewayOverloadedError if none are free."""
+        semaphore = self._semaphores[route]
+        # Nothing awaits between the check and the acquire, so this cannot race on the event loop
+        if semaphore.locked():
+            logging.warning(f"LLM route '{route}' saturated ({self.routes[route].concurrency} in flight), shedding request")
+            raise GatewayOverloadedError(route, LLM_RETRY_AFTER_SECONDS)
+        async with semaphore:
+            yield
+
+    async def _call(self, route: str, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        timeout = self.routes[route].timeout
+        async with self.admit(route):
+            for retry in range(LLM_MAX_RETRIES + 1):
+                try:
+                    return await asyncio.wait_for(attempt(), timeout)
+                except RETRYABLE_ERRORS as e:
+                    if retry == LLM_MAX_RETRIES:
+                        if isinstance(e, asyncio.TimeoutError):
+                            raise GatewayTimeoutError(f"'{route}' call timed out after {timeout}s, {retry + 1} attempts") from e
+                        raise
+                    delay = random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** retry))
+                    logging.warning(f"LLM route '{route}' attempt {retry + 1} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+
+    async def chat(self, route: str, messages: List[BaseMessage], temperature: float = 0) -> BaseMessage:
+        """Runs a chat completion under the route's limits."""
+        model = self.chat_model(temperature)
+        return await self._call(route, lambda: model.ainvoke(messages))
+
+    async def translate(self, text: str, target_language: str, route: str = 'translate') -> str:
+        """Translates text under the route's limits."""
+        return await self._call(route, lambda: model_providers.translate(text, target_language, client=self._openai_client))
+
+    async def synthesize_speech(self, text: str, voice: str, route: str = 'tts') -> Tuple[bytes, str]:
+        """Returns (audio bytes, format) under the route's limits."""
+        return await self._call(route, lambda: model_providers.synthesize_speech(text, voice, client=self._openai_client))
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections."""
+        await self.http_async_client.aclose()
+        self.http_client.close()
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_gateway() -> LLMGateway:
+    """The process-wide gateway, created on first use (the server creates it at startup)."""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway()
+    return _gateway
+
+
+async def close_gateway() -> None:
+    global _gateway
+    if _gateway is not None:
+        await _gateway.aclose()
+        _gateway = None
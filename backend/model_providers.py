@@ -0,0 +1,308 @@
+import asyncio
+import functools
+import hashlib
+import io
+import os
+import time
+import wave
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from lexical_index import tokenize
+
+# --- Configuration ---
+load_dotenv()
+# openai: hosted models (needs OPENAI_API_KEY). local: deterministic offline stand-ins
+# for load testing and benchmarking without network access or API spend.
+MODEL_PROVIDER = os.environ.get("MODEL_PROVIDER", "openai").lower()
+
+CHAT_MODEL = "gpt-4o-mini"
+EMBEDDING_MODEL = "text-embedding-3-large"
+# Output width of the embedding model. text-embedding-3 vectors can be shortened
+# (e.g. 256, 512 or 1024) at a small quality cost; unset keeps the full 3072. The
+# local provider defaults to 512. Changing it re-embeds the catalog once.
+EMBEDDING_DIMENSIONS = int(os.environ["EMBEDDING_DIMENSIONS"]) if os.environ.get("EMBEDDING_DIMENSIONS") else None
+TTS_MODEL = "tts-1"
+VOICE_AGENT_MODEL = "gpt-4o"
+
+# Local provider: latency injected per call to mimic a remote model
+LOCAL_CHAT_LATENCY_MS = float(os.environ.get("LOCAL_CHAT_LATENCY_MS", 0))
+LOCAL_EMBEDDING_LATENCY_MS = float(os.environ.get("LOCAL_EMBEDDING_LATENCY_MS", 0))
+LOCAL_TTS_LATENCY_MS = float(os.environ.get("LOCAL_TTS_LATENCY_MS", 0))
+# Completion template; {excerpt} is the start of the last prompt message
+LOCAL_CHAT_TEMPLATE = os.environ.get(
+    "LOCAL_CHAT_TEMPLATE",
+    "Based on the information provided, here is a helpful response. ({excerpt})",
+)
+# --- End Configuration ---
+
+PROVIDERS = ('openai', 'local')
+
+
+def require_openai_key() -> str:
+    """Returns the OpenAI key (OPENAI_API_KEY or OPEN_API_KEY) and exports it for the SDKs."""
+    openai_key = os.environ.get("OPENAI_API_KEY") or os.environ.get("OPEN_API_KEY")
+    if not openai_key:
+        raise ValueError("OPENAI_API_KEY or OPEN_API_KEY environment variable is required.")
+    # Set the OpenAI API key for the session
+    os.environ["OPENAI_API_KEY"] = openai_key
+    return openai_key
+
+
+def _provider() -> str:
+    if MODEL_PROVIDER not in PROVIDERS:
+        raise ValueError(f"MODEL_PROVIDER must be one of {', '.join(PROVIDERS)}, got '{MODEL_PROVIDER}'")
+    return MODEL_PROVIDER
+
+
+def embedding_model_name(embeddings: Embeddings) -> str:
+    """Stable name for an embeddings object (model plus any output width); namespaces the embedding caches."""
+    name = getattr(embeddings, 'model', None) or type(embeddings).__name__
+    dimensions = getattr(embeddings, 'dimensions', None)
+    return f"{name}-{dimensions}" if dimensions else name
+
+
+# --- Local provider ---
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic offline embeddings: word unigrams and bigrams hashed into a fixed
+    number of signed buckets. Texts that share words land close together, which is
+    enough to exercise retrieval without a network.
+    """
+
+    def __init__(self, dimensions: int = 512, latency_ms: float = 0.0):
+        self.dimensions = dimensions
+        self.latency_ms = latency_ms
+        self.model = "hashing"
+
+    def _embed(self, text: str) -> List[float]:
+        tokens = tokenize(text)
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], 'little') % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # One simulated round trip per call, as a batched API request would cost
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class LocalChatModel(BaseChatModel):
+    """
+    Deterministic chat model: fills a template with an excerpt of the last message.
+    latency_ms is slept per call (spread across tokens when streaming), so load tests
+    see a model-shaped wait without a network.
+    """
+
+    template: str = LOCAL_CHAT_TEMPLATE
+    latency_ms: float = 0.0
+    excerpt_words: int = 12
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-template"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"template": self.template, "latency_ms": self.latency_ms}
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        last = messages[-1].content if messages else ""
+        words = str(last).split()
+        excerpt = " ".join(words[:self.excerpt_words]) + ("..." if len(words) > self.excerpt_words else "")
+        return self.template.format(excerpt=excerpt)
+
+    def _tokens(self, text: str) -> List[str]:
+        words = text.split(" ")
+        return [word if i == 0 else f" {word}" for i, word in enumerate(words)]
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._respond(messages)))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._respond(messages)))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        tokens = self._tokens(self._respond(messages))
+        for token in tokens:
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000 / len(tokens))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = self._tokens(self._respond(messages))
+        for token in tokens:
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000 / len(tokens))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def _silent_wav(text: str) -> bytes:
+    """A silent mono WAV roughly as long as the text would take to speak (~150 wpm)."""
+    sample_rate = 16000
+    seconds = max(0.2, len(text.split()) * 0.4)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b'\x00\x00' * int(sample_rate * seconds))
+    return buffer.getvalue()
+
+
+# --- Provider entry points ---
+
+def get_chat_model(
+    temperature: float = 0,
+    timeout: Optional[float] = None,
+    max_retries: int = 2,
+    http_client: Any = None,
+    http_async_client: Any = None,
+) -> BaseChatModel:
+    """
+    LangChain chat model for the configured provider. timeout, max_retries and the
+    httpx clients (shared connection pools, see llm_gateway) apply to OpenAI only.
+    """
+    if _provider() == 'local':
+        return LocalChatModel(latency_ms=LOCAL_CHAT_LATENCY_MS)
+    from langchain_openai import ChatOpenAI
+    require_openai_key()
+    return ChatOpenAI(
+        model=CHAT_MODEL, temperature=temperature, timeout=timeout, max_retries=max_retries,
+        http_client=http_client, http_async_client=http_async_client,
+    )
+
+
+def get_embeddings(http_client: Any = None, http_async_client: Any = None) -> Embeddings:
+    """LangChain embeddings for the configured provider."""
+    if _provider() == 'local':
+        return HashingEmbeddings(dimensions=EMBEDDING_DIMENSIONS or 512, latency_ms=LOCAL_EMBEDDING_LATENCY_MS)
+    from langchain_openai import OpenAIEmbeddings
+    require_openai_key()
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL, dimensions=EMBEDDING_DIMENSIONS,
+        http_client=http_client, http_async_client=http_async_client,
+    )
+
+
+def get_openai_client(http_client: Any = None, max_retries: int = 2):
+    """AsyncOpenAI client for the raw API calls (translation, speech); None for the local provider."""
+    if _provider() == 'local':
+        return None
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=require_openai_key(), http_client=http_client, max_retries=max_retries)
+
+
+@functools.lru_cache(maxsize=1)
+def _openai_client():
+    return get_openai_client()
+
+
+async def translate(text: str, target_language: str, client: Any = None) -> str:
+    """Translates text to target_language. The local provider tags the text instead."""
+    if _provider() == 'local':
+        if LOCAL_CHAT_LATENCY_MS:
+            await asyncio.sleep(LOCAL_CHAT_LATENCY_MS / 1000)
+        return f"[{target_language}] {text}"
+    response = await (client or _openai_client()).chat.completions.create(
+        model=CHAT_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": f"You are a professional translator. Translate the following text to {target_language}. Maintain the original meaning and tone. Only return the translated text, nothing else."
+            },
+            {"role": "user", "content": text}
+        ],
+        temperature=0.3
+    )
+    return response.choices[0].message.content.strip()
+
+
+async def synthesize_speech(text: str, voice: str, client: Any = None) -> Tuple[bytes, str]:
+    """Returns (audio bytes, format). The local provider returns silence as WAV."""
+    if _provider() == 'local':
+        if LOCAL_TTS_LATENCY_MS:
+            await asyncio.sleep(LOCAL_TTS_LATENCY_MS / 1000)
+        return _silent_wav(text), "wav"
+    response = await (client or _openai_client()).audio.speech.create(
+        model=TTS_MODEL,  # Use tts-1 for faster response, tts-1-hd for higher quality
+        voice=voice,      # Options: alloy, echo, fable, onyx, nova, shimmer
+        input=text,
+        response_format="mp3"
+    )
+    return response.content, "mp3"
+
+
+def get_voice_plugins() -> Dict[str, Any]:
+    """
+    STT, LLM and TTS plugins for the LiveKit voice agent. There is no offline
+    real-time speech stack, so the local provider is rejected here rather than
+    silently falling back to the paid API.
+    """
+    if _provider() == 'local':
+        raise ValueError("The voice agent needs MODEL_PROVIDER=openai; the local provider has no real-time speech models")
+    from livekit.plugins import openai
+    require_openai_key()
+    return {
+        "stt": openai.STT(model="whisper-1"),
+        "llm": openai.LLM(model=VOICE_AGENT_MODEL),
+        "tts": openai.TTS(voice="shimmer", model=TTS_MODEL),
+    }
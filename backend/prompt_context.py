@@ -0,0 +1,141 @@
+import functools
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+# Resource fields shown to the LLM, most useful first; later fields are cut first under the budget
+CONTEXT_FIELDS = (
+    ('resource_name', 'Resource'),
+    ('organization', 'Organization'),
+    ('target_population', 'Target Population'),
+    ('services', 'Services'),
+    ('eligibility', 'Eligibility'),
+    ('key_features', 'Key Features'),
+    ('age_group', 'Age Group'),
+    ('location', 'Location'),
+    ('hours', 'Hours'),
+    ('contact', 'Contact'),
+    ('immigration_status', 'Immigration Status'),
+    ('accepts_clients_without_id', 'Accepts Clients Without ID'),
+    ('advance_booking_required', 'Advance Booking Required'),
+    ('ada_accessible', 'ADA Accessible'),
+)
+
+# Placeholder values that carry no information for the LLM
+EMPTY_VALUES = frozenset({'', 'unknown', 'not specified', 'n/a', 'na', 'none', 'not listed', 'not applicable'})
+
+# A field clipped to fewer tokens than this is dropped instead
+MIN_CLIPPED_TOKENS = 8
+
+# Fewest tokens a resource is given: when the budget cannot give every resource this
+# many, the lowest-ranked resources are left out rather than all cut down to their names
+MIN_RESOURCE_TOKENS = 80
+
+# Free text at least this long is shown once per resource; catalog entries often copy
+# target_population into eligibility. Shorter values (Yes/No, hours) always keep their label.
+MIN_DEDUPED_CHARS = 40
+
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+@functools.lru_cache(maxsize=4)
+def _encoding(model: str):
+    """The model's tiktoken encoding, or None (approximate counts) when it cannot be loaded."""
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use; offline boxes fall back to estimates
+        logging.warning(f"Tokenizer for {model} unavailable, token counts are approximate: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Number of tokens in text for the model (word/punctuation estimate without tiktoken)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(_APPROX_TOKEN.findall(text))
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """The longest prefix of text that fits in max_tokens, marked with an ellipsis when cut."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding(model)
+    if encoding is None:
+        matches = list(_APPROX_TOKEN.finditer(text))
+        if len(matches) <= max_tokens:
+            return text
+        return text[:matches[max_tokens - 1].end()] + "…"
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens]) + "…"
+
+
+def _resource_fields(metadata: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(label, value) pairs in priority order, skipping placeholders and repeated long free text."""
+    fields, seen = [], set()
+    for field, label in CONTEXT_FIELDS:
+        value = str(metadata.get(field) or '').strip()
+        if value.lower() in EMPTY_VALUES:
+            continue
+        if len(value) >= MIN_DEDUPED_CHARS:
+            if value.lower() in seen:
+                continue
+            seen.add(value.lower())
+        fields.append((label, value))
+    return fields
+
+
+def build_context(documents: List[Document], max_tokens: int, model: str) -> Tuple[str, int]:
+    """
+    Compact resource context for the summary prompt. Returns (context, token count).
+
+    Each resource's fields come from its metadata once (the chunk text repeats the
+    same fields), placeholder values are dropped, and the total stays within
+    max_tokens: every resource gets an equal share, unused share carries over to
+    the next one, and fields that do not fit are cut, lowest priority first. Resources
+    beyond what the budget gives MIN_RESOURCE_TOKENS each are left out, lowest ranked first.
+    """
+    blocks, used = [], 0
+    separator = "\n---\n"
+    separator_tokens = count_tokens(separator, model)
+    documents = documents[:max(1, max_tokens // MIN_RESOURCE_TOKENS)]
+    for position, doc in enumerate(documents):
+        remaining = len(documents) - position
+        # Only resources that are actually shown are separated
+        separator_cost = separator_tokens if blocks else 0
+        share = (max_tokens - used) // remaining - separator_cost
+        lines, block_tokens = [], 0
+        for label, value in _resource_fields(doc.metadata):
+            line = f"{label}: {value}"
+            # +1 for the newline joining the lines
+            line_tokens = count_tokens(line, model) + 1
+            if block_tokens + line_tokens > share:
+                # Keep the start of the field that overflows; the rest of the resource is cut
+                prefix = f"{label}: "
+                value_budget = share - block_tokens - count_tokens(prefix, model) - 2
+                if lines and value_budget >= MIN_CLIPPED_TOKENS:
+                    clipped = prefix + truncate_to_tokens(value, value_budget, model)
+                    lines.append(clipped)
+                    block_tokens += count_tokens(clipped, model) + 1
+                break
+            lines.append(line)
+            block_tokens += line_tokens
+        if not lines:
+            continue
+        blocks.append("\n".join(lines))
+        used += block_tokens + separator_cost
+    context = separator.join(blocks)
+    return context, count_tokens(context, model)
+
+
+def log_prompt_tokens(prompt_text: str, model: str, resources: int, context_tokens: int) -> Optional[int]:
+    """Logs the prompt size of one LLM summary call and returns its token count."""
+    prompt_tokens = count_tokens(prompt_text, model)
+    logging.info(f"LLM summary prompt: {prompt_tokens} tokens ({resources} resources, context {context_tokens} tokens)")
+    return prompt_tokens
@@ -1,59 +1,148 @@
 import os
+import asyncio
 import json
+import hashlib
 import logging
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+import numpy as np
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
 
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.documents import Document
+from langchain_core.language_models import BaseChatModel
+from langchain_core.embeddings import Embeddings
 from langchain_core.prompts import PromptTemplate
+from langchain_core.vectorstores import VectorStore
+
+from caches import QueryEmbeddingCache, RecommendationCache
+from eligibility import ClientEligibility, EligibilityIndex, describe_match
+from lexical_index import LexicalIndex, reciprocal_rank_scores
+from model_providers import CHAT_MODEL, embedding_model_name, get_chat_model, get_embeddings
+from prompt_context import build_context, count_tokens, log_prompt_tokens
+from reranking import collapse_by_resource, maximal_marginal_relevance
 
 # --- Configuration ---
 load_dotenv()
 SCRIPT_DIR = Path(__file__).parent.absolute()
 RESOURCES_FILE = SCRIPT_DIR / 'structured_resources.json'
+# Document embeddings are persisted here, keyed by model name + hash of the chunk text,
+# so a warm boot only pays for resources that are new or have changed.
+EMBEDDING_CACHE_DIR = Path(os.environ.get("EMBEDDING_CACHE_DIR", SCRIPT_DIR / '.embedding_cache'))
+# Vector store backend: 'chroma' or 'numpy' (brute-force search, suited to small catalogs)
+VECTOR_STORE_BACKEND = os.environ.get("VECTOR_STORE_BACKEND", "chroma").lower()
+# NumPy backend only: store vectors as 'none' (float32), 'float16' or 'int8', and how many
+# candidates per result are rescored at full precision from the embedding cache (0 disables)
+VECTOR_QUANTIZATION = os.environ.get("VECTOR_QUANTIZATION", "none").lower()
+RESCORE_OVERSAMPLE = int(os.environ.get("RESCORE_OVERSAMPLE", 4))
+# In-memory LRU cache of query embeddings (repeat matches for the same client skip the API)
+QUERY_CACHE_MAX_BYTES = int(float(os.environ.get("QUERY_CACHE_MAX_MB", 64)) * 1024 * 1024)
+QUERY_CACHE_TTL_SECONDS = float(os.environ.get("QUERY_CACHE_TTL_SECONDS", 12 * 60 * 60))
+# In-memory LRU cache of finished recommendations, keyed by client profile + catalog version
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", 1024))
+# Client fields that feed the match question; a change to any of them invalidates cached results
+PROFILE_FIELDS = (
+    'dateOfBirth', 'gender', 'family_status', 'employment_status', 'income_level',
+    'is_veteran', 'has_disability', 'notes', 'needs', 'socialHistory',
+)
+# Number of resources returned per recommendation
+TOP_K = 5
+# Retrieval mode: 'hybrid' (BM25 + vector, fused by reciprocal rank), 'vector', or 'lexical'
+# (BM25 only, no embeddings API calls). Vector and hybrid fall back to lexical if embedding fails.
+RETRIEVAL_MODE = os.environ.get("RETRIEVAL_MODE", "hybrid").lower()
+# Reciprocal rank fusion constant and how deep each ranking is read before fusing
+RRF_K = int(os.environ.get("RRF_K", 60))
+FUSION_DEPTH = TOP_K * 4
+# Chunk hits are collapsed to unique resources, scored by their best chunk ('max') or
+# by all their matching chunks ('sum')
+RESOURCE_SCORE_AGGREGATION = os.environ.get("RESOURCE_SCORE_AGGREGATION", "max").lower()
+# Maximal marginal relevance over the collapsed resources: 1.0 keeps the relevance
+# order (off); lower values trade relevance for diversity, e.g. 0.7
+MMR_LAMBDA = float(os.environ.get("MMR_LAMBDA", 1.0))
+# Latency tiers for a match: 'full' waits for the LLM rationale; 'fast' returns a templated
+# rationale built from eligibility fields; 'deferred' returns the fast result and fills the
+# cache entry with the full result in the background
+LATENCY_TIERS = ('fast', 'full', 'deferred')
+# Max background fills for 'deferred' matches running at once
+DEFERRED_CONCURRENCY = int(os.environ.get("DEFERRED_CONCURRENCY", 4))
+# Token budget for the resource context in the LLM summary prompt, per requested resource
+# type (a multi-category match gets one budget per category); lower-priority fields are
+# clipped first when the retrieved resources exceed it
+PROMPT_CONTEXT_MAX_TOKENS = int(os.environ.get("PROMPT_CONTEXT_MAX_TOKENS", 600))
+# Keyword fallback used to categorize resources that have no 'category' field
+CATEGORY_KEYWORDS = {
+    'food': ['food', 'meal', 'pantry', 'nutrition', 'grocery', 'hunger', 'feeding', 'csfp', 'snap', 'tefap'],
+    'housing': ['housing', 'shelter', 'bed', 'room', 'apartment', 'home', 'residence', 'accommodation', 'lodging'],
+    'transportation': ['transportation', 'transport', 'ride', 'bus', 'taxi', 'medical transport', 'mobility', 'travel', 'transit'],
+}
 # --- End Configuration ---
 
+# A resource type ('housing') or several of them (['housing', 'food'])
+ResourceTypes = Union[str, List[str]]
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class RAGResourceMatcher:
-    def __init__(self):
-        # 1. Initialize OpenAI and Embedding Models
-        openai_key = os.environ.get("OPENAI_API_KEY") or os.environ.get("OPEN_API_KEY")
-        if not openai_key:
-            raise ValueError("OPENAI_API_KEY or OPEN_API_KEY environment variable is required.")
-        
-        # Set the OpenAI API key for the session
-        os.environ["OPENAI_API_KEY"] = openai_key
-        
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+def _resolve_category(resource: Dict[str, Any], content: str) -> str:
+    """
+    Returns the resource's category, falling back to keyword matching on its content
+    when the record has no category of its own.
+    """
+    category = str(resource.get('category') or '').strip().lower()
+    if category:
+        return category
+    content = content.lower()
+    hits = {
+        name: sum(keyword in content for keyword in keywords)
+        for name, keywords in CATEGORY_KEYWORDS.items()
+    }
+    best = max(hits, key=hits.get)
+    return best if hits[best] else 'other'
 
-        # 2. Load data, create documents, and build the in-memory vector store
-        try:
-            self._load_resources_and_build_vector_store()
-            logging.info("RAG Resource Matcher initialized successfully")
-        except Exception as e:
-            logging.error(f"Failed to initialize RAG Resource Matcher: {e}", exc_info=True)
-            self.vector_store = None # Ensure it's None if initialization fails
+def _as_resource_types(resource_type: ResourceTypes) -> List[str]:
+    """Normalizes a single resource type or a list of them to a list."""
+    if isinstance(resource_type, str):
+        return [resource_type]
+    return list(resource_type)
 
-    def _load_resources_and_build_vector_store(self):
-        """Loads resource data from JSON and builds an in-memory Chroma vector store."""
-        logging.info("Loading resources from JSON and building vector store...")
-        
-        # Load resources from JSON
-        with open(RESOURCES_FILE, 'r') as f:
-            resources = json.load(f)
-        
-        # Create documents from resources
-        documents = []
-        for resource in resources:
-            # Create searchable text content
-            content = f"""
+def _join_resource_types(resource_types: List[str]) -> str:
+    """Formats resource types for prose, e.g. 'housing, food and transportation'."""
+    if len(resource_types) <= 1:
+        return "".join(resource_types)
+    return f"{', '.join(resource_types[:-1])} and {resource_types[-1]}"
+
+def _fingerprint(value: Any) -> str:
+    """Stable hash of a JSON-serializable value."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _client_fingerprint(client_data: Dict[str, Any]) -> str:
+    """Hashes the profile fields that shape the match question, plus the client's current age."""
+    profile = {field: client_data.get(field) for field in PROFILE_FIELDS}
+    profile['age'] = _calculate_age(client_data.get('dateOfBirth'))
+    return _fingerprint(profile)
+
+def get_resource_id(resource: Dict[str, Any]) -> str:
+    """Returns the stable key used for a resource's chunks in the vector store."""
+    return str(resource.get('id') or resource.get('resource_name', 'Unknown'))
+
+def _chunk_key(document: Document) -> Tuple[str, str]:
+    """Identifies a chunk across the vector and lexical indexes."""
+    return (get_resource_id(document.metadata), document.page_content)
+
+def build_cached_embeddings(embeddings: Embeddings) -> CacheBackedEmbeddings:
+    """Wraps the embedding model with an on-disk, content-addressed cache for document chunks."""
+    EMBEDDING_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    store = LocalFileStore(str(EMBEDDING_CACHE_DIR))
+    # The namespace is part of every key, so switching models never serves stale vectors.
+    return CacheBackedEmbeddings.from_bytes_store(embeddings, store, namespace=embedding_model_name(embeddings))
+
+def resource_to_document(resource: Dict[str, Any]) -> Document:
+    """Creates the searchable document for a single resource."""
+    # Create searchable text content
+    content = f"""
             Resource: {resource.get('resource_name', 'Unknown')}
             Organization: {resource.get('organization', 'Unknown')}
             Category: {resource.get('category', 'Unknown')}
@@ -70,35 +159,250 @@ class RAGResourceMatcher:
             Advance Booking Required: {resource.get('advance_booking_required', 'Unknown')}
             ADA Accessible: {resource.get('ada_accessible', 'Unknown')}
             """.strip()
-            
-            doc = Document(
-                page_content=content,
-                metadata=resource
-            )
-            documents.append(doc)
-        
-        # Split documents into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=100,
-            separators=["\n\n", "\n", " ", ""]
+    
+    # Chroma only stores scalar metadata values
+    metadata = {k: v for k, v in resource.items() if isinstance(v, (str, int, float, bool))}
+    # Resolve the category once here so searches can pre-filter on it
+    metadata['category'] = _resolve_category(resource, content)
+    # Eligibility filters select resources by id, so every chunk needs one
+    metadata.setdefault('id', get_resource_id(resource))
+    return Document(page_content=content, metadata=metadata)
+
+def split_resource(resource: Dict[str, Any]) -> Tuple[List[Document], List[str]]:
+    """Splits a resource document into chunks and returns them with their vector store ids."""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=100,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    docs = text_splitter.split_documents([resource_to_document(resource)])
+    resource_id = get_resource_id(resource)
+    return docs, [f"{resource_id}::{n}" for n in range(len(docs))]
+
+def create_vector_store(documents: List[Document], embeddings: Embeddings, ids: List[str]) -> VectorStore:
+    """Builds the in-memory vector store selected by VECTOR_STORE_BACKEND."""
+    if VECTOR_STORE_BACKEND == 'numpy':
+        from vector_store import NumpyVectorStore
+        return NumpyVectorStore.from_documents(
+            documents, embeddings, ids=ids,
+            quantization=VECTOR_QUANTIZATION, rescore_oversample=RESCORE_OVERSAMPLE,
         )
-        split_docs = text_splitter.split_documents(documents)
+    if VECTOR_QUANTIZATION != 'none':
+        logging.warning(f"VECTOR_QUANTIZATION={VECTOR_QUANTIZATION} is only supported by the numpy backend; ignoring")
+    # Chroma is only imported when selected; it is the heavier of the two backends
+    from langchain_chroma import Chroma
+    return Chroma.from_documents(documents, embeddings, ids=ids)
+
+class RAGResourceMatcher:
+    def __init__(self, llm: Optional[BaseChatModel] = None, embeddings: Optional[Embeddings] = None):
+        """
+        Builds the matcher over the resource catalog. Models come from the configured
+        MODEL_PROVIDER unless llm/embeddings are injected (benchmarks and offline runs).
+        """
+        # 1. Initialize Chat and Embedding Models
+        self.llm = llm or get_chat_model(temperature=0)
+        self.embeddings = embeddings or get_embeddings()
+        self.embedding_model = embedding_model_name(self.embeddings)
+        self.document_embeddings = build_cached_embeddings(self.embeddings)
+        # Prompt tokens are counted with the chat model's tokenizer; loading it here keeps
+        # the one-off download off the request path
+        self.tokenizer_model = getattr(self.llm, 'model_name', None) or CHAT_MODEL
+        count_tokens("", self.tokenizer_model)
+        self.query_cache = QueryEmbeddingCache(QUERY_CACHE_MAX_BYTES, QUERY_CACHE_TTL_SECONDS)
+        self.result_cache = RecommendationCache(RESULT_CACHE_MAX_ENTRIES)
+        # Incremented on every catalog mutation; part of every result cache key.
+        self.catalog_version = 0
+        # Serializes index writers (upsert/delete); searches do not take this lock.
+        self._index_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._chunk_ids_by_resource: Dict[str, List[str]] = {}
+        self._resource_fingerprints: Dict[str, str] = {}
+        self._catalog_stat: Optional[Tuple[int, int]] = None
+        self.vector_store: Optional[VectorStore] = None
+        self.lexical_index: Optional[LexicalIndex] = None
+        self.eligibility = EligibilityIndex()
+        # Background fills for 'deferred' matches, by result cache key
+        self._deferred_tasks: Dict[Tuple[str, str, int], asyncio.Task] = {}
+        self._deferred_semaphore = asyncio.Semaphore(DEFERRED_CONCURRENCY)
+
+        # 2. Load data, create documents, and build the in-memory vector store
+        try:
+            self._load_resources_and_build_vector_store()
+            logging.info("RAG Resource Matcher initialized successfully")
+        except Exception as e:
+            logging.error(f"Failed to initialize RAG Resource Matcher: {e}", exc_info=True)
+            self.vector_store = None # Ensure it's None if initialization fails
+            if self.lexical_index is not None:
+                logging.warning("Serving lexical-only retrieval until the vector store can be rebuilt.")
+
+    def _load_resources_and_build_vector_store(self):
+        """Loads resource data from JSON and builds the in-memory vector store."""
+        logging.info("Loading resources from JSON and building vector store...")
         
-        # Create the in-memory vector store using Chroma
-        logging.info(f"Creating Chroma index from {len(split_docs)} document chunks...")
-        self.vector_store = Chroma.from_documents(split_docs, self.embeddings)
+        # Load resources from JSON
+        stat = RESOURCES_FILE.stat()
+        with open(RESOURCES_FILE, 'r') as f:
+            resources = json.load(f)
+        self._catalog_stat = (stat.st_mtime_ns, stat.st_size)
+        
+        # Create documents from resources and split them into chunks
+        split_docs, chunk_ids = [], []
+        self._chunk_ids_by_resource = {}
+        self._resource_fingerprints = {}
+        for resource in resources:
+            docs, ids = split_resource(resource)
+            split_docs.extend(docs)
+            chunk_ids.extend(ids)
+            self._chunk_ids_by_resource[get_resource_id(resource)] = ids
+            self._resource_fingerprints[get_resource_id(resource)] = _fingerprint(resource)
+        
+        # Typed eligibility columns, parsed once from the free-text fields
+        self.eligibility = EligibilityIndex()
+        self.eligibility.upsert_many({get_resource_id(resource): resource for resource in resources})
+
+        # The BM25 index needs no network, so it is built first and keeps matching
+        # available even if the vector store cannot be built.
+        lexical_index = LexicalIndex()
+        lexical_index.add_documents(split_docs, chunk_ids)
+        self.lexical_index = lexical_index
+        logging.info(f"Lexical index built over {len(split_docs)} document chunks.")
+        if RETRIEVAL_MODE == 'lexical':
+            return
+
+        # Create the in-memory vector store. Chunk embeddings come from the on-disk
+        # cache when available; only unseen chunk texts hit the embeddings API.
+        logging.info(f"Creating {VECTOR_STORE_BACKEND} index from {len(split_docs)} document chunks...")
+        self.vector_store = create_vector_store(split_docs, self.document_embeddings, chunk_ids)
         logging.info("In-memory vector store created successfully.")
 
+    def upsert_resource(self, resource: Dict[str, Any]) -> None:
+        """
+        Adds or replaces a single resource in the live index.
+        Only this resource's chunks are re-embedded; queries keep running against the
+        store while new chunks are upserted and any stale ones are removed.
+        """
+        if not self.lexical_index:
+            raise RuntimeError("RAG Resource Matcher not initialized.")
+        resource_id = get_resource_id(resource)
+        docs, ids = split_resource(resource)
+        with self._index_lock:
+            if self.vector_store is not None:
+                self.vector_store.add_documents(docs, ids=ids)
+            self.lexical_index.add_documents(docs, ids)
+            self.eligibility.upsert(resource_id, resource)
+            stale_ids = [i for i in self._chunk_ids_by_resource.get(resource_id, []) if i not in ids]
+            if stale_ids:
+                if self.vector_store is not None:
+                    self.vector_store.delete(ids=stale_ids)
+                self.lexical_index.delete(stale_ids)
+            self._chunk_ids_by_resource[resource_id] = ids
+            self._resource_fingerprints[resource_id] = _fingerprint(resource)
+            self._bump_catalog_version()
+        logging.info(f"Upserted resource '{resource_id}' ({len(ids)} chunks) into the vector store.")
+
+    def delete_resource(self, resource_id: str) -> bool:
+        """Removes a resource's chunks from the live index. Returns False if it was not indexed."""
+        if not self.lexical_index:
+            raise RuntimeError("RAG Resource Matcher not initialized.")
+        with self._index_lock:
+            ids = self._chunk_ids_by_resource.pop(str(resource_id), None)
+            if not ids:
+                return False
+            if self.vector_store is not None:
+                self.vector_store.delete(ids=ids)
+            self.lexical_index.delete(ids)
+            self.eligibility.delete(str(resource_id))
+            self._resource_fingerprints.pop(str(resource_id), None)
+            self._bump_catalog_version()
+        logging.info(f"Deleted resource '{resource_id}' from the vector store.")
+        return True
+
+    def refresh_from_disk(self) -> int:
+        """
+        Re-syncs the index with structured_resources.json after an out-of-band edit.
+        Only resources whose content changed are re-embedded. Returns the number of
+        resources upserted or deleted.
+        """
+        stat = RESOURCES_FILE.stat()
+        with open(RESOURCES_FILE, 'r') as f:
+            resources = json.load(f)
+        self._catalog_stat = (stat.st_mtime_ns, stat.st_size)
+
+        current = {get_resource_id(resource): resource for resource in resources}
+        changed = [
+            resource for resource_id, resource in current.items()
+            if self._resource_fingerprints.get(resource_id) != _fingerprint(resource)
+        ]
+        removed = [resource_id for resource_id in list(self._resource_fingerprints) if resource_id not in current]
+        for resource in changed:
+            self.upsert_resource(resource)
+        for resource_id in removed:
+            self.delete_resource(resource_id)
+        if changed or removed:
+            logging.info(f"Catalog file changed: re-indexed {len(changed)} and removed {len(removed)} resources.")
+        return len(changed) + len(removed)
+
+    def _catalog_file_changed(self) -> bool:
+        """Cheap stat() check for out-of-band edits to the catalog file."""
+        try:
+            stat = RESOURCES_FILE.stat()
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) != self._catalog_stat
+
+    def _check_catalog_file(self) -> None:
+        """Refreshes the index when the catalog file was modified."""
+        if not self._catalog_file_changed():
+            return
+        # Only one request pays for the refresh; concurrent ones keep using the current index
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self.refresh_from_disk()
+        except Exception as e:
+            logging.error(f"Failed to refresh catalog from disk: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def _bump_catalog_version(self) -> None:
+        """Advances the catalog version so results computed against the old catalog never hit."""
+        self.catalog_version += 1
+        self.result_cache.invalidate()
+
+    def recommendation_cache_key(self, client_data: Dict[str, Any], resource_type: ResourceTypes) -> Tuple[str, str, int]:
+        """Result cache key for a client profile and resource type(s) at the current catalog version."""
+        self._check_catalog_file()
+        return (_client_fingerprint(client_data), ",".join(_as_resource_types(resource_type)), self.catalog_version)
+
+    async def arecommendation_cache_key(self, client_data: Dict[str, Any], resource_type: ResourceTypes) -> Tuple[str, str, int]:
+        """Async variant of recommendation_cache_key; a catalog refresh runs in a worker thread."""
+        if self._catalog_file_changed():
+            await asyncio.to_thread(self._check_catalog_file)
+        return self.recommendation_cache_key(client_data, resource_type)
+
+    def cache_recommendations(self, key: Tuple[str, str, int], result: Dict[str, Any]) -> None:
+        """Stores a result under a key taken before it was computed."""
+        self.result_cache.put(key, result)
+
+    def get_cached_result(self, key: Tuple[str, str, int], latency_tier: str = 'full') -> Optional[Dict[str, Any]]:
+        """
+        Cached result usable for the tier. A templated result only satisfies 'fast' and
+        'deferred'; 'full' requests treat it as a miss and compute the LLM rationale.
+        """
+        cached = self.result_cache.get(key)
+        if cached is not None and latency_tier == 'full' and cached.get("rationale_source") == "template":
+            return None
+        return cached
+
     def get_recommendations(self, client_data: Dict[str, Any], resource_type: str) -> Dict[str, Any]:
         """
         Enhanced RAG workflow with category filtering for housing, food, and transportation:
         1. Build a query from client data.
-        2. Retrieve relevant documents using vector similarity search.
-        3. Filter results by resource category (housing/food/transportation).
-        4. Use the LLM to generate a summary of the filtered documents.
+        2. Retrieve the top documents within the resource category (housing/food/transportation)
+           using metadata-filtered vector and BM25 search, fused by reciprocal rank (see RETRIEVAL_MODE).
+        3. Use the LLM to generate a summary of the retrieved documents.
         """
-        if not self.vector_store:
+        if not self.lexical_index:
             logging.error("RAG Resource Matcher not initialized. Cannot get recommendations.")
             return {
                 "llm_summary": "Error: The resource matching system is not available.",
@@ -106,61 +410,503 @@ class RAGResourceMatcher:
                 "client_question": ""
             }
             
+        cache_key = self.recommendation_cache_key(client_data, resource_type)
+        cached = self.get_cached_result(cache_key)
+        if cached is not None:
+            return cached
+
         question = self._build_client_question(client_data, resource_type)
 
-        # Retrieve more documents initially to allow for filtering
-        retrieved_docs = self.vector_store.similarity_search(question, k=25)
-        
-        # Filter documents by category
-        filtered_docs = self._filter_by_category(retrieved_docs, resource_type)
-        
-        # Take top 5 after filtering
-        final_docs = filtered_docs[:5]
+        # Retrieve the top documents within the requested category only
+        final_docs = self._retrieve_by_type(question, [resource_type], client_data)[resource_type]
         
+        result = self.summarize_recommendations(question, final_docs, resource_type)
+        self.cache_recommendations(cache_key, result)
+        return result
+
+    async def aget_recommendations(self, client_data: Dict[str, Any], resource_type: str, latency_tier: str = 'full') -> Dict[str, Any]:
+        """
+        Async variant of get_recommendations: embedding, search and the LLM call never block
+        the event loop. latency_tier selects how the rationale is produced (see LATENCY_TIERS).
+        """
+        if not self.lexical_index:
+            logging.error("RAG Resource Matcher not initialized. Cannot get recommendations.")
+            return {
+                "recommendation_reason": "Error: The resource matching system is not available.",
+                "retrieved_recommendations": [],
+                "client_question": ""
+            }
+
+        if latency_tier != 'full':
+            return await self._aget_quick_recommendations(client_data, resource_type, latency_tier)
+
+        cache_key = await self.arecommendation_cache_key(client_data, resource_type)
+        cached = self.get_cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        question = self._build_client_question(client_data, resource_type)
+        final_docs = (await self._aretrieve_by_type(question, [resource_type], client_data))[resource_type]
+
+        result = await self.asummarize_recommendations(question, final_docs, resource_type)
+        self.cache_recommendations(cache_key, result)
+        return result
+
+    async def aget_multi_category_recommendations(self, client_data: Dict[str, Any], resource_types: List[str], latency_tier: str = 'full') -> Dict[str, Any]:
+        """
+        Recommendations for several resource types in one pass: the client question is
+        built and embedded once, each category is searched with the shared query vector,
+        and a single LLM call explains the combined result. latency_tier is as in
+        aget_recommendations.
+        """
+        if not self.lexical_index:
+            logging.error("RAG Resource Matcher not initialized. Cannot get recommendations.")
+            return {
+                "recommendation_reason": "Error: The resource matching system is not available.",
+                "retrieved_recommendations": [],
+                "retrieved_recommendations_by_type": {},
+                "client_question": ""
+            }
+
+        if latency_tier != 'full':
+            return await self._aget_quick_recommendations(client_data, resource_types, latency_tier)
+
+        cache_key = await self.arecommendation_cache_key(client_data, resource_types)
+        cached = self.get_cached_result(cache_key)
+        if cached is not None:
+            return cached
+
+        question = self._build_client_question(client_data, resource_types)
+        docs_by_type = await self._aretrieve_by_type(question, resource_types, client_data)
+        all_docs = [doc for docs in docs_by_type.values() for doc in docs]
+
+        result = await self.asummarize_recommendations(question, all_docs, resource_types)
+        result["retrieved_recommendations_by_type"] = {
+            resource_type: [doc.metadata for doc in docs] for resource_type, docs in docs_by_type.items()
+        }
+        self.cache_recommendations(cache_key, result)
+        return result
+
+    async def _aget_quick_recommendations(self, client_data: Dict[str, Any], resource_type: ResourceTypes, latency_tier: str) -> Dict[str, Any]:
+        """
+        'fast' and 'deferred' tiers: retrieval without waiting on the embeddings API (the
+        cached query vector, else BM25) and a templated rationale instead of the LLM.
+        'deferred' also schedules the full result to replace the cache entry.
+        """
+        resource_types = _as_resource_types(resource_type)
+        cache_key = await self.arecommendation_cache_key(client_data, resource_type)
+        cached = self.get_cached_result(cache_key, latency_tier)
+        if cached is not None:
+            return self.resume_deferred(cached, client_data, resource_type, cache_key, latency_tier)
+
+        question = self._build_client_question(client_data, resource_type)
+        docs_by_type = await self._aretrieve_by_type(question, resource_types, client_data, cached_vector_only=True)
+        all_docs = [doc for docs in docs_by_type.values() for doc in docs]
+
+        result = self.templated_recommendations(client_data, question, all_docs, resource_type)
+        if isinstance(resource_type, list):
+            result["retrieved_recommendations_by_type"] = {
+                rtype: [doc.metadata for doc in docs] for rtype, docs in docs_by_type.items()
+            }
+        if latency_tier == 'deferred':
+            result["rationale_pending"] = self.defer_full_recommendations(client_data, resource_type, cache_key)
+        self.cache_recommendations(cache_key, result)
+        return result
+
+    def templated_recommendations(self, client_data: Dict[str, Any], question: str, documents: List[Document], resource_type: ResourceTypes) -> Dict[str, Any]:
+        """Recommendation payload with a deterministic rationale built from matched eligibility fields."""
+        return {
+            "recommendation_reason": self._templated_rationale(client_data, documents, resource_type),
+            "rationale_source": "template",
+            "retrieved_recommendations": [doc.metadata for doc in documents],
+            "client_question": question
+        }
+
+    def _templated_rationale(self, client_data: Dict[str, Any], documents: List[Document], resource_type: ResourceTypes) -> str:
+        """One sentence per resource naming the eligibility fields it matches the client on."""
+        type_label = _join_resource_types(_as_resource_types(resource_type))
+        if not documents:
+            return f"No eligible {type_label} resources were found for this client."
+        client = ClientEligibility.from_client(client_data, age=_calculate_age(client_data.get('dateOfBirth')))
+        lines = []
+        for doc in documents:
+            name = doc.metadata.get('resource_name') or doc.metadata.get('organization') or 'This resource'
+            record = self.eligibility.get(get_resource_id(doc.metadata))
+            reasons = describe_match(record, client) if record else []
+            if reasons:
+                lines.append(f"{name}: {'; '.join(reasons)}.")
+            else:
+                lines.append(f"{name}: matches the client's {type_label} needs.")
+        return f"Matched {len(documents)} {type_label} resources to this client's profile and eligibility. " + " ".join(lines)
+
+    def defer_full_recommendations(self, client_data: Dict[str, Any], resource_type: ResourceTypes, cache_key: Tuple[str, str, int]) -> bool:
+        """
+        Computes the full (LLM) result in the background and stores it under cache_key,
+        replacing a templated result. Returns False when there is no result cache to fill.
+        """
+        if self.result_cache.max_entries <= 0:
+            return False
+        if cache_key in self._deferred_tasks:
+            return True
+
+        async def fill():
+            try:
+                async with self._deferred_semaphore:
+                    if isinstance(resource_type, list):
+                        await self.aget_multi_category_recommendations(client_data, resource_type)
+                    else:
+                        await self.aget_recommendations(client_data, resource_type)
+            except Exception as e:
+                logging.error(f"Deferred rationale failed: {e}")
+                cached = self.result_cache.get(cache_key)
+                if cached is not None and cached.get("rationale_pending"):
+                    self.cache_recommendations(cache_key, {**cached, "rationale_pending": False})
+
+        task = asyncio.create_task(fill())
+        self._deferred_tasks[cache_key] = task
+        task.add_done_callback(lambda _: self._deferred_tasks.pop(cache_key, None))
+        return True
+
+    def resume_deferred(self, cached: Dict[str, Any], client_data: Dict[str, Any], resource_type: ResourceTypes,
+                        cache_key: Tuple[str, str, int], latency_tier: str) -> Dict[str, Any]:
+        """
+        A cached result as served to a latency tier. A 'deferred' request that finds a
+        templated result no fill is working on (one left by a 'fast' request) schedules
+        the full result, as a 'deferred' miss would.
+        """
+        if latency_tier != 'deferred' or cached.get("rationale_source") != "template":
+            return cached
+        pending = self.defer_full_recommendations(client_data, resource_type, cache_key)
+        if cached.get("rationale_pending") == pending:
+            return cached
+        result = {**cached, "rationale_pending": pending}
+        self.cache_recommendations(cache_key, result)
+        return result
+
+    def _retrieve_by_type(self, question: str, resource_types: List[str], client_data: Dict[str, Any]) -> Dict[str, List[Document]]:
+        """
+        Embeds the question once and runs one filtered search per resource type.
+        Resources the client is ineligible for are excluded by the search filter itself.
+        """
+        eligible_ids = self._eligible_ids(client_data)
+        if eligible_ids == []:
+            return {resource_type: [] for resource_type in resource_types}
+        query_vector = self._query_vector(question)
+        docs_by_type = {}
+        for resource_type in resource_types:
+            search_filter = self._search_filter(resource_type, eligible_ids)
+            docs_by_type[resource_type] = self._fuse(
+                question,
+                self._vector_hits(query_vector, search_filter),
+                search_filter,
+                lexical=query_vector is None or RETRIEVAL_MODE == 'hybrid',
+            )
+        return docs_by_type
+
+    async def _aretrieve_by_type(
+        self, question: str, resource_types: List[str], client_data: Dict[str, Any], cached_vector_only: bool = False
+    ) -> Dict[str, List[Document]]:
+        """
+        Async variant of _retrieve_by_type. With cached_vector_only the embeddings API is
+        never called: an uncached question is retrieved with BM25 alone.
+        """
+        eligible_ids = self._eligible_ids(client_data)
+        if eligible_ids == []:
+            return {resource_type: [] for resource_type in resource_types}
+        filters = [self._search_filter(resource_type, eligible_ids) for resource_type in resource_types]
+        if cached_vector_only:
+            query_vector = self._cached_query_vector(question)
+        else:
+            query_vector = await self._aquery_vector(question)
+        if query_vector is None:
+            vector_lists = [[] for _ in resource_types]
+        else:
+            vector_lists = await asyncio.gather(*[
+                self.vector_store.asimilarity_search_by_vector(query_vector, k=self._vector_depth(), filter=search_filter)
+                for search_filter in filters
+            ])
+        return {
+            resource_type: self._fuse(
+                question,
+                vector_docs,
+                search_filter,
+                lexical=query_vector is None or RETRIEVAL_MODE == 'hybrid',
+            )
+            for resource_type, search_filter, vector_docs in zip(resource_types, filters, vector_lists)
+        }
+
+    def _eligible_ids(self, client_data: Dict[str, Any]) -> Optional[List[str]]:
+        """Ids of resources the client is eligible for, or None when no resource is ruled out."""
+        client = ClientEligibility.from_client(client_data, age=_calculate_age(client_data.get('dateOfBirth')))
+        return self.eligibility.eligible_ids(client)
+
+    def _search_filter(self, resource_type: str, eligible_ids: Optional[List[str]]) -> Optional[Dict[str, Any]]:
+        """Combines the category filter with the client's eligibility, in Chroma filter syntax."""
+        category_filter = self._category_filter(resource_type)
+        if eligible_ids is None:
+            return category_filter
+        eligibility_filter = {"id": {"$in": eligible_ids}}
+        if category_filter is None:
+            return eligibility_filter
+        return {"$and": [category_filter, eligibility_filter]}
+
+    def _query_vector(self, question: str) -> Optional[List[float]]:
+        """The question's embedding, or None when retrieval should be lexical only."""
+        vectors = self._query_vectors([question])
+        return vectors[0] if vectors else None
+
+    async def _aquery_vector(self, question: str) -> Optional[List[float]]:
+        """Async variant of _query_vector."""
+        vectors = await self._aquery_vectors([question])
+        return vectors[0] if vectors else None
+
+    def _cached_query_vector(self, question: str) -> Optional[List[float]]:
+        """The question's embedding if it is already in the query cache, else None."""
+        if RETRIEVAL_MODE == 'lexical' or self.vector_store is None:
+            return None
+        return self.query_cache.get(self.embedding_model, question)
+
+    def _vector_depth(self) -> int:
+        """How many vector hits to read: enough chunks to fill TOP_K distinct resources after collapsing."""
+        return FUSION_DEPTH
+
+    def _vector_hits(self, query_vector: Optional[List[float]], search_filter: Optional[Dict[str, Any]]) -> List[Document]:
+        if query_vector is None:
+            return []
+        return self.vector_store.similarity_search_by_vector(query_vector, k=self._vector_depth(), filter=search_filter)
+
+    async def _avector_hits(self, query_vector: List[float], search_filter: Optional[Dict[str, Any]], skip: bool = False) -> List[Document]:
+        if skip:
+            # Chroma rejects an empty $in, so clients eligible for nothing skip the search
+            return []
+        return await self.vector_store.asimilarity_search_by_vector(query_vector, k=self._vector_depth(), filter=search_filter)
+
+    def _fuse(self, question: str, vector_docs: List[Document], search_filter: Optional[Dict[str, Any]], lexical: bool) -> List[Document]:
+        """
+        Final ranking: combines vector hits with BM25 hits for the question using reciprocal
+        rank fusion, collapses chunks to unique resources and optionally diversifies with MMR.
+        Returns one chunk per resource, at most TOP_K.
+        """
+        rankings = [vector_docs] if vector_docs else []
+        if lexical:
+            rankings.append([doc for doc, _ in self.lexical_index.search(question, k=FUSION_DEPTH, filter=search_filter)])
+        scored = reciprocal_rank_scores(rankings, key=_chunk_key, k=RRF_K)
+        resources = collapse_by_resource(
+            scored, key=lambda doc: get_resource_id(doc.metadata), aggregate=RESOURCE_SCORE_AGGREGATION
+        )
+        if MMR_LAMBDA < 1.0 and len(resources) > TOP_K:
+            resources = self._diversify(resources)
+        return [doc for doc, _ in resources[:TOP_K]]
+
+    def _diversify(self, resources: List[Tuple[Document, float]]) -> List[Tuple[Document, float]]:
+        """
+        Reorders collapsed resources by maximal marginal relevance, using the chunk vectors
+        already held by the vector store. Left as is when vectors are unavailable.
+        """
+        vectors = self._stored_vectors([doc for doc, _ in resources])
+        if vectors is None:
+            return resources
+        scores = np.array([score for _, score in resources])
+        selected = maximal_marginal_relevance(scores, vectors, k=TOP_K, lambda_mult=MMR_LAMBDA)
+        return [resources[i] for i in selected]
+
+    def _stored_vectors(self, documents: List[Document]) -> Optional[np.ndarray]:
+        """Stored embeddings for the given chunks, read from the vector store (no embeddings API call)."""
+        if self.vector_store is None:
+            return None
+        resource_ids = sorted({get_resource_id(doc.metadata) for doc in documents})
+        try:
+            stored = self.vector_store.get(where={"id": {"$in": resource_ids}}, include=["documents", "embeddings"])
+        except Exception as e:
+            logging.warning(f"Could not read stored vectors for diversification: {e}")
+            return None
+        # Identical chunk text always has an identical embedding, so the text is a safe key
+        by_text = dict(zip(stored["documents"], stored["embeddings"]))
+        if any(doc.page_content not in by_text for doc in documents):
+            return None
+        return np.asarray([by_text[doc.page_content] for doc in documents], dtype=np.float32)
+
+    async def astream_recommendations(self, client_data: Dict[str, Any], resource_type: ResourceTypes) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streams a recommendation as events so callers can show results before the LLM finishes.
+
+        Yields a "retrieved" event as soon as vector search returns, then one "token"
+        event per LLM chunk of the rationale, then a "done" event carrying the full
+        payload (the same shape get_recommendations returns). A cached result is
+        replayed as "retrieved" followed directly by "done".
+        """
+        if not self.lexical_index:
+            logging.error("RAG Resource Matcher not initialized. Cannot get recommendations.")
+            yield {"event": "error", "detail": "The resource matching system is not available."}
+            return
+
+        resource_types = _as_resource_types(resource_type)
+        cache_key = await self.arecommendation_cache_key(client_data, resource_type)
+        cached = self.get_cached_result(cache_key)
+        if cached is not None:
+            yield {
+                "event": "retrieved",
+                "retrieved_recommendations": cached["retrieved_recommendations"],
+                "client_question": cached["client_question"],
+                "cached": True,
+            }
+            yield {"event": "done", "recommendations": cached}
+            return
+
+        question = self._build_client_question(client_data, resource_type)
+        docs_by_type = await self._aretrieve_by_type(question, resource_types, client_data)
+        all_docs = [doc for docs in docs_by_type.values() for doc in docs]
+        retrieved = {
+            "event": "retrieved",
+            "retrieved_recommendations": [doc.metadata for doc in all_docs],
+            "client_question": question,
+            "cached": False,
+        }
+        if isinstance(resource_type, list):
+            retrieved["retrieved_recommendations_by_type"] = {
+                rtype: [doc.metadata for doc in docs] for rtype, docs in docs_by_type.items()
+            }
+        yield retrieved
+
+        chunks = []
+        async for text in self._astream_llm_summary(question, all_docs, resource_type):
+            chunks.append(text)
+            yield {"event": "token", "text": text}
+
+        result = {
+            "recommendation_reason": "".join(chunks),
+            "rationale_source": "llm",
+            "retrieved_recommendations": retrieved["retrieved_recommendations"],
+            "client_question": question
+        }
+        if "retrieved_recommendations_by_type" in retrieved:
+            result["retrieved_recommendations_by_type"] = retrieved["retrieved_recommendations_by_type"]
+        self.cache_recommendations(cache_key, result)
+        yield {"event": "done", "recommendations": result}
+
+    async def aretrieve_batch(self, requests: List[Tuple[Dict[str, Any], str]]) -> List[Tuple[str, List[Document]]]:
+        """
+        Retrieval for many (client_data, resource_type) pairs at once.
+        All questions are embedded in one embeddings request, and on the NumPy backend
+        every query is scored in a single matrix operation.
+        Returns (question, documents) per request, in input order.
+        """
+        if not self.lexical_index:
+            raise RuntimeError("RAG Resource Matcher not initialized.")
+        if not requests:
+            return []
+        questions = [self._build_client_question(client, resource_type) for client, resource_type in requests]
+        eligible = [self._eligible_ids(client) for client, _ in requests]
+        filters = [self._search_filter(resource_type, ids) for (_, resource_type), ids in zip(requests, eligible)]
+        vectors = await self._aquery_vectors(questions)
+
+        if vectors is None:
+            doc_lists = [[] for _ in questions]
+        elif hasattr(self.vector_store, 'asimilarity_search_by_vectors_with_score'):
+            # One in-memory matrix product, on the event loop unless quantized rows are rescored
+            hits = await self.vector_store.asimilarity_search_by_vectors_with_score(vectors, k=self._vector_depth(), filters=filters)
+            doc_lists = [[doc for doc, _ in row] for row in hits]
+        else:
+            doc_lists = await asyncio.gather(*[
+                self._avector_hits(vector, row_filter, skip=ids == [])
+                for vector, row_filter, ids in zip(vectors, filters, eligible)
+            ])
+        lexical = vectors is None or RETRIEVAL_MODE == 'hybrid'
+        return [
+            (question, self._fuse(question, docs, row_filter, lexical))
+            for question, docs, row_filter in zip(questions, doc_lists, filters)
+        ]
+
+    def _query_vectors(self, questions: List[str]) -> Optional[List[List[float]]]:
+        """Embeddings for the questions, or None when retrieval should be lexical only."""
+        if RETRIEVAL_MODE == 'lexical' or self.vector_store is None:
+            return None
+        try:
+            return self._embed_queries(questions)
+        except Exception as e:
+            logging.warning(f"Query embedding failed, falling back to lexical retrieval: {e}")
+            return None
+
+    async def _aquery_vectors(self, questions: List[str]) -> Optional[List[List[float]]]:
+        """Async variant of _query_vectors."""
+        if RETRIEVAL_MODE == 'lexical' or self.vector_store is None:
+            return None
+        try:
+            return await self._aembed_queries(questions)
+        except Exception as e:
+            logging.warning(f"Query embedding failed, falling back to lexical retrieval: {e}")
+            return None
+
+    def _embed_queries(self, questions: List[str]) -> List[List[float]]:
+        """
+        Embeds query texts through the query embedding cache.
+        All cache misses are sent to the embeddings API in a single request.
+        """
+        vectors: List[Optional[List[float]]] = [self.query_cache.get(self.embedding_model, q) for q in questions]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            fresh = self.embeddings.embed_documents([questions[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                self.query_cache.put(self.embedding_model, questions[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    async def _aembed_queries(self, questions: List[str]) -> List[List[float]]:
+        """Async variant of _embed_queries."""
+        vectors: List[Optional[List[float]]] = [self.query_cache.get(self.embedding_model, q) for q in questions]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            fresh = await self.embeddings.aembed_documents([questions[i] for i in missing])
+            for i, vector in zip(missing, fresh):
+                self.query_cache.put(self.embedding_model, questions[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Counters for the matcher's in-memory caches."""
+        return {
+            # 'lexical' here in vector/hybrid mode means the vector store is unavailable
+            "retrieval_mode": RETRIEVAL_MODE if self.vector_store is not None else "lexical",
+            "catalog_version": self.catalog_version,
+            "query_embeddings": self.query_cache.stats(),
+            "recommendations": self.result_cache.stats(),
+        }
+
+    def summarize_recommendations(self, question: str, documents: List[Document], resource_type: ResourceTypes) -> Dict[str, Any]:
+        """Generates the LLM rationale for retrieved documents and shapes the recommendation payload."""
         # Prepare recommendations for the final output
-        final_recommendations = [doc.metadata for doc in final_docs]
+        final_recommendations = [doc.metadata for doc in documents]
 
         # Generate the final summary using the LLM
-        recommendation_reason = self._generate_llm_summary(question, final_docs, resource_type)
+        recommendation_reason = self._generate_llm_summary(question, documents, resource_type)
         
         return {
             "recommendation_reason": recommendation_reason,
+            "rationale_source": "llm",
             "retrieved_recommendations": final_recommendations,
             "client_question": question
         }
 
-    def _filter_by_category(self, documents: List[Document], resource_type: str) -> List[Document]:
-        """Filter documents by resource category with enhanced keyword matching."""
-        if resource_type not in ['food', 'housing', 'transportation']:
-            return documents
-            
-        filtered = []
-        for doc in documents:
-            # Primary filter: check if the document has category metadata
-            if 'category' in doc.metadata:
-                if doc.metadata['category'] == resource_type:
-                    filtered.append(doc)
-            else:
-                # Fallback: check content for category indicators
-                content = doc.page_content.lower()
-                if resource_type == 'food':
-                    food_keywords = ['food', 'meal', 'pantry', 'nutrition', 'grocery', 'hunger', 'feeding', 'csfp', 'snap', 'tefap']
-                    if any(keyword in content for keyword in food_keywords):
-                        filtered.append(doc)
-                elif resource_type == 'housing':
-                    housing_keywords = ['housing', 'shelter', 'bed', 'room', 'apartment', 'home', 'residence', 'accommodation', 'lodging']
-                    if any(keyword in content for keyword in housing_keywords):
-                        filtered.append(doc)
-                elif resource_type == 'transportation':
-                    transport_keywords = ['transportation', 'transport', 'ride', 'bus', 'taxi', 'medical transport', 'mobility', 'travel', 'transit']
-                    if any(keyword in content for keyword in transport_keywords):
-                        filtered.append(doc)
-        
-        return filtered
+    async def asummarize_recommendations(self, question: str, documents: List[Document], resource_type: ResourceTypes) -> Dict[str, Any]:
+        """Async variant of summarize_recommendations."""
+        recommendation_reason = await self._agenerate_llm_summary(question, documents, resource_type)
+        return {
+            "recommendation_reason": recommendation_reason,
+            "rationale_source": "llm",
+            "retrieved_recommendations": [doc.metadata for doc in documents],
+            "client_question": question
+        }
 
-    def _build_client_question(self, client_data: Dict[str, Any], resource_type: str) -> str:
+    def _category_filter(self, resource_type: str) -> Optional[Dict[str, str]]:
+        """Returns the metadata filter for a resource type, or None to search the whole catalog."""
+        if resource_type not in CATEGORY_KEYWORDS:
+            return None
+        return {"category": resource_type}
+
+    def _build_client_question(self, client_data: Dict[str, Any], resource_type: ResourceTypes) -> str:
         """Builds a detailed question string from client data for vector search."""
-        parts = [f"Find {resource_type} resources for a client."]
+        resource_types = _as_resource_types(resource_type)
+        parts = [f"Find {_join_resource_types(resource_types)} resources for a client."]
         
         # Extract age from dateOfBirth if available
         age = None
@@ -188,12 +934,13 @@ class RAGResourceMatcher:
             parts.append(f"Has disability: {'Yes' if client_data['has_disability'] else 'No'}.")
         
         # Add specific needs based on resource type
-        if resource_type == 'food':
-            parts.append("Looking for food assistance, meals, pantries, or nutrition programs.")
-        elif resource_type == 'housing':
-            parts.append("Looking for housing assistance, shelter, or accommodation.")
-        elif resource_type == 'transportation':
-            parts.append("Looking for transportation assistance, rides, or mobility services.")
+        for needed_type in resource_types:
+            if needed_type == 'food':
+                parts.append("Looking for food assistance, meals, pantries, or nutrition programs.")
+            elif needed_type == 'housing':
+                parts.append("Looking for housing assistance, shelter, or accommodation.")
+            elif needed_type == 'transportation':
+                parts.append("Looking for transportation assistance, rides, or mobility services.")
         
         # Use the detailed notes for context
         if client_data.get('notes'):
@@ -205,20 +952,42 @@ class RAGResourceMatcher:
             
         return " ".join(parts)
 
-    def _generate_llm_summary(self, question: str, documents: List[Document], resource_type: str) -> str:
+    def _generate_llm_summary(self, question: str, documents: List[Document], resource_type: ResourceTypes) -> str:
         """Uses the LLM to generate a helpful summary of the top recommended resources."""
         if not documents:
-            return f"No matching {resource_type} resources were found for this client."
-
-        # Extract metadata and page content for the prompt
-        context = "\n\n---\n\n".join([
-            f"Resource: {doc.metadata.get('resource_name', 'N/A')}\n"
-            f"Organization: {doc.metadata.get('organization', 'N/A')}\n"
-            f"Contact: {doc.metadata.get('contact', 'N/A')}\n"
-            f"Target Population: {doc.metadata.get('target_population', 'N/A')}\n"
-            f"Details: {doc.page_content}"
-            for doc in documents
-        ])
+            return f"No matching {_join_resource_types(_as_resource_types(resource_type))} resources were found for this client."
+        prompt, inputs = self._summary_prompt(question, documents, resource_type)
+        response = (prompt | self.llm).invoke(inputs)
+        return response.content if hasattr(response, 'content') else str(response)
+
+    async def _agenerate_llm_summary(self, question: str, documents: List[Document], resource_type: ResourceTypes) -> str:
+        """Async variant of _generate_llm_summary."""
+        if not documents:
+            return f"No matching {_join_resource_types(_as_resource_types(resource_type))} resources were found for this client."
+        prompt, inputs = self._summary_prompt(question, documents, resource_type)
+        response = await (prompt | self.llm).ainvoke(inputs)
+        return response.content if hasattr(response, 'content') else str(response)
+
+    async def _astream_llm_summary(self, question: str, documents: List[Document], resource_type: ResourceTypes) -> AsyncIterator[str]:
+        """Streaming variant of _generate_llm_summary: yields the rationale text as the LLM produces it."""
+        if not documents:
+            yield f"No matching {_join_resource_types(_as_resource_types(resource_type))} resources were found for this client."
+            return
+        prompt, inputs = self._summary_prompt(question, documents, resource_type)
+        async for chunk in (prompt | self.llm).astream(inputs):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if text:
+                yield text
+
+    def _summary_prompt(self, question: str, documents: List[Document], resource_type: ResourceTypes) -> Tuple[PromptTemplate, Dict[str, str]]:
+        """Builds the summary prompt and its inputs for the retrieved documents and logs its token count."""
+        resource_types = _as_resource_types(resource_type)
+        resource_type_label = _join_resource_types(resource_types)
+
+        # Compact, budgeted resource fields; the chunk text only repeats them
+        context, context_tokens = build_context(
+            documents, PROMPT_CONTEXT_MAX_TOKENS * len(resource_types), self.tokenizer_model
+        )
 
         resource_type_context = {
             'food': "food assistance, meals, pantries, or nutrition programs",
@@ -236,14 +1005,16 @@ class RAGResourceMatcher:
             "Recommendation for Social Worker:"
         )
         
-        chain = prompt | self.llm
-        response = chain.invoke({
+        inputs = {
             "question": question, 
             "context": context,
-            "resource_type": resource_type,
-            "resource_type_desc": resource_type_context.get(resource_type, f"{resource_type} services")
-        })
-        return response.content if hasattr(response, 'content') else str(response)
+            "resource_type": resource_type_label,
+            "resource_type_desc": "; ".join(
+                resource_type_context.get(t, f"{t} services") for t in resource_types
+            )
+        }
+        log_prompt_tokens(prompt.format(**inputs), self.tokenizer_model, len(documents), context_tokens)
+        return prompt, inputs
 
 # Helper to calculate age, in case it's needed elsewhere
 from datetime import datetime
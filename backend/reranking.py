@@ -0,0 +1,64 @@
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+AGGREGATIONS = ('max', 'sum')
+
+
+def collapse_by_resource(
+    scored: List[Tuple[Document, float]],
+    key: Callable[[Document], Hashable],
+    aggregate: str = 'max',
+) -> List[Tuple[Document, float]]:
+    """
+    Collapses chunk hits to one entry per resource, best first.
+
+    'max' scores a resource by its best chunk; 'sum' adds its chunks' scores, so a
+    resource matching in several places ranks above one matching once. The resource
+    is represented by its best-scoring chunk.
+    """
+    if aggregate not in AGGREGATIONS:
+        raise ValueError(f"aggregate must be one of {', '.join(AGGREGATIONS)}, got '{aggregate}'")
+    best: Dict[Hashable, Tuple[Document, float]] = {}
+    totals: Dict[Hashable, float] = {}
+    for document, score in scored:
+        resource = key(document)
+        if resource not in best or score > best[resource][1]:
+            best[resource] = (document, score)
+        totals[resource] = totals.get(resource, 0.0) + score
+    collapsed = [
+        (document, totals[resource] if aggregate == 'sum' else score)
+        for resource, (document, score) in best.items()
+    ]
+    return sorted(collapsed, key=lambda item: item[1], reverse=True)
+
+
+def maximal_marginal_relevance(scores: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """
+    Greedy MMR selection over candidates. Returns the indices of up to k candidates.
+
+    Relevance is the candidates' own retrieval score, min-max scaled to [0, 1], so
+    fused BM25 + vector rankings can be diversified without a query embedding.
+    Redundancy is the cosine similarity to the closest already-selected candidate.
+    lambda_mult=1 keeps the relevance order; lower values favour diversity.
+    """
+    if len(scores) == 0 or k <= 0:
+        return []
+    scores = np.asarray(scores, dtype=np.float64)
+    spread = scores.max() - scores.min()
+    relevance = (scores - scores.min()) / spread if spread > 0 else np.ones(len(scores))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    unit = vectors / norms
+    similarity = unit @ unit.T
+
+    selected = [int(np.argmax(relevance))]
+    closest = similarity[selected[0]].copy()
+    while len(selected) < min(k, len(scores)):
+        mmr = lambda_mult * relevance - (1 - lambda_mult) * closest
+        mmr[selected] = -np.inf
+        chosen = int(np.argmax(mmr))
+        selected.append(chosen)
+        closest = np.maximum(closest, similarity[chosen])
+    return selected
@@ -1,14 +1,20 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
+import asyncio
+import contextlib
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 from pathlib import Path
 from datetime import datetime
-from rag_resource_matcher import RAGResourceMatcher
+from client_listing import InvalidCursorError, decode_cursor, encode_cursor, parse_fields, project_client
+from client_store import CLIENT_ORDERS, ClientFilter, ClientNotFoundError, ResourceNotFoundError, get_client_store
+from llm_gateway import LLM_RETRY_AFTER_SECONDS, GatewayOverloadedError, GatewayTimeoutError, close_gateway, get_gateway
+from rag_resource_matcher import LATENCY_TIERS, RAGResourceMatcher, get_resource_id
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,36 +36,82 @@ app.add_middleware(
 
 # Get the directory where the script is located
 SCRIPT_DIR = Path(__file__).parent.absolute()
-CLIENTS_FILE = SCRIPT_DIR / 'clients.json'
-
-# Initialize RAG Resource Matcher
-try:
-    rag_matcher = RAGResourceMatcher()
-    logger.info("RAG Resource Matcher initialized successfully")
-except Exception as e:
-    logger.error(f"FATAL: Failed to initialize RAG Resource Matcher: {e}")
-    raise  # Re-raise the exception to stop the server from starting
-
-def load_clients():
-    """Load clients from JSON file."""
-    try:
-        if CLIENTS_FILE.exists():
-            with open(CLIENTS_FILE, 'r') as f:
-                return json.load(f)
-        return {'clients': [], 'next_id': 1}
-    except Exception as e:
-        logger.error(f"Error loading clients: {e}")
-        return {'clients': [], 'next_id': 1}
 
-def save_clients(clients_data):
-    """Save clients to JSON file."""
-    try:
-        with open(CLIENTS_FILE, 'w') as f:
-            json.dump(clients_data, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving clients: {e}")
-        return False
+# Caseload storage, shared with the voice assistant functions (see CLIENT_STORE_BACKEND)
+client_store = get_client_store()
+
+# Client list pages: default and largest page size
+CLIENT_PAGE_SIZE = int(os.environ.get("CLIENT_PAGE_SIZE", 50))
+CLIENT_PAGE_MAX = int(os.environ.get("CLIENT_PAGE_MAX", 200))
+
+RESOURCE_STATUSES = ['pending', 'contacted', 'in_progress', 'completed', 'declined', 'not_eligible']
+# Caseload stats: each category's filter, on top of the stats request's own filters
+CLIENT_STAT_FILTERS = {
+    'urgent': {'urgent': True},
+    'housing': {'needs': ('housing',)},
+    'food': {'needs': ('food',)},
+    'mental_health': {'needs': ('mental health',)},
+}
+
+# Batch matching limits
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 200))
+BATCH_LLM_CONCURRENCY = int(os.environ.get("BATCH_LLM_CONCURRENCY", 4))
+
+# Matcher warm-up: seconds clients are told to wait, and the delay between failed build attempts
+MATCHER_RETRY_AFTER_SECONDS = int(os.environ.get("MATCHER_RETRY_AFTER_SECONDS", 5))
+MATCHER_INIT_RETRY_SECONDS = float(os.environ.get("MATCHER_INIT_RETRY_SECONDS", 30))
+
+# The RAG Resource Matcher is built in the background after startup so the server
+# accepts connections (and serves client/resource endpoints) while the catalog is embedded.
+rag_matcher = None
+rag_matcher_error = None
+
+async def initialize_rag_matcher():
+    """Builds the matcher off the event loop, retrying until it succeeds."""
+    global rag_matcher, rag_matcher_error
+    while rag_matcher is None:
+        try:
+            start = datetime.now()
+            gateway = get_gateway()
+            rag_matcher = await run_in_threadpool(
+                RAGResourceMatcher, llm=gateway.chat_model(temperature=0, route='match'), embeddings=gateway.embeddings()
+            )
+            rag_matcher_error = None
+            logger.info(f"RAG Resource Matcher initialized in {(datetime.now() - start).total_seconds():.1f}s")
+        except Exception as e:
+            rag_matcher_error = str(e)
+            logger.error(f"Failed to initialize RAG Resource Matcher, retrying in {MATCHER_INIT_RETRY_SECONDS}s: {e}")
+            await asyncio.sleep(MATCHER_INIT_RETRY_SECONDS)
+
+@app.on_event("startup")
+async def start_rag_matcher():
+    # One pooled LLM gateway serves every model call; create it before anything needs it
+    get_gateway()
+    # Keep a reference so the task is not garbage collected mid-build
+    app.state.rag_matcher_task = asyncio.create_task(initialize_rag_matcher())
+
+@app.on_event("shutdown")
+async def stop_llm_gateway():
+    await close_gateway()
+
+def require_rag_matcher():
+    """Returns the matcher, or raises a fast 503 with Retry-After while it is still warming up."""
+    if rag_matcher is None:
+        detail = "Resource matcher is warming up, please retry shortly"
+        if rag_matcher_error:
+            detail = f"Resource matcher failed to initialize and is retrying: {rag_matcher_error}"
+        raise HTTPException(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(MATCHER_RETRY_AFTER_SECONDS)}
+        )
+    return rag_matcher
+
+def llm_gateway_error(e: Exception) -> HTTPException:
+    """429 with Retry-After when an LLM route is saturated, 504 when its calls timed out."""
+    if isinstance(e, GatewayOverloadedError):
+        return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    return HTTPException(status_code=504, detail=str(e))
 
 def ensure_structure_exists(data: Dict[str, Any], path: str) -> None:
     """Ensure all intermediate dictionaries exist in the path."""
@@ -163,21 +215,10 @@ async def add_client(client_data: Dict[str, Any]):
         # Validate and clean the client data
         client_data = validate_client_data(client_data)
         
-        # Load existing clients
-        clients_data = load_clients()
-        
-        # Assign an ID to the new client
-        client_data['id'] = clients_data['next_id']
-        clients_data['next_id'] += 1
-        
-        # Add the new client to the list
-        clients_data['clients'].append(client_data)
+        # Store the client under the next unused ID; returns once it is durable
+        commit = await run_in_threadpool(client_store.add_client, client_data)
         
-        # Save the updated clients data
-        if save_clients(clients_data):
-            return {"message": "Client added successfully", "client": client_data}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to save client data")
+        return {"message": "Client added successfully", "client": commit.value, "version": commit.version}
             
     except HTTPException as e:
         raise e
@@ -185,38 +226,121 @@ async def add_client(client_data: Dict[str, Any]):
         logger.error(f"Error adding client: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def split_param(value: Optional[str]) -> tuple:
+    """Comma-separated query parameter as a tuple of non-empty values."""
+    return tuple(part.strip() for part in (value or '').split(',') if part.strip())
+
+def client_filter(needs: Optional[str] = None, veteran: Optional[bool] = None, status: Optional[str] = None,
+                  search: Optional[str] = None, urgent: Optional[bool] = None) -> ClientFilter:
+    """ClientFilter from the client list query parameters."""
+    statuses = split_param(status)
+    invalid = [s for s in statuses if s not in RESOURCE_STATUSES]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid status {invalid}. Must be one of: {RESOURCE_STATUSES}")
+    return ClientFilter(
+        needs=split_param(needs), veteran=veteran, resource_statuses=statuses,
+        search=(search or '').strip(), urgent=urgent,
+    )
+
 @app.get('/api/recent-clients')
-async def get_recent_clients():
-    """Get all clients."""
+async def get_recent_clients(
+    limit: int = CLIENT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    needs: Optional[str] = None,
+    veteran: Optional[bool] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+    urgent: Optional[bool] = None,
+    sort: str = 'recent',
+    fields: Optional[str] = None,
+):
+    """
+    Get a page of clients, most recently updated first (sort=recent) or by name
+    (sort=name).
+
+    needs (comma-separated, any may match), veteran, status (of an assigned
+    resource, comma-separated), search (name, phone or email) and urgent filter on
+    the server. Rows are summaries unless fields= names the (dotted) fields to
+    return, or is '*' for whole clients. Pass next_cursor back as cursor, with the
+    same sort, for the following page.
+    """
     try:
-        clients_data = load_clients()
-        return {"clients": clients_data['clients']}
+        if not 1 <= limit <= CLIENT_PAGE_MAX:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {CLIENT_PAGE_MAX}")
+        if sort not in CLIENT_ORDERS:
+            raise HTTPException(status_code=400, detail=f"Invalid sort '{sort}'. Must be one of: {list(CLIENT_ORDERS)}")
+        filters = client_filter(needs, veteran, status, search, urgent)
+        try:
+            after = decode_cursor(cursor, sort) if cursor else None
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        clients, next_key = await run_in_threadpool(client_store.page_clients, limit, after, filters, sort)
+        paths = parse_fields(fields)
+
+        return {
+            "clients": [project_client(client, paths) for client in clients],
+            "next_cursor": encode_cursor(next_key, sort) if next_key else None
+        }
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error getting recent clients: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get('/api/recent-clients/stats')
+async def get_client_stats(
+    veteran: Optional[bool] = None,
+    status: Optional[str] = None,
+    search: Optional[str] = None,
+):
+    """
+    Caseload counts for the client list: the total matching the filters, and how
+    many of those are urgent or need housing, food or mental health support.
+    """
+    try:
+        filters = client_filter(veteran=veteran, status=status, search=search)
+
+        def count_all() -> Dict[str, int]:
+            counts = {'total': client_store.count_clients(filters)}
+            for name, category in CLIENT_STAT_FILTERS.items():
+                counts[name] = client_store.count_clients(filters._replace(**category))
+            return counts
+
+        return await run_in_threadpool(count_all)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error getting client stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get('/api/clients/{client_id}')
+async def get_client(client_id: int):
+    """Get a client's full record."""
+    try:
+        client = await run_in_threadpool(client_store.get_client, client_id)
+
+        if not client:
+            raise HTTPException(status_code=404, detail="Client not found")
+
+        return {"client": client}
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error getting client: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.delete('/api/clients/{client_id}')
 async def delete_client(client_id: int):
     """Delete a client by ID."""
     try:
-        # Load existing clients
-        clients_data = load_clients()
-        
-        # Find the client to delete
-        client_to_delete = None
-        for i, client in enumerate(clients_data['clients']):
-            if client['id'] == client_id:
-                client_to_delete = clients_data['clients'].pop(i)
-                break
+        commit = await run_in_threadpool(client_store.delete_client, client_id)
         
-        if not client_to_delete:
+        if not commit.value:
             raise HTTPException(status_code=404, detail="Client not found")
         
-        # Save the updated clients data
-        if save_clients(clients_data):
-            return {"message": "Client deleted successfully", "deleted_client": client_to_delete}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to save client data")
+        return {"message": "Client deleted successfully", "deleted_client": commit.value, "version": commit.version}
             
     except HTTPException as e:
         raise e
@@ -273,6 +397,29 @@ async def get_resources():
         logger.error(f"Error getting resources: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def find_resource_index(resources, resource_name):
+    """Find a resource by its display name (or id) and return its index, or None."""
+    for i, resource in enumerate(resources):
+        if resource_name in (resource.get('resource_name'), resource.get('name'), resource.get('id')):
+            return i
+    return None
+
+async def sync_resource_index(resource=None, deleted_id=None):
+    """Apply a resource mutation to the live RAG index. Returns True if the index was updated."""
+    if rag_matcher is None:
+        # Still warming up: the build reads the saved catalog, and any write it misses
+        # is picked up by the matcher's catalog file check once it is ready
+        return False
+    try:
+        if resource is not None:
+            await run_in_threadpool(rag_matcher.upsert_resource, resource)
+        elif deleted_id is not None:
+            await run_in_threadpool(rag_matcher.delete_resource, deleted_id)
+        return True
+    except Exception as e:
+        logger.error(f"Error updating RAG index: {e}")
+        return False
+
 @app.put('/api/resources/{resource_name}')
 async def update_resource(resource_name: str, resource_data: Dict[str, Any]):
     """Update a resource by name."""
@@ -281,20 +428,18 @@ async def update_resource(resource_name: str, resource_data: Dict[str, Any]):
         resources_data = load_resources()
         
         # Find the resource to update
-        resource_updated = False
-        for i, resource in enumerate(resources_data['resources']):
-            if resource['name'] == resource_name:
-                # Update the resource with new data
-                resources_data['resources'][i] = resource_data
-                resource_updated = True
-                break
-        
-        if not resource_updated:
+        index = find_resource_index(resources_data['resources'], resource_name)
+        if index is None:
             raise HTTPException(status_code=404, detail="Resource not found")
         
+        # Keep the resource id stable so the index entry is replaced, not duplicated
+        resource_data.setdefault('id', resources_data['resources'][index].get('id'))
+        resources_data['resources'][index] = resource_data
+        
         # Save the updated resources data
         if save_resources(resources_data):
-            return {"message": "Resource updated successfully", "resource": resource_data}
+            index_updated = await sync_resource_index(resource=resource_data)
+            return {"message": "Resource updated successfully", "resource": resource_data, "index_updated": index_updated}
         else:
             raise HTTPException(status_code=500, detail="Failed to save resource data")
             
@@ -304,6 +449,33 @@ async def update_resource(resource_name: str, resource_data: Dict[str, Any]):
         logger.error(f"Error updating resource: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.delete('/api/resources/{resource_name}')
+async def delete_resource(resource_name: str):
+    """Delete a resource by name."""
+    try:
+        # Load existing resources
+        resources_data = load_resources()
+        
+        # Find the resource to delete
+        index = find_resource_index(resources_data['resources'], resource_name)
+        if index is None:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        
+        deleted_resource = resources_data['resources'].pop(index)
+        
+        # Save the updated resources data
+        if save_resources(resources_data):
+            index_updated = await sync_resource_index(deleted_id=get_resource_id(deleted_resource))
+            return {"message": "Resource deleted successfully", "deleted_resource": deleted_resource, "index_updated": index_updated}
+        else:
+            raise HTTPException(status_code=500, detail="Failed to save resource data")
+            
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error deleting resource: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post('/api/send-referral')
 async def send_referral(referral_data: Dict[str, Any]):
     """Send a referral email (mock implementation)."""
@@ -314,8 +486,7 @@ async def send_referral(referral_data: Dict[str, Any]):
         logger.info(f"Sender: {referral_data.get('senderEmail')}")
         
         # Simulate some processing time
-        import time
-        time.sleep(0.5)
+        await asyncio.sleep(0.5)
         
         # Return success response
         return {
@@ -329,19 +500,40 @@ async def send_referral(referral_data: Dict[str, Any]):
 
 @app.post('/api/match-resources')
 async def match_resources(request_data: Dict[str, Any]):
-    """Match resources to client using RAG pipeline."""
+    """
+    Match resources to client using RAG pipeline.
+    latency_tier: "full" (default) waits for the LLM rationale; "fast" returns a templated
+    rationale from eligibility fields; "deferred" returns the fast result and fills the
+    LLM rationale into the cache in the background (repeat the request to pick it up).
+    """
     try:
-        if not rag_matcher:
-            raise HTTPException(status_code=500, detail="RAG Resource Matcher not initialized")
+        require_rag_matcher()
         
         client_data = request_data.get('client_data', {})
-        resource_type = request_data.get('resource_type', 'housing')
+        # Either a single resource_type or a list of them (via resource_types or resource_type)
+        resource_type = request_data.get('resource_types') or request_data.get('resource_type', 'housing')
+        latency_tier = request_data.get('latency_tier', 'full')
         
         if not client_data:
             raise HTTPException(status_code=400, detail="Client data is required")
-        
-        # Get RAG recommendations
-        recommendations = rag_matcher.get_recommendations(client_data, resource_type)
+        if latency_tier not in LATENCY_TIERS:
+            raise HTTPException(status_code=400, detail=f"latency_tier must be one of: {', '.join(LATENCY_TIERS)}")
+        
+        recommendations = None
+        if latency_tier == 'full':
+            # A cached result makes no LLM call, so it is served even while the 'match' route is saturated
+            cache_key = await rag_matcher.arecommendation_cache_key(client_data, resource_type)
+            recommendations = rag_matcher.get_cached_result(cache_key)
+        
+        if recommendations is None:
+            # Only full matches wait on the LLM, so only they take a slot of the 'match' route
+            admission = get_gateway().admit('match') if latency_tier == 'full' else contextlib.nullcontext()
+            async with admission:
+                # Get RAG recommendations; several categories share one embedding and one LLM call
+                if isinstance(resource_type, list):
+                    recommendations = await rag_matcher.aget_multi_category_recommendations(client_data, resource_type, latency_tier)
+                else:
+                    recommendations = await rag_matcher.aget_recommendations(client_data, resource_type, latency_tier)
         
         return {
             "message": "Resources matched successfully",
@@ -352,16 +544,180 @@ async def match_resources(request_data: Dict[str, Any]):
         
     except HTTPException as e:
         raise e
+    except (GatewayOverloadedError, GatewayTimeoutError) as e:
+        raise llm_gateway_error(e)
     except Exception as e:
         logger.error(f"Error matching resources: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post('/api/match-resources/stream')
+async def match_resources_stream(request_data: Dict[str, Any]):
+    """
+    Streaming variant of /api/match-resources, as NDJSON events.
+    A "retrieved" line with the matched resources is sent as soon as vector search
+    finishes, then "token" lines as the LLM writes the rationale, then a final "done"
+    line carrying the same recommendations object /api/match-resources returns.
+    """
+    require_rag_matcher()
+
+    client_data = request_data.get('client_data', {})
+    resource_type = request_data.get('resource_types') or request_data.get('resource_type', 'housing')
+
+    if not client_data:
+        raise HTTPException(status_code=400, detail="Client data is required")
+    # A cached result is replayed without an LLM call, so it needs no slot of the 'match' route
+    cache_key = await rag_matcher.arecommendation_cache_key(client_data, resource_type)
+    cached = rag_matcher.get_cached_result(cache_key) is not None
+    # Shed before the response starts; the slot itself is held while the stream runs
+    gateway = get_gateway()
+    if not cached and gateway.saturated('match'):
+        raise llm_gateway_error(GatewayOverloadedError('match', LLM_RETRY_AFTER_SECONDS))
+
+    async def stream_events():
+        try:
+            async with contextlib.nullcontext() if cached else gateway.admit('match'):
+                async for event in rag_matcher.astream_recommendations(client_data, resource_type):
+                    yield json.dumps(event) + "\n"
+        except Exception as e:
+            # Headers are already sent, so failures are reported in-band
+            logger.error(f"Error streaming resource matches: {e}")
+            yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+
+    # Disable proxy buffering so each line reaches the browser as it is produced
+    return StreamingResponse(
+        stream_events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def batch_item_error(item: Any) -> Optional[str]:
+    """Why a /api/match-resources/batch item is malformed, or None when it can be matched."""
+    if not isinstance(item, dict):
+        return "Each request must be an object"
+    if item.get('client_data') is not None and not isinstance(item['client_data'], dict):
+        return "client_data must be an object"
+    client_id = item.get('client_id')
+    if client_id is not None and (not isinstance(client_id, int) or isinstance(client_id, bool)):
+        return "client_id must be an integer"
+    resource_type = item.get('resource_type', 'housing')
+    if not isinstance(resource_type, str) or not resource_type:
+        return "resource_type must be a non-empty string"
+    return None
+
+@app.post('/api/match-resources/batch')
+async def match_resources_batch(request_data: Dict[str, Any]):
+    """
+    Match resources for many client/resource_type pairs in one call.
+    Each item is {"client_id": ...} or {"client_data": {...}}, plus "resource_type".
+    A malformed item gets an error line instead of failing the batch.
+    An optional top-level "latency_tier" applies to every item, as in /api/match-resources.
+    Results stream back as NDJSON lines, in completion order, tagged with the item's index.
+    """
+    require_rag_matcher()
+    
+    items = request_data.get('requests', [])
+    latency_tier = request_data.get('latency_tier', 'full')
+    if not items or not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="A non-empty 'requests' list is required")
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch size exceeds the limit of {MAX_BATCH_SIZE}")
+    if latency_tier not in LATENCY_TIERS:
+        raise HTTPException(status_code=400, detail=f"latency_tier must be one of: {', '.join(LATENCY_TIERS)}")
+    
+    # Malformed items get an error line of their own; the rest of the batch still runs
+    errors = {index: batch_item_error(item) for index, item in enumerate(items)}
+    errors = {index: error for index, error in errors.items() if error}
+    
+    # Resolve each distinct client id once for the whole batch
+    client_ids = {item['client_id'] for index, item in enumerate(items) if index not in errors and item.get('client_id') is not None}
+    clients_by_id = await run_in_threadpool(client_store.get_clients, client_ids)
+    
+    pairs, cached = [], {}
+    for index, item in enumerate(items):
+        if index in errors:
+            continue
+        client_data = item.get('client_data') or clients_by_id.get(item.get('client_id'))
+        if not client_data:
+            errors[index] = "Client not found" if 'client_id' in item else "Client data is required"
+            continue
+        resource_type = item.get('resource_type', 'housing')
+        # Unchanged client + unchanged catalog: serve the previous result without retrieval or LLM
+        cache_key = await rag_matcher.arecommendation_cache_key(client_data, resource_type)
+        hit = rag_matcher.get_cached_result(cache_key, latency_tier)
+        if hit is not None:
+            # A 'deferred' item hitting a 'fast' request's template still gets its full result scheduled
+            hit = rag_matcher.resume_deferred(hit, client_data, resource_type, cache_key, latency_tier)
+            cached[index] = (client_data, resource_type, hit)
+            continue
+        pairs.append((index, client_data, resource_type, cache_key))
+    
+    try:
+        retrieved = await rag_matcher.aretrieve_batch(
+            [(client_data, resource_type) for _, client_data, resource_type, _ in pairs]
+        )
+    except Exception as e:
+        logger.error(f"Error in batch retrieval: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    semaphore = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+    
+    async def summarize(index, client_data, resource_type, cache_key, question, documents):
+        result = {"index": index, "client_id": client_data.get('id'), "resource_type": resource_type}
+        try:
+            if latency_tier == 'full':
+                async with semaphore:
+                    result["recommendations"] = await rag_matcher.asummarize_recommendations(
+                        question, documents, resource_type
+                    )
+            else:
+                result["recommendations"] = rag_matcher.templated_recommendations(
+                    client_data, question, documents, resource_type
+                )
+                if latency_tier == 'deferred':
+                    result["recommendations"]["rationale_pending"] = rag_matcher.defer_full_recommendations(
+                        client_data, resource_type, cache_key
+                    )
+            rag_matcher.cache_recommendations(cache_key, result["recommendations"])
+        except Exception as e:
+            logger.error(f"Error summarizing batch item {index}: {e}")
+            result["error"] = str(e)
+        return result
+    
+    async def stream_results():
+        for index, error in errors.items():
+            yield json.dumps({"index": index, "error": error}) + "\n"
+        for index, (client_data, resource_type, recommendations) in cached.items():
+            yield json.dumps({
+                "index": index,
+                "client_id": client_data.get('id'),
+                "resource_type": resource_type,
+                "recommendations": recommendations
+            }) + "\n"
+        tasks = [
+            asyncio.create_task(summarize(index, client_data, resource_type, cache_key, question, documents))
+            for (index, client_data, resource_type, cache_key), (question, documents) in zip(pairs, retrieved)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Stop outstanding LLM calls if the client disconnects mid-stream
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.get('/api/match-resources/stats')
+async def match_resources_stats():
+    """Cache counters for the resource matcher."""
+    require_rag_matcher()
+    return rag_matcher.cache_stats()
+
 @app.post('/api/chat-followup')
 async def chat_followup(request_data: Dict[str, Any]):
     """Handle follow-up chat questions about resource recommendations."""
     try:
-        if not rag_matcher:
-            raise HTTPException(status_code=500, detail="RAG Resource Matcher not initialized")
+        require_rag_matcher()
         
         message = request_data.get('message', '')
         client_data = request_data.get('client_data', {})
@@ -406,8 +762,11 @@ async def chat_followup(request_data: Dict[str, Any]):
             "that isn't available in the context, say so clearly. Keep your response concise but informative."
         )
         
-        chain = prompt | rag_matcher.llm
-        response = chain.invoke({"context": context, "question": message})
+        from langchain_core.messages import HumanMessage
+        
+        response = await get_gateway().chat(
+            'chat_followup', [HumanMessage(content=prompt.format(context=context, question=message))]
+        )
         
         ai_response = response.content if hasattr(response, 'content') else str(response)
         
@@ -418,6 +777,8 @@ async def chat_followup(request_data: Dict[str, Any]):
         
     except HTTPException as e:
         raise e
+    except (GatewayOverloadedError, GatewayTimeoutError) as e:
+        raise llm_gateway_error(e)
     except Exception as e:
         logger.error(f"Error in chat followup: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -426,23 +787,6 @@ async def chat_followup(request_data: Dict[str, Any]):
 async def add_resource_to_client(client_id: int, resource_data: Dict[str, Any]):
     """Add a resource to a client's portfolio."""
     try:
-        # Load existing clients
-        clients_data = load_clients()
-        
-        # Find the client
-        client = None
-        for c in clients_data['clients']:
-            if c['id'] == client_id:
-                client = c
-                break
-        
-        if not client:
-            raise HTTPException(status_code=404, detail="Client not found")
-        
-        # Initialize resources array if it doesn't exist
-        if 'resources' not in client:
-            client['resources'] = []
-        
         # Create resource entry with status tracking
         resource_entry = {
             'resource_id': resource_data.get('id'),
@@ -459,31 +803,23 @@ async def add_resource_to_client(client_id: int, resource_data: Dict[str, Any]):
             'ai_reasoning': resource_data.get('ai_reasoning', '')
         }
         
-        # Check if resource already exists for this client
-        existing_resource = None
-        for r in client['resources']:
-            if r['resource_id'] == resource_entry['resource_id']:
-                existing_resource = r
-                break
+        # Add the resource to client's portfolio unless it is already there
+        try:
+            commit = await run_in_threadpool(client_store.add_resource, client_id, resource_entry)
+        except ClientNotFoundError:
+            raise HTTPException(status_code=404, detail="Client not found")
         
-        if existing_resource:
+        if commit.version is None:
             return {
                 "message": "Resource already exists for this client",
-                "resource": existing_resource
+                "resource": commit.value
             }
         
-        # Add the resource to client's portfolio
-        client['resources'].append(resource_entry)
-        client['lastUpdated'] = datetime.now().isoformat()
-        
-        # Save the updated clients data
-        if save_clients(clients_data):
-            return {
-                "message": "Resource added to client successfully",
-                "resource": resource_entry
-            }
-        else:
-            raise HTTPException(status_code=500, detail="Failed to save client data")
+        return {
+            "message": "Resource added to client successfully",
+            "resource": commit.value,
+            "version": commit.version
+        }
             
     except HTTPException as e:
         raise e
@@ -495,56 +831,26 @@ async def add_resource_to_client(client_id: int, resource_data: Dict[str, Any]):
 async def update_resource_status(client_id: int, resource_id: str, status_data: Dict[str, Any]):
     """Update the status of a resource for a client."""
     try:
-        # Load existing clients
-        clients_data = load_clients()
+        new_status = status_data.get('status')
         
-        # Find the client
-        client = None
-        for c in clients_data['clients']:
-            if c['id'] == client_id:
-                client = c
-                break
+        if new_status not in RESOURCE_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {RESOURCE_STATUSES}")
         
-        if not client:
+        # Update the resource status, and its notes if provided
+        try:
+            commit = await run_in_threadpool(
+                client_store.update_resource_status, client_id, resource_id, new_status, status_data.get('notes')
+            )
+        except ClientNotFoundError:
             raise HTTPException(status_code=404, detail="Client not found")
-        
-        if 'resources' not in client:
-            raise HTTPException(status_code=404, detail="Client has no resources")
-        
-        # Find the resource
-        resource = None
-        for r in client['resources']:
-            if r['resource_id'] == resource_id:
-                resource = r
-                break
-        
-        if not resource:
+        except ResourceNotFoundError:
             raise HTTPException(status_code=404, detail="Resource not found for this client")
         
-        # Update the resource status
-        new_status = status_data.get('status')
-        valid_statuses = ['pending', 'contacted', 'in_progress', 'completed', 'declined', 'not_eligible']
-        
-        if new_status not in valid_statuses:
-            raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
-        
-        resource['status'] = new_status
-        resource['last_updated'] = datetime.now().isoformat()
-        
-        # Add notes if provided
-        if status_data.get('notes'):
-            resource['notes'] = status_data.get('notes')
-        
-        client['lastUpdated'] = datetime.now().isoformat()
-        
-        # Save the updated clients data
-        if save_clients(clients_data):
-            return {
-                "message": "Resource status updated successfully",
-                "resource": resource
-            }
-        else:
-            raise HTTPException(status_code=500, detail="Failed to save client data")
+        return {
+            "message": "Resource status updated successfully",
+            "resource": commit.value,
+            "version": commit.version
+        }
             
     except HTTPException as e:
         raise e
@@ -556,15 +862,7 @@ async def update_resource_status(client_id: int, resource_id: str, status_data:
 async def get_client_resources(client_id: int):
     """Get all resources for a specific client."""
     try:
-        # Load existing clients
-        clients_data = load_clients()
-        
-        # Find the client
-        client = None
-        for c in clients_data['clients']:
-            if c['id'] == client_id:
-                client = c
-                break
+        client = await run_in_threadpool(client_store.get_client, client_id)
         
         if not client:
             raise HTTPException(status_code=404, detail="Client not found")
@@ -583,36 +881,42 @@ async def get_client_resources(client_id: int):
         logger.error(f"Error getting client resources: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get('/api/clients/{client_id}/resources/{resource_id}/history')
+async def get_resource_status_history(client_id: int, resource_id: str):
+    """Get the status transitions of a client's resource, oldest first."""
+    try:
+        try:
+            history = await run_in_threadpool(client_store.status_history, client_id, resource_id)
+        except ClientNotFoundError:
+            raise HTTPException(status_code=404, detail="Client not found")
+        except ResourceNotFoundError:
+            raise HTTPException(status_code=404, detail="Resource not found for this client")
+
+        if history is None:
+            raise HTTPException(status_code=501, detail="Status history is not kept by the configured client store")
+
+        return {
+            "client_id": client_id,
+            "resource_id": resource_id,
+            "history": history
+        }
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Error getting resource status history: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get('/api/dashboard/resource-status')
 async def get_dashboard_resource_status():
     """Get recent resource status updates for dashboard."""
     try:
-        # Load existing clients
-        clients_data = load_clients()
-        
-        # Collect all client resources with their statuses
-        client_resources = []
-        for client in clients_data['clients']:
-            if 'resources' in client and client['resources']:
-                for resource in client['resources']:
-                    client_resources.append({
-                        'client_id': client['id'],
-                        'client_name': f"{client.get('firstName', '')} {client.get('lastName', '')}",
-                        'resource_name': resource.get('resource_name', ''),
-                        'organization': resource.get('organization', ''),
-                        'status': resource.get('status', 'pending'),
-                        'added_date': resource.get('added_date', ''),
-                        'last_updated': resource.get('last_updated', ''),
-                        'category': resource.get('category', 'housing')
-                    })
-        
-        # Sort by last_updated (most recent first)
-        client_resources.sort(key=lambda x: x.get('last_updated', ''), reverse=True)
-        
-        # Return the most recent 10 for dashboard
+        # The most recent 10 status updates for the dashboard
+        recent_resources, total_count = await run_in_threadpool(client_store.recent_resource_updates, 10)
+        
         return {
-            "recent_resources": client_resources[:10],
-            "total_count": len(client_resources)
+            "recent_resources": recent_resources,
+            "total_count": total_count
         }
         
     except Exception as e:
@@ -656,18 +960,14 @@ COMMON TASKS:
 
 Answer questions clearly and concisely. If you don't know something specific about the platform, acknowledge it and suggest alternative ways to get help. Be friendly and professional."""
 
-        # Use the existing LLM from the RAG matcher
-        from langchain_openai import ChatOpenAI
         from langchain_core.messages import HumanMessage, SystemMessage
         
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-        
         messages = [
             SystemMessage(content=system_prompt),
             HumanMessage(content=message)
         ]
         
-        response = llm.invoke(messages)
+        response = await get_gateway().chat('help_chat', messages, temperature=0.7)
         
         return {
             "response": response.content,
@@ -676,6 +976,8 @@ Answer questions clearly and concisely. If you don't know something specific abo
         
     except HTTPException as e:
         raise e
+    except (GatewayOverloadedError, GatewayTimeoutError) as e:
+        raise llm_gateway_error(e)
     except Exception as e:
         logger.error(f"Error in help chatbot: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -692,12 +994,11 @@ async def voice_assistant(request_data: Dict[str, Any]):
             raise HTTPException(status_code=400, detail="Message is required")
         
         # Load current resources for context
-        resources_data = load_resources()
+        resources_data = await run_in_threadpool(load_resources)
         total_resources = len(resources_data.get('resources', []))
         
-        # Load clients for context
-        clients_data = load_clients()
-        total_clients = len(clients_data.get('clients', []))
+        # Count clients for context
+        total_clients = await run_in_threadpool(client_store.count_clients)
         
         # Enhanced system prompt with current platform data
         system_prompt = f"""You are Sarah, the NextStep AI assistant. You're a helpful, friendly female voice assistant for social workers. You have complete knowledge of the NextStep platform and can help with everything.
@@ -735,12 +1036,8 @@ PLATFORM FEATURES YOU KNOW:
 
 Always be concise, helpful, and sound like a real person having a conversation."""
 
-        # Use the existing LLM from the RAG matcher
-        from langchain_openai import ChatOpenAI
         from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
         
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.8)
-        
         # Build conversation context
         messages = [SystemMessage(content=system_prompt)]
         
@@ -755,7 +1052,7 @@ Always be concise, helpful, and sound like a real person having a conversation."
         messages.append(HumanMessage(content=message))
         
         # Create the chat completion
-        response = llm.invoke(messages)
+        response = await get_gateway().chat('voice_assistant', messages, temperature=0.8)
         
         return {
             "response": response.content,
@@ -764,6 +1061,8 @@ Always be concise, helpful, and sound like a real person having a conversation."
         
     except HTTPException as e:
         raise e
+    except (GatewayOverloadedError, GatewayTimeoutError) as e:
+        raise llm_gateway_error(e)
     except Exception as e:
         logger.error(f"Error in voice assistant: {e}")
         raise HTTPException(status_code=500, detail="I'm having trouble processing your request right now. Please try again or contact support if the issue persists.")
@@ -778,24 +1077,7 @@ async def translate_text(request_data: Dict[str, Any]):
         if not text:
             raise HTTPException(status_code=400, detail="Text is required")
         
-        # Use OpenAI for translation
-        from openai import OpenAI
-        openai_key = os.environ.get("OPENAI_API_KEY") or os.environ.get("OPEN_API_KEY")
-        client = OpenAI(api_key=openai_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": f"You are a professional translator. Translate the following text to {target_language}. Maintain the original meaning and tone. Only return the translated text, nothing else."
-                },
-                {"role": "user", "content": text}
-            ],
-            temperature=0.3
-        )
-        
-        translated_text = response.choices[0].message.content.strip()
+        translated_text = await get_gateway().translate(text, target_language)
         
         return {
             "original": text,
@@ -804,20 +1086,19 @@ async def translate_text(request_data: Dict[str, Any]):
             "success": True
         }
         
+    except HTTPException as e:
+        raise e
+    except (GatewayOverloadedError, GatewayTimeoutError) as e:
+        raise llm_gateway_error(e)
     except Exception as e:
         logger.error(f"Error in translation: {e}")
         raise HTTPException(status_code=500, detail="Failed to translate text")
 
 @app.post('/api/text-to-speech')
 async def text_to_speech(request_data: Dict[str, Any]):
-    """Convert text to speech using OpenAI's advanced TTS API."""
+    """Convert text to speech with the configured model provider."""
     try:
-        from openai import OpenAI
         import base64
-        import io
-        
-        # Initialize OpenAI client
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
         
         text = request_data.get('text', '')
         voice = request_data.get('voice', 'nova')  # nova is a great female voice
@@ -825,23 +1106,20 @@ async def text_to_speech(request_data: Dict[str, Any]):
         if not text:
             raise HTTPException(status_code=400, detail="Text is required")
         
-        # Generate speech using OpenAI TTS
-        response = client.audio.speech.create(
-            model="tts-1",  # Use tts-1 for faster response, tts-1-hd for higher quality
-            voice=voice,    # Options: alloy, echo, fable, onyx, nova, shimmer
-            input=text,
-            response_format="mp3"
-        )
+        audio_data, audio_format = await get_gateway().synthesize_speech(text, voice)
         
         # Convert to base64 for frontend
-        audio_data = response.content
         audio_base64 = base64.b64encode(audio_data).decode('utf-8')
         
         return {
             "audio_data": audio_base64,
-            "format": "mp3"
+            "format": audio_format
         }
         
+    except HTTPException as e:
+        raise e
+    except (GatewayOverloadedError, GatewayTimeoutError) as e:
+        raise llm_gateway_error(e)
     except Exception as e:
         logger.error(f"Error in text-to-speech: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate speech")
@@ -889,29 +1167,30 @@ async def get_livekit_token(name: str):
 
 @app.get('/health')
 async def health_check():
-    """Health check endpoint for deployment platforms."""
-    try:
-        # Basic health check
-        health_status = {
-            "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
-            "rag_matcher_initialized": rag_matcher is not None
-        }
-        
-        # If RAG matcher is not initialized, still return healthy but with warning
-        if rag_matcher is None:
-            health_status["status"] = "starting"
-            health_status["warning"] = "RAG matcher still initializing"
-            
-        return health_status
-        
-    except Exception as e:
-        logger.error(f"Health check error: {e}")
-        return {
-            "status": "unhealthy",
-            "error": str(e),
-            "timestamp": datetime.now().isoformat()
-        }
+    """Liveness check for deployment platforms: the process is up and serving requests."""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "rag_matcher_initialized": rag_matcher is not None
+    }
+
+@app.get('/health/ready')
+async def readiness_check():
+    """Readiness check: 200 once the matcher index is warm, 503 with Retry-After until then."""
+    status = {
+        "status": "ready" if rag_matcher is not None else "starting",
+        "timestamp": datetime.now().isoformat(),
+        "rag_matcher_initialized": rag_matcher is not None
+    }
+    if rag_matcher is None:
+        if rag_matcher_error:
+            status["error"] = rag_matcher_error
+        return JSONResponse(
+            status_code=503,
+            content=status,
+            headers={"Retry-After": str(MATCHER_RETRY_AFTER_SECONDS)}
+        )
+    return status
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5001))
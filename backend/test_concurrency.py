@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for a running backend: match throughput should scale with the
+number of requests in flight, and /health should stay responsive while matches run.
+
+Usage:
+    BACKEND_URL=http://localhost:5001 python test_concurrency.py
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_URL = os.environ.get("BACKEND_URL", "http://localhost:5001")
+CLIENTS_FILE = Path(__file__).parent.absolute() / 'clients.json'
+CONCURRENCY_LEVELS = [1, 2, 4, 8]
+REQUESTS_PER_LEVEL = 16
+# Throughput at the highest level must be at least this multiple of the serial rate
+MIN_SPEEDUP = 2.0
+# /health must answer within this many seconds while matches are in flight
+MAX_HEALTH_SECONDS = 1.0
+
+
+def match_payloads(count):
+    """Distinct match requests; a per-request note keeps the result and query caches cold."""
+    with open(CLIENTS_FILE) as f:
+        clients = json.load(f).get('clients', [])
+    payloads = []
+    for i in range(count):
+        client = dict(clients[i % len(clients)])
+        client['notes'] = f"{client.get('notes', '')} (concurrency probe {time.time_ns()}-{i})"
+        payloads.append({"client_data": client, "resource_type": "housing"})
+    return payloads
+
+
+async def run_level(client, concurrency):
+    """Sends REQUESTS_PER_LEVEL match requests with `concurrency` in flight; returns requests/second."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(payload):
+        async with semaphore:
+            response = await client.post(f"{BACKEND_URL}/api/match-resources", json=payload)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(p) for p in match_payloads(REQUESTS_PER_LEVEL)])
+    return REQUESTS_PER_LEVEL / (time.perf_counter() - start)
+
+
+async def probe_health(client, stop):
+    """Polls /health until stopped and returns the slowest response time."""
+    slowest = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(f"{BACKEND_URL}/health")
+        slowest = max(slowest, time.perf_counter() - start)
+        await asyncio.sleep(0.05)
+    return slowest
+
+
+async def measure():
+    async with httpx.AsyncClient(timeout=120) as client:
+        throughput = {}
+        slowest_health = 0.0
+        for level in CONCURRENCY_LEVELS:
+            stop = asyncio.Event()
+            health_task = asyncio.create_task(probe_health(client, stop))
+            throughput[level] = await run_level(client, level)
+            stop.set()
+            slowest_health = max(slowest_health, await health_task)
+            print(f"concurrency={level:<3} throughput={throughput[level]:.2f} req/s")
+        return throughput, slowest_health
+
+
+def test_concurrency():
+    """Check that match throughput scales with concurrency and /health is never starved."""
+    try:
+        throughput, slowest_health = asyncio.run(measure())
+    except Exception as e:
+        print(f"❌ Could not run concurrency check against {BACKEND_URL}: {e}")
+        return False
+
+    speedup = throughput[CONCURRENCY_LEVELS[-1]] / throughput[CONCURRENCY_LEVELS[0]]
+    print(f"Speedup at concurrency {CONCURRENCY_LEVELS[-1]}: {speedup:.2f}x")
+    print(f"Slowest /health response during load: {slowest_health * 1000:.0f} ms")
+
+    ok = True
+    if speedup < MIN_SPEEDUP:
+        print(f"❌ Throughput did not scale (expected at least {MIN_SPEEDUP}x)")
+        ok = False
+    if slowest_health > MAX_HEALTH_SECONDS:
+        print(f"❌ /health was blocked for {slowest_health:.2f}s while matches ran")
+        ok = False
+    if ok:
+        print("\n🎉 Matching scales with concurrency and /health stays responsive!")
+    return ok
+
+
+if __name__ == "__main__":
+    success = test_concurrency()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,131 @@
+"""
+Shared fixtures for the backend tests. Run from backend/ with: python -m pytest -q
+
+The app modules read their configuration at import time, so the offline model
+provider and throwaway data locations are set here, before any of them is imported.
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+
+_DATA_DIR = Path(tempfile.mkdtemp(prefix='nextstep-tests-'))
+os.environ.update({
+    # Hashing embeddings and a templated chat model: no network, no API key
+    "MODEL_PROVIDER": "local",
+    "VECTOR_STORE_BACKEND": "numpy",
+    "EMBEDDING_CACHE_DIR": str(_DATA_DIR / 'embedding_cache'),
+    "CLIENT_STORE_BACKEND": "sqlite",
+    "CLIENT_DB_FILE": str(_DATA_DIR / 'clients.db'),
+    "CLIENT_JOURNAL_DIR": str(_DATA_DIR / 'client_journal'),
+})
+
+import pytest
+from fastapi.testclient import TestClient
+
+import client_store as cs
+import server
+
+# Seconds to wait for the background matcher build on startup
+MATCHER_READY_TIMEOUT = 120
+
+BACKENDS = ('sqlite', 'json', 'journal')
+
+
+def make_client(first, last, updated, **fields):
+    """A client record with the fields the listing filters look at."""
+    return {
+        "firstName": first,
+        "lastName": last,
+        "phoneNumber": fields.pop('phone', '832-555-0100'),
+        "email": f"{first.lower()}.{last.lower()}@example.com",
+        "createdAt": updated,
+        "lastUpdated": updated,
+        "riskAndSafety": {"safeInCurrentEnvironment": True, "experiencingViolence": False},
+        **fields,
+    }
+
+
+def sample_clients():
+    """Eight clients spanning needs, veteran status, urgency and resource statuses."""
+    clients = [
+        make_client('Maria', 'Garcia', '2024-01-08T10:00:00', needs=['housing assistance', 'childcare'],
+                    presentingConcerns={'domesticViolence': True}),
+        make_client('John', 'Smith', '2024-01-07T10:00:00', is_veteran=True, needs=['mental health support'],
+                    resources=[{'resource_id': 'r1', 'status': 'contacted', 'last_updated': '2024-01-07T10:00:00'}]),
+        make_client('Emily', 'White', '2024-01-06T10:00:00', presentingConcerns={'foodInsecurity': True}),
+        make_client('David', 'Johnson', '2024-01-05T10:00:00', needs=['senior housing'], phone='713-555-0199'),
+        make_client('Chris', 'Davis', '2024-01-04T10:00:00', presentingConcerns={'mentalHealth': True},
+                    riskAndSafety={'safeInCurrentEnvironment': False}),
+        make_client('Robert', 'Wilson', '2024-01-03T10:00:00', is_veteran=True, needs=['permanent supportive housing'],
+                    resources=[{'resource_id': 'r2', 'status': 'completed', 'last_updated': '2024-01-03T10:00:00'}]),
+        make_client('Ana', 'Garcia', '2024-01-02T10:00:00', presentingConcerns={'housingInstability': True}),
+        # Same lastUpdated as Ana: ties order by id
+        make_client('Sam', 'Lee', '2024-01-02T10:00:00'),
+    ]
+    for client_id, client in enumerate(clients, start=1):
+        client['id'] = client_id
+    return clients
+
+
+def open_store(backend, data_dir):
+    """A new, empty client store of the given backend in data_dir."""
+    if backend == 'sqlite':
+        return cs.SQLiteClientStore(data_dir / 'clients.db', legacy_file=None)
+    if backend == 'json':
+        return cs.JsonClientStore(data_dir / 'clients.json')
+    return cs.JournalClientStore(data_dir / 'journal', legacy_file=None)
+
+
+@pytest.fixture(params=BACKENDS)
+def store(request, tmp_path):
+    """An empty store, once per backend."""
+    client_store = open_store(request.param, tmp_path)
+    yield client_store
+    if isinstance(client_store, cs.JournalClientStore):
+        client_store.close()
+
+
+@pytest.fixture
+def seeded_store(store):
+    clients = sample_clients()
+    store.reset(clients, len(clients) + 1)
+    return store
+
+
+@pytest.fixture(scope='session')
+def app_client():
+    """TestClient for the app, once the matcher has been built."""
+    with TestClient(server.app) as client:
+        deadline = time.monotonic() + MATCHER_READY_TIMEOUT
+        while server.rag_matcher is None:
+            if time.monotonic() > deadline:
+                pytest.fail("The resource matcher was not built in time")
+            time.sleep(0.1)
+        yield client
+
+
+@pytest.fixture
+def api(app_client, seeded_store, monkeypatch):
+    """The app serving the sample caseload from each store backend."""
+    monkeypatch.setattr(server, 'client_store', seeded_store)
+    return app_client
+
+
+@pytest.fixture
+def matcher(app_client):
+    """The app's matcher, with no cached results or background fills left by other tests."""
+    rag_matcher = server.rag_matcher
+    rag_matcher.result_cache.invalidate()
+    yield rag_matcher
+    wait_for_deferred(rag_matcher)
+    rag_matcher.result_cache.invalidate()
+
+
+def wait_for_deferred(rag_matcher, timeout=30):
+    """Waits for the matcher's background ('deferred') fills to finish."""
+    deadline = time.monotonic() + timeout
+    while rag_matcher._deferred_tasks:
+        if time.monotonic() > deadline:
+            pytest.fail("Deferred fills did not finish in time")
+        time.sleep(0.05)
@@ -0,0 +1,61 @@
+import numpy as np
+
+from caches import QueryEmbeddingCache, RecommendationCache
+
+
+def test_query_cache_normalizes_whitespace():
+    cache = QueryEmbeddingCache(max_bytes=10_000, ttl_seconds=60)
+    cache.put('model', 'housing  for\na veteran', [0.5, 0.25])
+    assert cache.get('model', 'housing for a veteran') == [0.5, 0.25]
+    assert cache.get('other-model', 'housing for a veteran') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_query_cache_evicts_least_recently_used():
+    vector = np.zeros(64, dtype=np.float32).tolist()
+    # Room for two entries of 64 float32 values plus their keys
+    cache = QueryEmbeddingCache(max_bytes=2 * (64 * 4 + 6), ttl_seconds=60)
+    cache.put('m', 'aaaaa', vector)
+    cache.put('m', 'bbbbb', vector)
+    assert cache.get('m', 'aaaaa') is not None
+    cache.put('m', 'ccccc', vector)
+    assert cache.get('m', 'bbbbb') is None
+    assert cache.get('m', 'aaaaa') is not None
+    stats = cache.stats()
+    assert (stats['entries'], stats['evictions']) == (2, 1)
+    assert stats['bytes'] <= stats['max_bytes']
+    # An entry larger than the whole cache is not stored
+    cache.put('m', 'huge', [0.0] * 1000)
+    assert cache.get('m', 'huge') is None
+
+
+def test_query_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('caches.time.monotonic', lambda: now[0])
+    cache = QueryEmbeddingCache(max_bytes=10_000, ttl_seconds=60)
+    cache.put('m', 'q', [1.0])
+    now[0] += 61
+    assert cache.get('m', 'q') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_recommendation_cache_is_a_bounded_lru():
+    cache = RecommendationCache(max_entries=2)
+    cache.put(('a', 'housing', 1), {'n': 1})
+    cache.put(('b', 'housing', 1), {'n': 2})
+    assert cache.get(('a', 'housing', 1)) == {'n': 1}
+    cache.put(('c', 'housing', 1), {'n': 3})
+    assert cache.get(('b', 'housing', 1)) is None
+    assert cache.get(('a', 'housing', 1)) == {'n': 1}
+    # A new catalog version is a different key
+    assert cache.get(('a', 'housing', 2)) is None
+
+    cache.invalidate()
+    assert cache.get(('a', 'housing', 1)) is None
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_recommendation_cache_can_be_disabled():
+    cache = RecommendationCache(max_entries=0)
+    cache.put(('a', 'housing', 1), {'n': 1})
+    assert cache.get(('a', 'housing', 1)) is None
@@ -0,0 +1,98 @@
+import json
+import threading
+
+import pytest
+
+import client_store as cs
+from conftest import open_store
+
+CASELOAD = [
+    {'id': 1, 'firstName': 'Maria', 'resources': []},
+    {'id': 2, 'firstName': 'John', 'resources': [{'resource_id': 'r1', 'status': 'pending', 'added_date': '2024-01-07T10:00:00'}]},
+    {'id': 3, 'firstName': 'Emily'},
+]
+
+
+def journal_state(store):
+    return store.list_clients(), store.status_history(2, 'r1')
+
+
+def run_all(target, arguments):
+    threads = [threading.Thread(target=target, args=args) for args in arguments]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_replays_after_restart(tmp_path):
+    store = open_store('journal', tmp_path)
+    store.reset(CASELOAD, 4)
+    store.update_resource_status(2, 'r1', 'in_progress', 'intake booked')
+    store.add_client({'firstName': 'New'})
+    store.delete_client(3)
+    state = journal_state(store)
+    store.close()
+
+    reopened = open_store('journal', tmp_path)
+    assert journal_state(reopened) == state
+    assert [step['status'] for step in state[1]] == ['pending', 'in_progress']
+    reopened.close()
+
+
+def test_batch_replays_with_the_same_history(tmp_path):
+    store = open_store('journal', tmp_path)
+    client_id = store.add_client({'firstName': 'A'}).value['id']
+    # Assignments and status changes racing into the same group commit
+    run_all(store.add_resource, [(client_id, {'resource_id': f'r{i}', 'status': 'pending'}) for i in range(10)])
+    run_all(store.update_resource_status, [(client_id, f'r{i}', 'contacted') for i in range(10)])
+    history = {i: store.status_history(client_id, f'r{i}') for i in range(10)}
+    store.close()
+
+    reopened = open_store('journal', tmp_path)
+    assert {i: reopened.status_history(client_id, f'r{i}') for i in range(10)} == history
+    reopened.close()
+
+
+def test_snapshots_and_skips_a_torn_tail(tmp_path):
+    store = cs.JournalClientStore(tmp_path / 'journal', legacy_file=None, snapshot_every=5)
+    for i in range(12):
+        store.add_client({'firstName': f'c{i}'})
+    state = store.list_clients()
+    store.close()
+    assert (tmp_path / 'journal' / 'snapshot.json').exists()
+    assert len((tmp_path / 'journal' / 'journal.ndjson').read_text().splitlines()) < 12
+
+    # A crash mid-append leaves a partial last line
+    with open(tmp_path / 'journal' / 'journal.ndjson', 'a') as f:
+        f.write('{"type": "client_ad')
+    reopened = cs.JournalClientStore(tmp_path / 'journal', legacy_file=None, snapshot_every=5)
+    assert reopened.list_clients() == state
+    assert reopened.add_client({'firstName': 'after'}).value['id'] == 13
+    reopened.close()
+
+
+def test_directory_is_locked(tmp_path):
+    store = open_store('journal', tmp_path)
+    with pytest.raises(cs.StoreLockedError):
+        open_store('journal', tmp_path)
+    store.close()
+    with pytest.raises(cs.StoreLockedError):
+        store.count_clients()
+    # Free once the owner closes it
+    open_store('journal', tmp_path).close()
+
+
+def test_imports_legacy_file_once(tmp_path):
+    legacy = tmp_path / 'clients.json'
+    legacy.write_text(json.dumps({'clients': CASELOAD, 'next_id': 20}))
+    store = cs.JournalClientStore(tmp_path / 'journal', legacy_file=legacy)
+    assert store.count_clients() == 3
+    assert store.status_history(2, 'r1')[0]['status'] == 'pending'
+    assert store.add_client({'firstName': 'New'}).value['id'] == 20
+    store.delete_client(1)
+    store.close()
+    # A restart does not import the file again
+    reopened = cs.JournalClientStore(tmp_path / 'journal', legacy_file=legacy)
+    assert reopened.count_clients() == 3
+    reopened.close()
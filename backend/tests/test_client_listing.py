@@ -0,0 +1,94 @@
+import pytest
+
+from client_listing import SUMMARY_FIELDS, decode_cursor, encode_cursor, project_client
+from conftest import sample_clients
+
+
+def list_ids(api, **params):
+    """Ids of every client the list returns for params, following next_cursor."""
+    ids, cursor = [], None
+    while True:
+        response = api.get('/api/recent-clients', params={**params, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        body = response.json()
+        ids.extend(client['id'] for client in body['clients'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return ids
+
+
+def test_pages_are_summaries(api):
+    body = api.get('/api/recent-clients', params={'limit': 3}).json()
+    assert [client['id'] for client in body['clients']] == [1, 2, 3]
+    assert body['next_cursor']
+    assert set(body['clients'][1]) <= set(SUMMARY_FIELDS)
+    assert body['clients'][1]['resourceCount'] == 1
+    assert 'resources' not in body['clients'][1]
+
+
+def test_walks_every_client_once(api):
+    assert list_ids(api, limit=3) == [1, 2, 3, 4, 5, 6, 8, 7]
+    assert list_ids(api, limit=3, sort='name') == [5, 7, 1, 4, 8, 2, 3, 6]
+
+
+@pytest.mark.parametrize('params, expected', [
+    ({'needs': 'housing'}, [1, 4, 6, 7]),
+    ({'needs': 'food,mental health'}, [2, 3, 5]),
+    ({'veteran': 'true'}, [2, 6]),
+    ({'status': 'completed'}, [6]),
+    ({'search': 'garcia'}, [1, 7]),
+    ({'urgent': 'true'}, [1, 5]),
+    ({'urgent': 'true', 'sort': 'name'}, [5, 1]),
+])
+def test_filters(api, params, expected):
+    assert list_ids(api, limit=2, **params) == expected
+
+
+def test_fields(api):
+    client = api.get('/api/recent-clients', params={
+        'limit': 1, 'fields': 'firstName,riskAndSafety.safeInCurrentEnvironment,resourceCount'
+    }).json()['clients'][0]
+    assert client == {
+        'id': 1, 'firstName': 'Maria', 'riskAndSafety': {'safeInCurrentEnvironment': True}, 'resourceCount': 0
+    }
+    whole = api.get('/api/recent-clients', params={'limit': 2, 'fields': '*'}).json()['clients'][1]
+    assert whole['resources'][0]['resource_id'] == 'r1'
+
+
+def test_stats(api):
+    assert api.get('/api/recent-clients/stats').json() == {
+        'total': 8, 'urgent': 2, 'housing': 4, 'food': 1, 'mental_health': 2
+    }
+    assert api.get('/api/recent-clients/stats', params={'search': 'garcia'}).json() == {
+        'total': 2, 'urgent': 1, 'housing': 2, 'food': 0, 'mental_health': 0
+    }
+
+
+@pytest.mark.parametrize('params', [
+    {'limit': 0},
+    {'limit': 1000},
+    {'status': 'lost'},
+    {'sort': 'age'},
+    {'cursor': 'not-a-cursor'},
+    # A cursor only continues the order it came from
+    {'cursor': encode_cursor(('2024-01-05T10:00:00', 4), 'recent'), 'sort': 'name'},
+])
+def test_rejects_bad_parameters(api, params):
+    assert api.get('/api/recent-clients', params=params).status_code == 400
+
+
+def test_get_client(api):
+    assert api.get('/api/clients/2').json()['client']['resources'][0]['status'] == 'contacted'
+    assert api.get('/api/clients/99').status_code == 404
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(('2024-01-05T10:00:00', 4), 'name'), 'name') == ('2024-01-05T10:00:00', 4)
+
+
+def test_project_client_skips_missing_fields():
+    client = sample_clients()[0]
+    assert project_client(client, ('id', 'socialHistory.housingStatus', 'presentingConcerns.domesticViolence')) == {
+        'id': 1, 'presentingConcerns': {'domesticViolence': True}
+    }
+    assert project_client(client, None) is client
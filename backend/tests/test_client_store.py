@@ -0,0 +1,265 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import client_store as cs
+from conftest import open_store, sample_clients
+
+# Seconds a store call may take before the test treats it as hung
+CALL_TIMEOUT = 10
+
+
+def call(function, *args):
+    """Runs a store call in a thread; returns its result or raises its exception, failing if it hangs."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome['value'] = function(*args)
+        except Exception as e:
+            outcome['error'] = e
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(CALL_TIMEOUT)
+    if thread.is_alive():
+        pytest.fail(f"{function.__name__} did not return")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['value']
+
+
+def sorted_ids(clients, order='recent'):
+    return [client['id'] for client in sorted(clients, key=lambda c: cs._client_sort_key(c, order), reverse=order == 'recent')]
+
+
+def walk(store, limit, filters=cs.ClientFilter(), order='recent'):
+    ids, after = [], None
+    while True:
+        page, after = store.page_clients(limit, after, filters, order)
+        ids.extend(client['id'] for client in page)
+        if after is None:
+            return ids
+
+
+def test_add_get_delete(store):
+    first = store.add_client({'firstName': 'A', 'lastName': 'One'})
+    second = store.add_client({'firstName': 'B', 'lastName': 'Two'})
+    assert (first.value['id'], second.value['id']) == (1, 2)
+    assert second.version > first.version
+    assert store.get_client(1)['firstName'] == 'A'
+    assert set(store.get_clients([1, 2, 99])) == {1, 2}
+
+    deleted = store.delete_client(1)
+    assert deleted.value['id'] == 1
+    assert store.get_client(1) is None
+    assert store.delete_client(1).value is None
+    assert store.count_clients() == 1
+    # Ids are not reused after a delete
+    assert store.add_client({'firstName': 'C'}).value['id'] == 3
+
+
+def test_reads_are_copies(store):
+    store.add_client({'firstName': 'A'})
+    store.get_client(1)['firstName'] = 'Changed'
+    store.list_clients()[0]['firstName'] = 'Changed'
+    assert store.get_client(1)['firstName'] == 'A'
+
+
+def test_resources_and_history(store):
+    client_id = store.add_client({'firstName': 'A'}).value['id']
+    entry = {'resource_id': 'r1', 'resource_name': 'Shelter', 'status': 'pending', 'added_date': '2024-01-01T00:00:00'}
+    added = store.add_resource(client_id, entry)
+    assert added.value['resource_id'] == 'r1'
+    # Assigning the same resource again changes nothing
+    assert store.add_resource(client_id, dict(entry)).version is None
+
+    updated = store.update_resource_status(client_id, 'r1', 'contacted', 'left a message')
+    assert updated.value['status'] == 'contacted'
+    assert updated.value['notes'] == 'left a message'
+    assert store.get_client(client_id)['resources'][0]['status'] == 'contacted'
+
+    with pytest.raises(cs.ClientNotFoundError):
+        store.update_resource_status(999, 'r1', 'contacted')
+    with pytest.raises(cs.ResourceNotFoundError):
+        store.update_resource_status(client_id, 'nope', 'contacted')
+
+    history = store.status_history(client_id, 'r1')
+    if isinstance(store, cs.JsonClientStore):
+        assert history is None
+    else:
+        assert [step['status'] for step in history] == ['pending', 'contacted']
+        assert history[-1]['notes'] == 'left a message'
+
+
+def test_concurrent_writes_get_distinct_ids(store):
+    threads = [threading.Thread(target=store.add_client, args=({'firstName': f'c{i}'},)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [client['id'] for client in store.list_clients()]
+    assert sorted(ids) == list(range(1, 41))
+
+
+@pytest.mark.parametrize('limit', [1, 3, 50])
+def test_pages_follow_last_updated(seeded_store, limit):
+    expected = sorted_ids(sample_clients())
+    assert walk(seeded_store, limit) == expected
+    # Ties on lastUpdated go by descending id
+    assert expected.index(8) < expected.index(7)
+
+
+def test_pages_by_name(seeded_store):
+    assert walk(seeded_store, 2, order='name') == sorted_ids(sample_clients(), 'name')
+    with pytest.raises(ValueError):
+        seeded_store.page_clients(10, order='age')
+
+
+def test_clients_without_last_updated_come_last(store):
+    store.add_client({'firstName': 'A'})
+    store.add_client({'firstName': 'B', 'lastUpdated': '2024-01-01T00:00:00'})
+    store.add_client({'firstName': 'C'})
+    assert walk(store, 1) == [2, 3, 1]
+    assert 'lastUpdated' not in store.get_client(1)
+
+
+def test_pages_are_stable_across_writes(seeded_store):
+    expected = sorted_ids(sample_clients())
+    page, after = seeded_store.page_clients(3)
+    # A client updated between pages moves to the front instead of showing up again
+    seeded_store.add_resource(page[-1]['id'], {'resource_id': 'x', 'status': 'pending'})
+    rest = []
+    while after is not None:
+        next_page, after = seeded_store.page_clients(3, after)
+        rest.extend(client['id'] for client in next_page)
+    assert rest == expected[3:]
+
+
+@pytest.mark.parametrize('filters, expected', [
+    (cs.ClientFilter(needs=('housing',)), {1, 4, 6, 7}),
+    (cs.ClientFilter(needs=('food', 'mental health')), {2, 3, 5}),
+    (cs.ClientFilter(veteran=True), {2, 6}),
+    (cs.ClientFilter(veteran=False), {1, 3, 4, 5, 7, 8}),
+    (cs.ClientFilter(resource_statuses=('contacted', 'completed')), {2, 6}),
+    (cs.ClientFilter(search='GARCIA'), {1, 7}),
+    (cs.ClientFilter(search='713-555'), {4}),
+    (cs.ClientFilter(search='emily.white@'), {3}),
+    (cs.ClientFilter(urgent=True), {1, 5}),
+    (cs.ClientFilter(needs=('housing',), veteran=True), {6}),
+])
+def test_filters(seeded_store, filters, expected):
+    assert set(walk(seeded_store, 2, filters)) == expected
+    assert seeded_store.count_clients(filters) == len(expected)
+
+
+def query_plan(store, filters, order):
+    """SQLite's plan for a page_clients() query continuing after a key."""
+    conditions, params = store._filter_conditions(filters)
+    sort_value, direction, beyond = ('name_key', 'ASC', '>') if order == 'name' else ('last_updated', 'DESC', '<')
+    conditions.append(f"({sort_value}, id) {beyond} (?, ?)")
+    query = (f"EXPLAIN QUERY PLAN SELECT id, data, last_updated FROM clients WHERE {' AND '.join(conditions)} "
+             f"ORDER BY {sort_value} {direction}, id {direction} LIMIT 11")
+    return " | ".join(row[3] for row in store._connection().execute(query, (*params, 'm', 5)))
+
+
+@pytest.mark.parametrize('filters, order, index', [
+    (cs.ClientFilter(), 'recent', 'clients_last_updated'),
+    (cs.ClientFilter(), 'name', 'clients_name_key'),
+    (cs.ClientFilter(urgent=True), 'recent', 'clients_urgent'),
+    (cs.ClientFilter(veteran=False), 'recent', 'clients_veteran'),
+    (cs.ClientFilter(needs=('housing',), search='garcia'), 'recent', 'clients_last_updated'),
+])
+def test_sqlite_pages_read_an_index(tmp_path, filters, order, index):
+    store = open_store('sqlite', tmp_path)
+    store.reset(sample_clients(), 9)
+    plan = query_plan(store, filters, order)
+    assert f'USING INDEX {index}' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_sqlite_upgrades_an_older_database(tmp_path):
+    db_file = tmp_path / 'clients.db'
+    conn = sqlite3.connect(db_file)
+    conn.executescript("""
+        CREATE TABLE clients (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL, last_updated TEXT);
+        CREATE INDEX clients_last_updated ON clients (last_updated);
+    """)
+    for client in sample_clients()[:3]:
+        document = {k: v for k, v in client.items() if k not in ('id', 'resources', 'lastUpdated')}
+        conn.execute("INSERT INTO clients (id, data, last_updated) VALUES (?, ?, ?)",
+                     (client['id'], json.dumps(document), client['lastUpdated'] if client['id'] != 2 else None))
+    conn.commit()
+    conn.close()
+
+    store = cs.SQLiteClientStore(db_file, legacy_file=None)
+    assert walk(store, 1) == [1, 3, 2]
+    assert walk(store, 1, order='name') == [1, 2, 3]
+    assert walk(store, 1, cs.ClientFilter(veteran=True)) == [2]
+    assert walk(store, 1, cs.ClientFilter(search='white', urgent=False)) == [3]
+
+
+def test_json_store_reloads_external_edits(tmp_path):
+    store = open_store('json', tmp_path)
+    store.add_client({'firstName': 'A'})
+    data = json.loads((tmp_path / 'clients.json').read_text())
+    data['clients'][0]['firstName'] = 'Edited'
+    (tmp_path / 'clients.json').write_text(json.dumps(data))
+    assert store.get_client(1)['firstName'] == 'Edited'
+
+
+def test_json_store_never_overwrites_an_unparsed_file(tmp_path):
+    clients_file = tmp_path / 'clients.json'
+    clients_file.write_text('{"clients": [{"id": 1, "firstName": "A"}], "next_id": 2,')
+    store = open_store('json', tmp_path)
+    with pytest.raises(ValueError):
+        store.get_client(1)
+    with pytest.raises(ValueError):
+        call(store.add_client, {'firstName': 'B'})
+    assert clients_file.read_text().endswith('"next_id": 2,')
+
+    # A hand edit that breaks a file this store already loaded is not overwritten either
+    clients_file.write_text('{"clients": [{"id": 1, "firstName": "A"}], "next_id": 2}')
+    assert store.get_client(1)['firstName'] == 'A'
+    clients_file.write_text('{"clients": [{"id": 1, "firstName": "A2"}], "next_id": 2')
+    with pytest.raises(ValueError):
+        call(store.add_client, {'firstName': 'B'})
+    assert clients_file.read_text().endswith('"next_id": 2')
+
+    clients_file.write_text('{"clients": [{"id": 1, "firstName": "A2"}], "next_id": 2}')
+    assert call(store.add_client, {'firstName': 'B'}).value['id'] == 2
+    assert [client['firstName'] for client in store.list_clients()] == ['A2', 'B']
+
+
+def test_sqlite_imports_legacy_file_once(tmp_path):
+    legacy = tmp_path / 'legacy.json'
+    legacy.write_text(json.dumps({'clients': sample_clients(), 'next_id': 20}))
+    store = cs.SQLiteClientStore(tmp_path / 'clients.db', legacy_file=legacy)
+    assert store.count_clients() == 8
+    assert store.count_clients(cs.ClientFilter(needs=('housing',))) == 4
+    assert store.add_client({'firstName': 'New'}).value['id'] == 20
+    store.delete_client(1)
+    # A restart does not import the file again
+    assert cs.SQLiteClientStore(tmp_path / 'clients.db', legacy_file=legacy).count_clients() == 8
+
+
+def test_writer_survives_a_corrupt_journal(tmp_path):
+    store = open_store('journal', tmp_path)
+    store.add_client({'firstName': 'A'})
+    store.add_client({'firstName': 'B'})
+    store.close()
+    journal_file = tmp_path / 'journal' / 'journal.ndjson'
+    good = journal_file.read_text()
+    journal_file.write_text('{"type": "client_ad\n' + good)
+
+    reopened = open_store('journal', tmp_path)
+    # Every change fails instead of waiting on a writer that died
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            call(reopened.add_client, {'firstName': 'C'})
+
+    journal_file.write_text(good)
+    assert call(reopened.add_client, {'firstName': 'C'}).value['id'] == 3
+    assert [client['firstName'] for client in reopened.list_clients()] == ['A', 'B', 'C']
+    reopened.close()
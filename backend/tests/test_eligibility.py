@@ -0,0 +1,89 @@
+import math
+
+import pytest
+
+from eligibility import NO, UNKNOWN, YES, ClientEligibility, EligibilityIndex, describe_match, normalize_resource, parse_age_range
+
+CATALOG = {
+    'open': {'age_group': 'All ages', 'target_population': 'Anyone in Harris County'},
+    'youth': {'age_group': '18–25', 'target_population': 'Young adults experiencing homelessness'},
+    'seniors': {'age_group': '65+', 'target_population': 'Seniors'},
+    'veterans': {'age_group': 'Adults', 'target_population': 'Veterans and their families'},
+    'disability': {'age_group': 'Adults with documented disability', 'target_population': 'Individuals with disabilities'},
+    'insured': {'age_group': 'All ages', 'insurance_required': 'Yes, Medicaid or private'},
+}
+
+
+def client(age=None, veteran=False, disability=False, uninsured=False):
+    return ClientEligibility(age=age, is_veteran=veteran, has_disability=disability, uninsured=uninsured)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('18–25', (18, 25)),
+    ('14-25 years', (14, 25)),
+    ('65+', (65, math.inf)),
+    ('55 and older', (55, math.inf)),
+    ('12 and under', (0, 12)),
+    ('Adults', (18, math.inf)),
+    ('Families with children', (0, math.inf)),
+    ('18–25 or women with children', (0, math.inf)),
+    ('', (0, math.inf)),
+    ('varies', (0, math.inf)),
+])
+def test_parse_age_range(text, expected):
+    assert parse_age_range(text) == expected
+
+
+def test_normalize_resource():
+    veterans = normalize_resource('v', CATALOG['veterans'])
+    assert veterans.veterans_only and veterans.min_age == 18
+    # A program that includes veterans among others is not veterans-only
+    assert not normalize_resource('x', {'target_population': 'Adults, including veterans'}).veterans_only
+    assert normalize_resource('d', CATALOG['disability']).disability_required
+
+    record = normalize_resource('r', {
+        'insurance_required': 'No', 'accepts_clients_without_id': 'Yes', 'immigration_status': 'Not specified',
+        'ada_accessible': 'Must be able to climb stairs', 'advance_booking_required': 'No, walk-ins welcome',
+    })
+    assert (record.insurance_required, record.accepts_without_id, record.accepts_undocumented) == (NO, YES, UNKNOWN)
+    assert (record.ada_accessible, record.advance_booking_required) == (NO, NO)
+
+
+@pytest.fixture
+def index():
+    eligibility = EligibilityIndex()
+    eligibility.upsert_many(CATALOG)
+    return eligibility
+
+
+@pytest.mark.parametrize('profile, expected', [
+    (client(age=30), {'open', 'insured'}),
+    (client(age=20), {'open', 'youth', 'insured'}),
+    (client(age=70, veteran=True), {'open', 'seniors', 'veterans', 'insured'}),
+    (client(age=40, disability=True, uninsured=True), {'open', 'disability'}),
+    (client(age=None, veteran=True, disability=True), None),
+])
+def test_eligible_ids(index, profile, expected):
+    eligible = index.eligible_ids(profile)
+    assert (set(eligible) if eligible is not None else None) == expected
+
+
+def test_index_writes(index):
+    index.upsert('youth', {'age_group': 'All ages'})
+    assert 'youth' in index.eligible_ids(client(age=40))
+    index.delete('veterans')
+    assert len(index) == len(CATALOG) - 1
+    assert index.get('veterans') is None
+    assert index.mask(client(age=40)).sum() == 3  # open, youth and insured
+
+
+def test_describe_match(index):
+    profile = client(age=70, veteran=True, uninsured=True)
+    assert describe_match(index.get('seniors'), profile) == ['serves ages 65+']
+    assert describe_match(index.get('veterans'), profile) == ['serves ages 18+', 'serves veterans']
+    assert describe_match(normalize_resource('r', {'insurance_required': 'No'}), profile) == ['no insurance required']
+
+
+def test_from_client():
+    profile = ClientEligibility.from_client({'is_veteran': True, 'socialHistory': {'healthInsurance': {'none': True}}}, age=0)
+    assert profile == client(age=None, veteran=True, uninsured=True)
@@ -0,0 +1,75 @@
+import pytest
+from langchain_core.documents import Document
+
+from lexical_index import LexicalIndex, reciprocal_rank_scores, tokenize
+
+
+def doc(text, **metadata):
+    return Document(page_content=text, metadata=metadata)
+
+
+DOCS = {
+    'shelter': doc('Emergency shelter for veterans. No ID required.', category='housing', id='r1'),
+    'pantry': doc('Food pantry open Saturdays in 77002', category='food', id='r2'),
+    'youth': doc('Youth shelter beds for ages 18 to 25', category='housing', id='r3'),
+    'clinic': doc('Free clinic, Vietnamese and Spanish interpreters', category='healthcare', id='r4'),
+}
+
+
+@pytest.fixture
+def index():
+    lexical = LexicalIndex()
+    lexical.add_documents(list(DOCS.values()), list(DOCS))
+    return lexical
+
+
+def ranked(index, query, **kwargs):
+    return [doc.metadata['id'] for doc, _ in index.search(query, **kwargs)]
+
+
+def test_tokenize_keeps_negations_and_numbers():
+    assert tokenize('No ID for the 77002 ZIP, not required') == ['no', 'id', '77002', 'zip', 'not', 'required']
+
+
+def test_exact_terms_rank_first(index):
+    assert ranked(index, 'shelter for veterans') == ['r1', 'r3']
+    assert ranked(index, 'shelter for veterans', k=1) == ['r1']
+    assert ranked(index, 'Vietnamese interpreters') == ['r4']
+    assert ranked(index, '77002') == ['r2']
+    assert ranked(index, 'the and of') == []
+
+
+def test_rare_terms_weigh_more(index):
+    # "shelter" is in two documents, "youth" in one
+    scores = dict((doc.metadata['id'], score) for doc, score in index.search('youth shelter'))
+    assert scores['r3'] > scores['r1'] > 0
+
+
+@pytest.mark.parametrize('search_filter, expected', [
+    ({'category': 'housing'}, ['r1', 'r3']),
+    ({'id': {'$in': ['r3', 'r4']}}, ['r3']),
+    ({'$and': [{'category': 'housing'}, {'id': {'$in': ['r1']}}]}, ['r1']),
+    ({'category': 'food'}, []),
+])
+def test_filters(index, search_filter, expected):
+    assert ranked(index, 'shelter', filter=search_filter) == expected
+
+
+def test_replace_and_delete(index):
+    index.add_documents([doc('Food bank with hot meals', category='food', id='r1')], ['shelter'])
+    assert len(index) == 4
+    assert ranked(index, 'veterans') == []
+    assert ranked(index, 'hot meals') == ['r1']
+    index.delete(['shelter', 'missing'])
+    assert len(index) == 3
+    assert ranked(index, 'meals') == []
+
+
+def test_reciprocal_rank_fusion():
+    a, b, c = doc('a', id='a'), doc('b', id='b'), doc('c', id='c')
+    fused = reciprocal_rank_scores([[a, b], [b, c]], key=lambda d: d.metadata['id'], k=60)
+    assert [d.metadata['id'] for d, _ in fused] == ['b', 'a', 'c']
+    scores = {d.metadata['id']: score for d, score in fused}
+    assert scores['b'] == pytest.approx(1 / 62 + 1 / 61)
+    assert scores['a'] == pytest.approx(1 / 61)
+    assert reciprocal_rank_scores([], key=id) == []
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+import llm_gateway
+import server
+from conftest import make_client
+from llm_gateway import GatewayOverloadedError, GatewayTimeoutError, LLMGateway, RouteLimits
+
+CLIENT = make_client('Maria', 'Garcia', '2024-01-08T10:00:00', id=1, needs=['housing assistance'])
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr(llm_gateway, 'LLM_RETRY_BASE_SECONDS', 0)
+    return LLMGateway({'test': RouteLimits(timeout=0.05, concurrency=1)})
+
+
+def flaky(failures, error):
+    """An attempt that raises error for its first failures calls, then returns how many calls it took."""
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error
+        return len(calls)
+    return attempt
+
+
+def run(gateway, attempt):
+    return asyncio.run(gateway._call('test', attempt))
+
+
+def test_retries_retryable_errors(gateway):
+    assert run(gateway, flaky(llm_gateway.LLM_MAX_RETRIES, asyncio.TimeoutError())) == llm_gateway.LLM_MAX_RETRIES + 1
+    with pytest.raises(ConnectionError):
+        run(gateway, flaky(1, ConnectionError()))
+
+
+def test_gives_up_after_the_last_retry(gateway):
+    async def slow():
+        await asyncio.sleep(1)
+    with pytest.raises(GatewayTimeoutError):
+        run(gateway, slow)
+
+
+def test_sheds_calls_beyond_the_route_limit(gateway):
+    async def scenario():
+        started = asyncio.Event()
+
+        async def held():
+            started.set()
+            await asyncio.sleep(0.02)
+            return 'done'
+        first = asyncio.create_task(gateway._call('test', held))
+        await started.wait()
+        assert gateway.saturated('test')
+        with pytest.raises(GatewayOverloadedError) as shed:
+            await gateway._call('test', held)
+        assert shed.value.retry_after == llm_gateway.LLM_RETRY_AFTER_SECONDS
+        assert await first == 'done'
+        # The slot is free again once the first call returns
+        assert not gateway.saturated('test')
+        return await gateway._call('test', held)
+    assert asyncio.run(scenario()) == 'done'
+
+
+def match(api, latency_tier='full'):
+    return api.post('/api/match-resources', json={'client_data': CLIENT, 'resource_type': 'housing', 'latency_tier': latency_tier})
+
+
+def saturate(monkeypatch):
+    """Takes every slot of the app's 'match' route."""
+    monkeypatch.setattr(server.get_gateway()._semaphores['match'], '_value', 0)
+
+
+def test_saturated_route_sheds_uncached_full_matches(app_client, matcher, monkeypatch):
+    saturate(monkeypatch)
+    response = match(app_client)
+    assert response.status_code == 429
+    assert response.headers['Retry-After']
+    stream = app_client.post('/api/match-resources/stream', json={'client_data': CLIENT, 'resource_type': 'housing'})
+    assert stream.status_code == 429
+    # Templated tiers make no LLM call, so they take no slot
+    assert match(app_client, latency_tier='fast').status_code == 200
+
+
+def test_saturated_route_serves_cached_full_matches(app_client, matcher, monkeypatch):
+    recommendations = match(app_client).json()['recommendations']
+    saturate(monkeypatch)
+
+    response = match(app_client)
+    assert response.status_code == 200
+    assert response.json()['recommendations'] == recommendations
+    stream = app_client.post('/api/match-resources/stream', json={'client_data': CLIENT, 'resource_type': 'housing'})
+    assert stream.status_code == 200
+    assert json.loads(stream.text.splitlines()[-1])['recommendations'] == recommendations
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from conftest import make_client
+
+CLIENT = make_client('Maria', 'Garcia', '2024-01-08T10:00:00', id=1, needs=['housing assistance'])
+
+
+def batch(api, requests, **options):
+    response = api.post('/api/match-resources/batch', json={'requests': requests, **options})
+    assert response.status_code == 200, response.text
+    return {line['index']: line for line in map(json.loads, response.text.splitlines())}
+
+
+def test_matches_every_item(api, matcher):
+    lines = batch(api, [
+        {'client_id': 1, 'resource_type': 'housing'},
+        {'client_data': CLIENT, 'resource_type': 'food'},
+        {'client_id': 99},
+        {'resource_type': 'food'},
+    ], latency_tier='fast')
+    assert lines[0]['client_id'] == 1
+    assert lines[0]['recommendations']['retrieved_recommendations']
+    assert lines[1]['resource_type'] == 'food'
+    assert lines[2]['error'] == "Client not found"
+    assert lines[3]['error'] == "Client data is required"
+
+
+@pytest.mark.parametrize('item, error', [
+    ('not an item', "Each request must be an object"),
+    (7, "Each request must be an object"),
+    ({'client_data': ['Maria']}, "client_data must be an object"),
+    ({'client_id': [1, 2]}, "client_id must be an integer"),
+    ({'client_id': '1'}, "client_id must be an integer"),
+    ({'client_data': CLIENT, 'resource_type': ['housing', 'food']}, "resource_type must be a non-empty string"),
+    ({'client_data': CLIENT, 'resource_type': ''}, "resource_type must be a non-empty string"),
+])
+def test_malformed_items_get_their_own_error(api, matcher, item, error):
+    lines = batch(api, [item, {'client_data': CLIENT, 'resource_type': 'housing'}], latency_tier='fast')
+    assert lines[0] == {'index': 0, 'error': error}
+    assert lines[1]['recommendations']['retrieved_recommendations']
+
+
+@pytest.mark.parametrize('payload', [{'requests': []}, {'requests': 'all'}, {'requests': [{}], 'latency_tier': 'now'}])
+def test_rejects_malformed_batches(app_client, payload):
+    assert app_client.post('/api/match-resources/batch', json=payload).status_code == 400
@@ -0,0 +1,114 @@
+import json
+
+from conftest import make_client, wait_for_deferred
+
+CLIENT = make_client(
+    'Maria', 'Garcia', '2024-01-08T10:00:00', id=1, dateOfBirth='1996-03-02', gender='Female',
+    needs=['housing assistance', 'childcare'], notes='Fleeing an abusive partner with a 2-year-old son.',
+)
+
+
+def match(api, client_data=CLIENT, latency_tier='full', resource_type='housing'):
+    return api.post('/api/match-resources', json={
+        'client_data': client_data, 'resource_type': resource_type, 'latency_tier': latency_tier
+    })
+
+
+def cache_key(matcher, client_data=CLIENT, resource_type='housing'):
+    return matcher.recommendation_cache_key(client_data, resource_type)
+
+
+def test_full_match_is_cached(app_client, matcher):
+    first = match(app_client)
+    assert first.status_code == 200
+    recommendations = first.json()['recommendations']
+    assert recommendations['rationale_source'] == 'llm'
+    assert recommendations['retrieved_recommendations']
+
+    hits = matcher.result_cache.hits
+    assert match(app_client).json()['recommendations'] == recommendations
+    assert matcher.result_cache.hits == hits + 1
+
+    # A changed profile is a different key
+    changed = {**CLIENT, 'notes': 'Now also needs childcare during job interviews.'}
+    assert matcher.get_cached_result(cache_key(matcher, changed)) is None
+
+
+def test_catalog_change_misses(app_client, matcher):
+    recommendations = match(app_client).json()['recommendations']
+    key = cache_key(matcher)
+    matcher._bump_catalog_version()
+    assert cache_key(matcher) != key
+    assert matcher.get_cached_result(cache_key(matcher)) is None
+    assert match(app_client).json()['recommendations']['retrieved_recommendations'] == recommendations['retrieved_recommendations']
+
+
+def test_fast_tier_is_not_served_to_full_requests(app_client, matcher):
+    fast = match(app_client, latency_tier='fast').json()['recommendations']
+    assert fast['rationale_source'] == 'template'
+    assert 'rationale_pending' not in fast
+    assert not matcher._deferred_tasks
+
+    # The template satisfies another fast request, but a full one computes the rationale
+    assert match(app_client, latency_tier='fast').json()['recommendations'] == fast
+    assert match(app_client).json()['recommendations']['rationale_source'] == 'llm'
+
+
+def test_deferred_tier_fills_in_the_background(app_client, matcher):
+    deferred = match(app_client, latency_tier='deferred').json()['recommendations']
+    assert deferred['rationale_source'] == 'template'
+    assert deferred['rationale_pending'] is True
+
+    wait_for_deferred(matcher)
+    filled = matcher.get_cached_result(cache_key(matcher))
+    assert filled['rationale_source'] == 'llm'
+    assert match(app_client, latency_tier='deferred').json()['recommendations'] == filled
+
+
+def test_rejects_unknown_tier(app_client, matcher):
+    assert match(app_client, latency_tier='instant').status_code == 400
+
+
+def test_batch_serves_cached_items(app_client, matcher):
+    other = {**CLIENT, 'id': 2, 'firstName': 'Ana', 'notes': 'Needs food for a family of four.'}
+    payload = {'requests': [
+        {'client_data': CLIENT, 'resource_type': 'housing'},
+        {'client_data': other, 'resource_type': 'food'},
+        {'resource_type': 'food'},
+    ]}
+    lines = [json.loads(line) for line in app_client.post('/api/match-resources/batch', json=payload).text.splitlines()]
+    by_index = {line['index']: line for line in lines}
+    assert by_index[2]['error'] == "Client data is required"
+    assert by_index[0]['recommendations']['rationale_source'] == 'llm'
+
+    hits = matcher.result_cache.hits
+    again = [json.loads(line) for line in app_client.post('/api/match-resources/batch', json=payload).text.splitlines()]
+    assert matcher.result_cache.hits == hits + 2
+    assert {line['index']: line.get('recommendations') for line in again} == {
+        index: line.get('recommendations') for index, line in by_index.items()
+    }
+
+
+def test_deferred_after_fast_schedules_the_fill(app_client, matcher):
+    assert match(app_client, latency_tier='fast').json()['recommendations']['rationale_source'] == 'template'
+    assert not matcher._deferred_tasks
+
+    # The template left by the fast request is a hit, but the rationale still gets filled
+    deferred = match(app_client, latency_tier='deferred').json()['recommendations']
+    assert deferred['rationale_source'] == 'template'
+    assert deferred['rationale_pending'] is True
+
+    wait_for_deferred(matcher)
+    assert matcher.get_cached_result(cache_key(matcher))['rationale_source'] == 'llm'
+
+
+def test_deferred_batch_after_fast_schedules_the_fill(app_client, matcher):
+    payload = {'requests': [{'client_data': CLIENT, 'resource_type': 'housing'}]}
+    fast = app_client.post('/api/match-resources/batch', json={**payload, 'latency_tier': 'fast'}).text
+    assert json.loads(fast)['recommendations']['rationale_source'] == 'template'
+
+    deferred = json.loads(app_client.post('/api/match-resources/batch', json={**payload, 'latency_tier': 'deferred'}).text)
+    assert deferred['recommendations']['rationale_pending'] is True
+
+    wait_for_deferred(matcher)
+    assert matcher.get_cached_result(cache_key(matcher))['rationale_source'] == 'llm'
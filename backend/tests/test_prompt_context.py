@@ -0,0 +1,107 @@
+from langchain_core.documents import Document
+
+from prompt_context import MIN_RESOURCE_TOKENS, build_context, count_tokens, truncate_to_tokens
+
+MODEL = 'gpt-4o-mini'
+
+
+def resource(name, **fields):
+    return Document(page_content=f'Resource: {name}', metadata={'resource_name': name, **fields})
+
+
+SHELTER = resource(
+    'Star of Hope', organization='Star of Hope Mission', services='Emergency shelter, meals and case management',
+    location='1811 Ruiz St, Houston', hours='24/7', contact='713-222-2220', immigration_status='Not specified',
+    accepts_clients_without_id='Yes',
+)
+
+
+def test_truncate_to_tokens():
+    text = 'Emergency shelter, meals and case management for families'
+    assert truncate_to_tokens(text, 100, MODEL) == text
+    clipped = truncate_to_tokens(text, 3, MODEL)
+    assert clipped.endswith('…') and text.startswith(clipped[:-1])
+    assert count_tokens(clipped[:-1], MODEL) == 3
+    assert truncate_to_tokens(text, 0, MODEL) == ''
+
+
+def test_fields_come_from_metadata_without_placeholders():
+    context, tokens = build_context([SHELTER], 1000, MODEL)
+    assert context.splitlines() == [
+        'Resource: Star of Hope',
+        'Organization: Star of Hope Mission',
+        'Services: Emergency shelter, meals and case management',
+        'Location: 1811 Ruiz St, Houston',
+        'Hours: 24/7',
+        'Contact: 713-222-2220',
+        'Accepts Clients Without ID: Yes',
+    ]
+    assert tokens == count_tokens(context, MODEL)
+
+
+def test_short_fields_keep_their_labels_even_when_repeated():
+    document = resource(
+        'Casa Juan Diego', target_population='Immigrant families and women with children in Houston',
+        eligibility='Immigrant families and women with children in Houston', hours='Yes',
+        accepts_clients_without_id='Yes', advance_booking_required='No', ada_accessible='Yes',
+    )
+    lines = build_context([document], 1000, MODEL)[0].splitlines()
+    assert lines == [
+        'Resource: Casa Juan Diego',
+        'Target Population: Immigrant families and women with children in Houston',
+        'Hours: Yes',
+        'Accepts Clients Without ID: Yes',
+        'Advance Booking Required: No',
+        'ADA Accessible: Yes',
+    ]
+
+
+def test_budget_cuts_lowest_priority_fields_first():
+    full, full_tokens = build_context([SHELTER], 1000, MODEL)
+    context, tokens = build_context([SHELTER], full_tokens // 2, MODEL)
+    assert tokens <= full_tokens // 2
+    assert context.startswith('Resource: Star of Hope\nOrganization: Star of Hope Mission')
+    assert 'Accepts Clients Without ID' not in context
+
+
+def test_every_resource_gets_a_share():
+    documents = [resource(f'Resource {n}', services='Shelter, meals, showers, laundry and mail ' * 10) for n in range(5)]
+    context, tokens = build_context(documents, 5 * MIN_RESOURCE_TOKENS, MODEL)
+    assert tokens <= 5 * MIN_RESOURCE_TOKENS
+    assert [line for line in context.splitlines() if line.startswith('Resource:')] == [f'Resource: Resource {n}' for n in range(5)]
+
+
+def test_separators_are_charged_only_between_shown_resources():
+    long = resource('Star of Hope', services='Emergency shelter, meals and case management ' * 80)
+    budget = 4 * MIN_RESOURCE_TOKENS
+    # Resources with no fields are skipped and leave no separator cost behind, so the one
+    # shown gets the same (clipped) block as it would on its own
+    assert build_context([resource('')] * 3 + [long], budget, MODEL) == build_context([long], budget, MODEL)
+
+
+def test_tight_budget_drops_resources_instead_of_their_fields():
+    documents = [
+        resource(f'Resource {n}', services='Shelter, meals, showers, laundry and mail', hours='Mon-Fri 8am-5pm')
+        for n in range(15)
+    ]
+    context, tokens = build_context(documents, 600, MODEL)
+    blocks = context.split('\n---\n')
+    assert len(blocks) == 600 // MIN_RESOURCE_TOKENS
+    assert all(len(block.splitlines()) == 3 for block in blocks)
+    assert tokens <= 600
+
+
+def test_multi_category_prompt_gets_a_budget_per_category(matcher):
+    client = {'firstName': 'Sam', 'dateOfBirth': '1980-05-01', 'is_veteran': True}
+    resource_types = ['housing', 'food', 'transportation']
+    question = matcher._build_client_question(client, resource_types)
+    documents = [doc for docs in matcher._retrieve_by_type(question, resource_types, client).values() for doc in docs]
+    _, inputs = matcher._summary_prompt(question, documents, resource_types)
+    blocks = inputs['context'].split('\n---\n')
+    assert len(blocks) == len(documents)
+    # Every resource keeps more than its name
+    assert min(len(block.splitlines()) for block in blocks) > 2
+
+
+def test_empty_input():
+    assert build_context([], 600, MODEL) == ('', 0)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from reranking import collapse_by_resource, maximal_marginal_relevance
+
+
+def chunk(resource, part):
+    return Document(page_content=f'{resource} part {part}', metadata={'id': resource})
+
+
+def resource_of(document):
+    return document.metadata['id']
+
+
+SCORED = [(chunk('a', 1), 0.9), (chunk('b', 1), 0.8), (chunk('b', 2), 0.7), (chunk('a', 2), 0.1), (chunk('c', 1), 0.5)]
+
+
+def test_collapse_keeps_the_best_chunk():
+    collapsed = collapse_by_resource(SCORED, key=resource_of)
+    assert [(doc.page_content, score) for doc, score in collapsed] == [('a part 1', 0.9), ('b part 1', 0.8), ('c part 1', 0.5)]
+
+
+def test_collapse_sum_favours_repeated_matches():
+    collapsed = collapse_by_resource(SCORED, key=resource_of, aggregate='sum')
+    assert [doc.page_content for doc, _ in collapsed] == ['b part 1', 'a part 1', 'c part 1']
+    assert collapsed[0][1] == pytest.approx(1.5)
+
+
+def test_collapse_rejects_unknown_aggregation():
+    with pytest.raises(ValueError):
+        collapse_by_resource(SCORED, key=resource_of, aggregate='mean')
+
+
+# Candidates 0 and 1 are near duplicates; 2 points elsewhere
+VECTORS = np.array([[1.0, 0.0], [0.99, 0.1], [0.0, 1.0]])
+SCORES = np.array([0.9, 0.85, 0.6])
+
+
+def test_mmr_without_diversity_keeps_relevance_order():
+    assert maximal_marginal_relevance(SCORES, VECTORS, k=3, lambda_mult=1.0) == [0, 1, 2]
+
+
+def test_mmr_skips_near_duplicates():
+    assert maximal_marginal_relevance(SCORES, VECTORS, k=2, lambda_mult=0.5) == [0, 2]
+
+
+def test_mmr_edge_cases():
+    assert maximal_marginal_relevance(np.array([]), np.zeros((0, 2)), k=3, lambda_mult=0.5) == []
+    assert maximal_marginal_relevance(SCORES, VECTORS, k=0, lambda_mult=0.5) == []
+    # Equal scores and a zero vector do not divide by zero
+    assert sorted(maximal_marginal_relevance(np.ones(3), np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]]), k=5, lambda_mult=0.5)) == [0, 1, 2]
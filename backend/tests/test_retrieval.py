@@ -0,0 +1,71 @@
+import asyncio
+
+import rag_resource_matcher as rrm
+from rag_resource_matcher import TOP_K, get_resource_id
+
+VETERAN_PASS = 'res_metro_veterans_pass'
+QUESTION = 'Find transportation resources for a client. Free bus rides for a veteran.'
+
+
+def client(**fields):
+    return {'firstName': 'Sam', 'lastName': 'Lee', 'dateOfBirth': '1980-05-01', **fields}
+
+
+def retrieve(matcher, client_data, resource_types=('transportation',), question=QUESTION):
+    return matcher._retrieve_by_type(question, list(resource_types), client_data)
+
+
+def resource_ids(documents):
+    return [get_resource_id(doc.metadata) for doc in documents]
+
+
+def test_one_chunk_per_resource_within_the_category(matcher):
+    for documents in retrieve(matcher, client(is_veteran=True), ('transportation', 'housing')).values():
+        ids = resource_ids(documents)
+        assert 0 < len(ids) <= TOP_K
+        assert len(set(ids)) == len(ids)
+    documents = retrieve(matcher, client(is_veteran=True))['transportation']
+    assert {doc.metadata['category'] for doc in documents} == {'transportation'}
+
+
+def test_ineligible_resources_are_filtered_before_ranking(matcher):
+    assert VETERAN_PASS in resource_ids(retrieve(matcher, client(is_veteran=True))['transportation'])
+    ids = resource_ids(retrieve(matcher, client())['transportation'])
+    assert VETERAN_PASS not in ids
+    # Only four transportation resources are open to a non-veteran adult without a
+    # disability; all of them are found instead of ineligible hits taking their slots
+    eligible = matcher._search_filter('transportation', matcher._eligible_ids(client()))
+    assert sorted(ids) == sorted({get_resource_id(m) for m in matcher.vector_store.get(where=eligible)['metadatas']})
+    assert len(ids) == 4
+
+
+def test_age_limits_apply(matcher):
+    question = 'Find housing resources for a client. Shelter for a young adult.'
+    young = resource_ids(retrieve(matcher, client(dateOfBirth='2004-01-01'), ('housing',), question)['housing'])
+    older = resource_ids(retrieve(matcher, client(dateOfBirth='1960-01-01'), ('housing',), question)['housing'])
+    youth_only = {resource_id for resource_id in young if matcher.eligibility.get(resource_id).max_age < 30}
+    assert youth_only
+    assert not youth_only & set(older)
+
+
+def test_lexical_only_retrieval(matcher, monkeypatch):
+    monkeypatch.setattr(rrm, 'RETRIEVAL_MODE', 'lexical')
+    ids = resource_ids(retrieve(matcher, client(is_veteran=True))['transportation'])
+    assert VETERAN_PASS in ids
+    assert VETERAN_PASS not in resource_ids(retrieve(matcher, client())['transportation'])
+
+
+def test_batch_retrieval_matches_single_requests(matcher):
+    requests = [(client(is_veteran=True), 'transportation'), (client(), 'transportation'), (client(), 'food')]
+    batched = asyncio.run(matcher.aretrieve_batch(requests))
+    for (client_data, resource_type), (question, documents) in zip(requests, batched):
+        single = retrieve(matcher, client_data, (resource_type,), question)[resource_type]
+        assert resource_ids(documents) == resource_ids(single)
+
+
+def test_query_embeddings_are_cached(matcher):
+    matcher.query_cache.clear()
+    hits = matcher.query_cache.hits
+    retrieve(matcher, client(), question=QUESTION + ' Wheelchair access.')
+    retrieve(matcher, client(), question=QUESTION + '  Wheelchair   access.')
+    assert matcher.query_cache.hits == hits + 1
@@ -0,0 +1,155 @@
+import asyncio
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import vector_store
+from model_providers import HashingEmbeddings
+from vector_store import NumpyVectorStore
+
+TEXTS = [
+    'emergency shelter beds for families',
+    'youth shelter for ages 18 to 25',
+    'food pantry with fresh produce',
+    'hot meals served daily downtown',
+    'free dental clinic for uninsured adults',
+    'mental health counseling on a sliding scale',
+    'job training and resume help',
+    'veterans housing and case management',
+]
+CATEGORIES = ['housing', 'housing', 'food', 'food', 'healthcare', 'healthcare', 'employment', 'housing']
+
+
+@pytest.fixture(scope='module')
+def embeddings():
+    return HashingEmbeddings(dimensions=256)
+
+
+def make_store(embeddings, quantization='none', rescore_oversample=4):
+    store = NumpyVectorStore(embeddings, quantization=quantization, rescore_oversample=rescore_oversample)
+    store.add_texts(TEXTS, metadatas=[{'category': c, 'id': f'r{i}'} for i, c in enumerate(CATEGORIES)], ids=[f'c{i}' for i in range(len(TEXTS))])
+    return store
+
+
+def exact_ranking(embeddings, query):
+    scores = np.asarray(embeddings.embed_documents(TEXTS)) @ np.asarray(embeddings.embed_query(query))
+    return [TEXTS[row] for row in np.argsort(-scores)]
+
+
+def texts(hits):
+    return [doc.page_content for doc, _ in hits]
+
+
+def test_ranks_by_cosine_similarity(embeddings):
+    store = make_store(embeddings)
+    hits = store.similarity_search_with_score('shelter for families and youth', k=3)
+    assert texts(hits) == exact_ranking(embeddings, 'shelter for families and youth')[:3]
+    assert hits[0][0].page_content == 'youth shelter for ages 18 to 25'
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+
+
+@pytest.mark.parametrize('search_filter, allowed', [
+    ({'category': 'food'}, {2, 3}),
+    ({'id': {'$in': ['r0', 'r4']}}, {0, 4}),
+    ({'$and': [{'category': 'housing'}, {'id': {'$in': ['r1', 'r7', 'r2']}}]}, {1, 7}),
+    ({'category': 'transportation'}, set()),
+])
+def test_filters_before_top_k(embeddings, search_filter, allowed):
+    store = make_store(embeddings)
+    hits = store.similarity_search('shelter for youth', k=5, filter=search_filter)
+    assert {TEXTS.index(doc.page_content) for doc in hits} == allowed
+
+
+def test_batched_search_matches_single_searches(embeddings):
+    store = make_store(embeddings)
+    queries = ['hot food', 'counseling', 'housing for veterans']
+    filters = [{'category': 'food'}, None, {'category': 'housing'}]
+    vectors = embeddings.embed_documents(queries)
+    batched = store.similarity_search_by_vectors_with_score(vectors, k=2, filters=filters)
+    single = [store.similarity_search_by_vector_with_score(v, k=2, filter=f) for v, f in zip(vectors, filters)]
+    assert [texts(hits) for hits in batched] == [texts(hits) for hits in single]
+    assert asyncio.run(store.asimilarity_search_by_vectors_with_score(vectors, k=2, filters=filters)) == batched
+
+
+@pytest.mark.parametrize('quantization, ratio', [('float16', 2), ('int8', 4)])
+def test_quantization_shrinks_the_matrix(embeddings, quantization, ratio):
+    full, quantized = make_store(embeddings), make_store(embeddings, quantization)
+    rows = len(TEXTS)
+    # int8 keeps one float32 scale per row
+    assert quantized.nbytes - rows * 4 == (full.nbytes - rows * 4) // ratio
+    stored = quantized.get(include=['embeddings'])['embeddings']
+    assert np.allclose(stored, full.get(include=['embeddings'])['embeddings'], atol=0.02)
+
+
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+def test_quantized_search_rescores_exactly(embeddings, quantization):
+    full, quantized = make_store(embeddings), make_store(embeddings, quantization)
+    # Queries whose top three scores are distinct, so ties cannot reorder them
+    for query in ['shelter for families and youth', 'hot food pantry meals']:
+        exact = full.similarity_search_with_score(query, k=3)
+        rescored = quantized.similarity_search_with_score(query, k=3)
+        assert texts(rescored) == texts(exact)
+        assert [score for _, score in rescored] == pytest.approx([score for _, score in exact], abs=1e-6)
+
+
+def test_quantized_search_without_rescoring_is_approximate(embeddings):
+    store = make_store(embeddings, 'int8', rescore_oversample=0)
+    hits = store.similarity_search_with_score('shelter for youth', k=3)
+    exact = make_store(embeddings).similarity_search_with_score('shelter for youth', k=3)
+    assert hits[0][0].page_content == exact[0][0].page_content
+    assert hits[0][1] == pytest.approx(exact[0][1], abs=0.02)
+
+
+def test_rejects_unknown_quantization(embeddings):
+    with pytest.raises(ValueError):
+        NumpyVectorStore(embeddings, quantization='int4')
+
+
+@pytest.mark.parametrize('quantization', ['none', 'int8'])
+def test_replace_and_delete(embeddings, quantization):
+    store = make_store(embeddings, quantization)
+    store.add_texts(['legal aid for tenants facing eviction'], metadatas=[{'category': 'legal', 'id': 'r0'}], ids=['c0'])
+    assert len(store) == len(TEXTS)
+    assert store.get(ids=['c0'])['documents'] == ['legal aid for tenants facing eviction']
+    assert texts(store.similarity_search_with_score('eviction legal aid', k=1)) == ['legal aid for tenants facing eviction']
+
+    store.delete(['c0', 'c2'])
+    assert len(store) == len(TEXTS) - 2
+    assert store.get(where={'category': 'food'})['ids'] == ['c3']
+    assert 'legal aid for tenants facing eviction' not in texts(store.similarity_search_with_score('eviction', k=10))
+
+
+def test_empty_store(embeddings):
+    store = NumpyVectorStore(embeddings)
+    assert store.similarity_search('shelter') == []
+    assert store.similarity_search_by_vectors_with_score([embeddings.embed_query('shelter')], k=2) == [[]]
+
+
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+def test_quantized_scores_are_computed_in_blocks(embeddings, monkeypatch, quantization):
+    store = make_store(embeddings, quantization)
+    snap = store._snapshot
+    queries = np.asarray(embeddings.embed_documents(['shelter for youth', 'hot meals']), dtype=np.float32)
+    whole = (queries @ snap.matrix.T.astype(np.float32)) * snap.scales
+    monkeypatch.setattr(vector_store, 'SCORE_CHUNK_ROWS', 3)
+    assert np.allclose(store._scores(snap, queries), whole)
+    assert np.allclose(store._scores(snap, queries[0]), whole[0])
+
+
+def test_quantized_scoring_does_not_widen_the_whole_matrix(monkeypatch):
+    monkeypatch.setattr(vector_store, 'SCORE_CHUNK_ROWS', 2048)
+    rows, dim = 20_000, 256
+    store = NumpyVectorStore(HashingEmbeddings(dimensions=dim), quantization='int8')
+    rng = np.random.default_rng(0)
+    store.add_vectors(rng.standard_normal((rows, dim)).astype(np.float32).tolist(), [''] * rows, ids=[str(i) for i in range(rows)])
+    query = rng.standard_normal(dim).astype(np.float32)
+
+    tracemalloc.start()
+    try:
+        store._scores(store._snapshot, query)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # A float32 copy of the matrix alone would be four times its int8 size; a block is a tenth of that
+    assert peak < store.nbytes // 2
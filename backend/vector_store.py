@@ -0,0 +1,354 @@
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+class _Snapshot(NamedTuple):
+    """Immutable view of the index. Writers build a new one and swap it in."""
+    matrix: np.ndarray          # (n, dim) rows L2-normalized; float32, float16 or int8 codes
+    scales: np.ndarray          # (n,) float32 per-row dequantization scale (1.0 unless int8)
+    ids: List[str]
+    documents: List[Document]
+    columns: Dict[str, np.ndarray]  # (n,) object arrays of frequently filtered metadata fields
+
+
+# Metadata fields kept as precomputed columns so filters on them are a single vectorized compare
+INDEXED_METADATA = ('category', 'id')
+
+# Storage formats for the embedding matrix: bytes per dimension are 4, 2 and 1
+QUANTIZATION_DTYPES = {'none': np.float32, 'float16': np.float16, 'int8': np.int8}
+
+# Quantized rows widened to float32 per block when scoring, so a search never holds a
+# float32 copy of the whole matrix (4096 rows of 1536 dims is 24 MiB)
+SCORE_CHUNK_ROWS = 4096
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalizes rows so a dot product is the cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Brute-force in-memory vector store for small catalogs.
+
+    All embeddings live in one contiguous float32 matrix, so a search is a single
+    matrix-vector product followed by argpartition. Category filters are applied as a
+    boolean mask over precomputed metadata columns instead of post-filtering hits.
+    Filters use Chroma's syntax, so either backend accepts the same filter dicts.
+
+    With quantization 'float16' or 'int8' (symmetric, one scale per row) the matrix
+    takes 1/2 or 1/4 of the memory. Searches then pick rescore_oversample * k
+    candidates by their quantized scores and rescore them exactly with full-precision
+    vectors from the embedding model, which for the matcher is the disk-backed
+    embedding cache, so no network call is made. rescore_oversample=0 disables this.
+    """
+
+    def __init__(self, embedding: Embeddings, quantization: str = 'none', rescore_oversample: int = 4):
+        if quantization not in QUANTIZATION_DTYPES:
+            raise ValueError(f"quantization must be one of {', '.join(QUANTIZATION_DTYPES)}, got '{quantization}'")
+        self._embedding = embedding
+        self.quantization = quantization
+        self.rescore_oversample = rescore_oversample
+        self._write_lock = threading.Lock()
+        self._snapshot = _Snapshot(
+            matrix=np.zeros((0, 0), dtype=QUANTIZATION_DTYPES[quantization]),
+            scales=np.zeros(0, dtype=np.float32),
+            ids=[],
+            documents=[],
+            columns={key: np.empty(0, dtype=object) for key in INDEXED_METADATA},
+        )
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def __len__(self) -> int:
+        return len(self._snapshot.ids)
+
+    @property
+    def _rescores(self) -> bool:
+        """Whether searches rescore quantized candidates with full-precision vectors."""
+        return self.quantization != 'none' and self.rescore_oversample > 0
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the stored vectors and their scales."""
+        snap = self._snapshot
+        return snap.matrix.nbytes + snap.scales.nbytes
+
+    def _encode(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Converts normalized float32 rows to the storage format. Returns (matrix, scales)."""
+        scales = np.ones(len(rows), dtype=np.float32)
+        if self.quantization == 'int8':
+            scales = np.abs(rows).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.clip(np.rint(rows / scales[:, None]), -127, 127).astype(np.int8)
+            return codes, scales.astype(np.float32)
+        return rows.astype(QUANTIZATION_DTYPES[self.quantization]), scales
+
+    # --- Writes ---
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        """Embeds and adds texts. Rows whose id already exists are replaced in place."""
+        texts = list(texts)
+        vectors = self._embedding.embed_documents(texts)
+        return self.add_vectors(vectors, texts, metadatas=metadatas, ids=ids)
+
+    def add_vectors(
+        self,
+        vectors: List[List[float]],
+        texts: List[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """Adds precomputed embeddings. Rows whose id already exists are replaced in place."""
+        metadatas = metadatas or [{} for _ in texts]
+        ids = [str(i) for i in ids] if ids else [str(len(self) + n) for n in range(len(texts))]
+        new_rows, new_scales = self._encode(_normalize(np.asarray(vectors, dtype=np.float32)))
+        new_docs = [Document(page_content=t, metadata=m or {}) for t, m in zip(texts, metadatas)]
+
+        with self._write_lock:
+            snap = self._snapshot
+            row_of = {doc_id: row for row, doc_id in enumerate(snap.ids)}
+            if len(snap.ids):
+                matrix, scales = snap.matrix.copy(), snap.scales.copy()
+            else:
+                matrix = np.zeros((0, new_rows.shape[1]), dtype=new_rows.dtype)
+                scales = np.zeros(0, dtype=np.float32)
+            all_ids, documents = list(snap.ids), list(snap.documents)
+            appended = []
+            for n, doc_id in enumerate(ids):
+                if doc_id in row_of:
+                    matrix[row_of[doc_id]] = new_rows[n]
+                    scales[row_of[doc_id]] = new_scales[n]
+                    documents[row_of[doc_id]] = new_docs[n]
+                else:
+                    appended.append(n)
+            if appended:
+                matrix = np.vstack([matrix, new_rows[appended]])
+                scales = np.concatenate([scales, new_scales[appended]])
+                all_ids.extend(ids[n] for n in appended)
+                documents.extend(new_docs[n] for n in appended)
+            self._swap(np.ascontiguousarray(matrix), scales, all_ids, documents)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Removes rows by id."""
+        if not ids:
+            return False
+        drop = set(str(i) for i in ids)
+        with self._write_lock:
+            snap = self._snapshot
+            keep = [row for row, doc_id in enumerate(snap.ids) if doc_id not in drop]
+            self._swap(
+                np.ascontiguousarray(snap.matrix[keep]),
+                snap.scales[keep],
+                [snap.ids[row] for row in keep],
+                [snap.documents[row] for row in keep],
+            )
+        return True
+
+    def _swap(self, matrix: np.ndarray, scales: np.ndarray, ids: List[str], documents: List[Document]) -> None:
+        columns = {
+            key: np.array([doc.metadata.get(key) for doc in documents], dtype=object)
+            for key in INDEXED_METADATA
+        }
+        # Replacing the reference is atomic, so concurrent searches see either the old or new index
+        self._snapshot = _Snapshot(matrix, scales, ids, documents, columns)
+
+    # --- Reads ---
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Looks up stored rows by id and/or metadata filter, shaped like Chroma's get():
+        {"ids", "documents", "metadatas", "embeddings"}. Embeddings are the stored
+        (dequantized) unit vectors and are only returned when included.
+        """
+        snap = self._snapshot
+        include = include or ["documents", "metadatas"]
+        mask = self._filter_mask(snap, where)
+        rows = np.arange(len(snap.ids)) if mask is None else np.flatnonzero(mask)
+        if ids is not None:
+            wanted = set(str(i) for i in ids)
+            rows = [row for row in rows if snap.ids[row] in wanted]
+        rows = list(rows)
+        return {
+            "ids": [snap.ids[row] for row in rows],
+            "documents": [snap.documents[row].page_content for row in rows] if "documents" in include else None,
+            "metadatas": [snap.documents[row].metadata for row in rows] if "metadatas" in include else None,
+            "embeddings": (
+                snap.matrix[rows].astype(np.float32) * snap.scales[rows, None] if "embeddings" in include else None
+            ),
+        }
+
+    def similarity_search(
+        self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        embedding = self._embedding.embed_query(query)
+        return self.similarity_search_by_vector_with_score(embedding, k=k, filter=filter)
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k=k, filter=filter)]
+
+    async def asimilarity_search_by_vector(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Document]:
+        if self._rescores:
+            # Rescoring reads full-precision vectors through the embedding model (a disk
+            # cache read, or an API call for an evicted vector), so keep it off the event loop
+            return await asyncio.to_thread(self.similarity_search_by_vector, embedding, k=k, filter=filter)
+        # An in-memory matrix product is cheaper than a thread hand-off, so run it inline
+        return self.similarity_search_by_vector(embedding, k=k, filter=filter)
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Returns the top-k documents by cosine similarity, restricted to rows matching the filter."""
+        snap = self._snapshot
+        if not snap.ids or k <= 0:
+            return []
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+        scores = self._scores(snap, query)
+
+        mask = self._filter_mask(snap, filter)
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        return self._top_k(snap, scores, k, query)
+
+    def similarity_search_by_vectors_with_score(
+        self,
+        embeddings: List[List[float]],
+        k: int = 4,
+        filters: Optional[List[Optional[Dict[str, Any]]]] = None,
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Batched top-k search: every query is scored against the whole catalog in one
+        matrix-matrix product, then each row gets its own filter mask and top-k.
+        """
+        snap = self._snapshot
+        if not snap.ids or k <= 0 or not embeddings:
+            return [[] for _ in embeddings]
+        queries = _normalize(np.asarray(embeddings, dtype=np.float32))
+        scores = self._scores(snap, queries)
+
+        filters = filters or [None] * len(queries)
+        masks: Dict[Any, Optional[np.ndarray]] = {}
+        for row, row_filter in enumerate(filters):
+            key = json.dumps(row_filter, sort_keys=True) if row_filter else None
+            if key not in masks:
+                masks[key] = self._filter_mask(snap, row_filter)
+            if masks[key] is not None:
+                scores[row] = np.where(masks[key], scores[row], -np.inf)
+        return [self._top_k(snap, scores[row], k, queries[row]) for row in range(len(queries))]
+
+    async def asimilarity_search_by_vectors_with_score(
+        self,
+        embeddings: List[List[float]],
+        k: int = 4,
+        filters: Optional[List[Optional[Dict[str, Any]]]] = None,
+    ) -> List[List[Tuple[Document, float]]]:
+        """Async variant of similarity_search_by_vectors_with_score; runs in a thread only when it rescores."""
+        if self._rescores:
+            return await asyncio.to_thread(self.similarity_search_by_vectors_with_score, embeddings, k=k, filters=filters)
+        return self.similarity_search_by_vectors_with_score(embeddings, k=k, filters=filters)
+
+    @staticmethod
+    def _scores(snap: _Snapshot, queries: np.ndarray) -> np.ndarray:
+        """Cosine scores of one (dim,) or many (q, dim) normalized queries against every row."""
+        if snap.matrix.dtype == np.float32:
+            return queries @ snap.matrix.T
+        # NumPy has no BLAS path for float16/int8, so widen before the product, a block at a time
+        scores = np.empty(queries.shape[:-1] + (len(snap.ids),), dtype=np.float32)
+        for start in range(0, len(snap.ids), SCORE_CHUNK_ROWS):
+            rows = slice(start, start + SCORE_CHUNK_ROWS)
+            # The widened block is freed before the next one is made
+            scores[..., rows] = queries @ snap.matrix[rows].astype(np.float32).T
+        scores *= snap.scales
+        return scores
+
+    def _top_k(
+        self, snap: _Snapshot, scores: np.ndarray, k: int, query: np.ndarray
+    ) -> List[Tuple[Document, float]]:
+        """Selects the k best-scoring rows, skipping rows masked out with -inf."""
+        rescore = self._rescores
+        candidates = min(k * self.rescore_oversample if rescore else k, int(np.isfinite(scores).sum()))
+        if candidates == 0:
+            return []
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        if rescore:
+            scores = np.full(len(snap.ids), -np.inf, dtype=np.float32)
+            scores[top] = self._exact_scores(snap, top, query)
+            top = top[np.argsort(-scores[top])][:k]
+        else:
+            top = top[np.argsort(-scores[top])]
+        return [(snap.documents[row], float(scores[row])) for row in top]
+
+    def _exact_scores(self, snap: _Snapshot, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Full-precision scores for a few candidate rows, re-embedded through the embedding model."""
+        vectors = self._embedding.embed_documents([snap.documents[row].page_content for row in rows])
+        return _normalize(np.asarray(vectors, dtype=np.float32)) @ query
+
+    def _filter_mask(self, snap: _Snapshot, filter: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """
+        Builds a boolean row mask for a metadata filter. Supports equality, {"$in": [...]}
+        and a top-level {"$and": [...]} of those clauses.
+        """
+        if not filter:
+            return None
+        clauses = filter["$and"] if "$and" in filter else [filter]
+        mask = np.ones(len(snap.ids), dtype=bool)
+        for clause in clauses:
+            for key, condition in clause.items():
+                column = snap.columns.get(key)
+                if column is None:
+                    column = np.array([doc.metadata.get(key) for doc in snap.documents], dtype=object)
+                if isinstance(condition, dict) and "$in" in condition:
+                    mask &= np.isin(column, list(condition["$in"]))
+                else:
+                    mask &= column == condition
+        return mask
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(
+            embedding,
+            quantization=kwargs.get('quantization', 'none'),
+            rescore_oversample=kwargs.get('rescore_oversample', 4),
+        )
+        if texts:
+            store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -3,6 +3,11 @@ import { useNavigate, useLocation } from 'react-router-dom';
 import './BrowseResources.css';
 import { API_ENDPOINTS } from '../config';
 
+// Clients shown in the picker; searching finds the rest
+const CLIENT_PICKER_LIMIT = 20;
+// Wait for typing to pause before searching
+const SEARCH_DELAY_MS = 300;
+
 const BrowseResources = () => {
   const navigate = useNavigate();
   const location = useLocation();
@@ -24,9 +29,21 @@ const BrowseResources = () => {
 
   useEffect(() => {
     fetchResources();
-    fetchClients();
   }, []);
 
+  // Search clients on the server once typing pauses; the list shows the latest search
+  useEffect(() => {
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const matches = await fetchClients(clientSearchTerm.trim());
+      if (!cancelled) setClients(matches);
+    }, clientSearchTerm ? SEARCH_DELAY_MS : 0);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [clientSearchTerm]);
+
   // Prevent body scroll when modal is open
   useEffect(() => {
     if (showClientModal) {
@@ -67,16 +84,20 @@ const BrowseResources = () => {
     }
   };
 
-  const fetchClients = async () => {
+  const fetchClients = async (search) => {
     try {
-      const response = await fetch('/api/recent-clients');
+      // The first page of summary rows matching the search; typing narrows it down
+      const params = new URLSearchParams({ limit: CLIENT_PICKER_LIMIT });
+      if (search) params.set('search', search);
+      const response = await fetch(`/api/recent-clients?${params}`);
       if (response.ok) {
         const data = await response.json();
-        setClients(data.clients || []);
+        return data.clients || [];
       }
     } catch (error) {
       console.error('Error fetching clients:', error);
     }
+    return [];
   };
 
   const handleLearnMore = (resource) => {
@@ -209,11 +230,6 @@ const BrowseResources = () => {
     }
   };
 
-  const filteredClients = clients.filter(client => {
-    const fullName = `${client.firstName} ${client.lastName}`.toLowerCase();
-    return fullName.includes(clientSearchTerm.toLowerCase());
-  });
-
   // Helper function to create a short description from available data
   const getShortDescription = (resource) => {
     if (resource.services && typeof resource.services === 'string' && resource.services.trim()) {
@@ -484,8 +500,8 @@ const BrowseResources = () => {
               </div>
               
               <div className="client-list">
-                {filteredClients.length > 0 ? (
-                  filteredClients.map((client) => (
+                {clients.length > 0 ? (
+                  clients.map((client) => (
                     <div
                       key={client.id}
                       className="client-item"
@@ -514,7 +530,7 @@ const BrowseResources = () => {
                   </div>
                 )}
                 
-                {clients.length === 0 && (
+                {clients.length === 0 && !clientSearchTerm && (
                   <div className="no-clients">
                     <i className="fas fa-users"></i>
                     <p>No clients found. Add a client to get started.</p>
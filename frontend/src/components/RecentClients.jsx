@@ -1,37 +1,75 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import './RecentClients.css';
 import { API_ENDPOINTS } from '../config';
 
+// Fields the client cards need; the full record is fetched when a profile is opened
+const LIST_FIELDS = [
+  'firstName', 'lastName', 'dateOfBirth', 'phoneNumber', 'email', 'createdAt', 'resourceCount',
+  'presentingConcerns', 'riskAndSafety.safeInCurrentEnvironment', 'riskAndSafety.experiencingViolence',
+  'socialHistory.housingStatus'
+].join(',');
+
+// Server-side filter for each option of the filter dropdown
+const FILTER_PARAMS = {
+  all: {},
+  urgent: { urgent: 'true' },
+  housing: { needs: 'housing' },
+  food: { needs: 'food' },
+  'mental-health': { needs: 'mental health' }
+};
+
+// Wait for typing to pause before searching
+const SEARCH_DELAY_MS = 300;
+
 const RecentClients = () => {
   const [clients, setClients] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [selectedClient, setSelectedClient] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
+  const [search, setSearch] = useState('');
   const [filterStatus, setFilterStatus] = useState('all');
   const [sortBy, setSortBy] = useState('recent');
+  const [stats, setStats] = useState(null);
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
   const [clientToDelete, setClientToDelete] = useState(null);
   const [clientResources, setClientResources] = useState({});
   const [showResourceModal, setShowResourceModal] = useState(false);
   const [selectedResourceClient, setSelectedResourceClient] = useState(null);
 
+  // Only the latest list request may update the list
+  const latestRequest = useRef(0);
+
   useEffect(() => {
+    const timer = setTimeout(() => setSearch(searchTerm.trim()), SEARCH_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  useEffect(() => {
+    // Filtering, search and sort run on the server, over the whole caseload
     fetchClients();
-  }, []);
+    fetchStats();
+  }, [search, filterStatus, sortBy]);
 
-  const fetchClients = async () => {
+  const fetchClients = async (cursor = null) => {
+    const request = ++latestRequest.current;
     try {
-      const response = await fetch(API_ENDPOINTS.RECENT_CLIENTS);
+      const params = new URLSearchParams({ fields: LIST_FIELDS, sort: sortBy, ...FILTER_PARAMS[filterStatus] });
+      if (search) params.set('search', search);
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${API_ENDPOINTS.RECENT_CLIENTS}?${params}`);
       const data = await response.json();
+      if (request !== latestRequest.current) return;
 
       if (response.ok) {
-        setClients(data.clients);
-        // Fetch resources for each client
-        await fetchAllClientResources(data.clients);
+        // Each page continues the previous one in the chosen sort order
+        setClients(prev => cursor ? [...prev, ...data.clients] : data.clients);
+        setNextCursor(data.next_cursor);
       } else {
-        throw new Error(data.error || 'Failed to fetch clients');
+        throw new Error(data.detail || 'Failed to fetch clients');
       }
     } catch (error) {
       console.error('Error fetching clients:', error);
@@ -41,21 +79,46 @@ const RecentClients = () => {
     }
   };
 
-  const fetchAllClientResources = async (clients) => {
-    const resourcesData = {};
-    for (const client of clients) {
-      try {
-        const response = await fetch(`/api/clients/${client.id}/resources`);
-        if (response.ok) {
-          const data = await response.json();
-          resourcesData[client.id] = data.resources || [];
-        }
-      } catch (error) {
-        console.error(`Error fetching resources for client ${client.id}:`, error);
-        resourcesData[client.id] = [];
+  const fetchStats = async () => {
+    try {
+      const params = new URLSearchParams();
+      if (search) params.set('search', search);
+      const response = await fetch(`${API_ENDPOINTS.CLIENT_STATS}?${params}`);
+      if (response.ok) {
+        setStats(await response.json());
       }
+    } catch (error) {
+      console.error('Error fetching client stats:', error);
     }
-    setClientResources(resourcesData);
+  };
+
+  const loadMoreClients = async () => {
+    setLoadingMore(true);
+    await fetchClients(nextCursor);
+    setLoadingMore(false);
+  };
+
+  const openClientProfile = async (client) => {
+    // List rows are summaries; the profile shows the whole record
+    setSelectedClient(client);
+    try {
+      const response = await fetch(API_ENDPOINTS.CLIENT(client.id));
+      const data = await response.json();
+      if (response.ok) {
+        // Unless the profile was closed or another one opened meanwhile
+        setSelectedClient(current => current?.id === client.id ? data.client : current);
+      } else {
+        throw new Error(data.detail || 'Failed to fetch client');
+      }
+    } catch (error) {
+      console.error(`Error fetching client ${client.id}:`, error);
+    }
+  };
+
+  const openClientResources = (client) => {
+    setSelectedResourceClient(client);
+    setShowResourceModal(true);
+    fetchClientResources(client.id);
   };
 
   const fetchClientResources = async (clientId) => {
@@ -112,6 +175,7 @@ const RecentClients = () => {
       if (response.ok) {
         // Remove the client from the local state
         setClients(clients.filter(client => client.id !== clientId));
+        fetchStats();
         setSelectedClient(null);
         setShowDeleteConfirm(false);
         setClientToDelete(null);
@@ -162,34 +226,6 @@ const RecentClients = () => {
     return tags;
   };
 
-  const filteredClients = clients
-    .filter(client => {
-      const searchMatch = 
-        `${client.firstName} ${client.lastName}`.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        client.phoneNumber?.includes(searchTerm) ||
-        client.email?.toLowerCase().includes(searchTerm.toLowerCase());
-
-      if (filterStatus === 'all') return searchMatch;
-      if (filterStatus === 'housing') return searchMatch && client.presentingConcerns?.housingInstability;
-      if (filterStatus === 'food') return searchMatch && client.presentingConcerns?.foodInsecurity;
-      if (filterStatus === 'mental-health') return searchMatch && client.presentingConcerns?.mentalHealth;
-      if (filterStatus === 'urgent') return searchMatch && (
-        client.presentingConcerns?.domesticViolence || 
-        client.riskAndSafety?.experiencingViolence ||
-        !client.riskAndSafety?.safeInCurrentEnvironment
-      );
-      return searchMatch;
-    })
-    .sort((a, b) => {
-      if (sortBy === 'recent') {
-        return new Date(b.createdAt) - new Date(a.createdAt);
-      }
-      if (sortBy === 'name') {
-        return `${a.lastName} ${a.firstName}`.localeCompare(`${b.lastName} ${b.firstName}`);
-      }
-      return 0;
-    });
-
   if (loading) {
     return <div className="loading">Loading clients...</div>;
   }
@@ -203,7 +239,7 @@ const RecentClients = () => {
       <div className="clients-header">
         <div className="header-left">
           <h1>Client Management</h1>
-          <p>{clients.length} total clients</p>
+          <p>{stats ? stats.total : clients.length} total clients</p>
         </div>
         <div className="header-right">
           <Link to="/add-client" className="add-client-button">
@@ -216,37 +252,19 @@ const RecentClients = () => {
       <div className="clients-stats">
         <div className="stat-item">
           <div className="stat-label">Urgent Cases</div>
-          <div className="stat-value">
-            {filteredClients.filter(client => 
-              client.presentingConcerns?.domesticViolence || 
-              client.riskAndSafety?.experiencingViolence ||
-              !client.riskAndSafety?.safeInCurrentEnvironment
-            ).length}
-          </div>
+          <div className="stat-value">{stats?.urgent ?? '-'}</div>
         </div>
         <div className="stat-item">
           <div className="stat-label">Housing Needs</div>
-          <div className="stat-value">
-            {filteredClients.filter(client => 
-              client.presentingConcerns?.housingInstability
-            ).length}
-          </div>
+          <div className="stat-value">{stats?.housing ?? '-'}</div>
         </div>
         <div className="stat-item">
           <div className="stat-label">Food Insecurity</div>
-          <div className="stat-value">
-            {filteredClients.filter(client => 
-              client.presentingConcerns?.foodInsecurity
-            ).length}
-          </div>
+          <div className="stat-value">{stats?.food ?? '-'}</div>
         </div>
         <div className="stat-item">
           <div className="stat-label">Mental Health</div>
-          <div className="stat-value">
-            {filteredClients.filter(client => 
-              client.presentingConcerns?.mentalHealth
-            ).length}
-          </div>
+          <div className="stat-value">{stats?.mental_health ?? '-'}</div>
         </div>
       </div>
 
@@ -279,15 +297,15 @@ const RecentClients = () => {
             onChange={(e) => setSortBy(e.target.value)}
             className="sort-select"
           >
-            <option value="recent">Most Recent</option>
+            <option value="recent">Recently Updated</option>
             <option value="name">Name</option>
           </select>
         </div>
       </div>
       
       <div className="clients-grid">
-        {filteredClients.map((client) => (
-          <div key={client.id} className="client-card" onClick={() => setSelectedClient(client)}>
+        {clients.map((client) => (
+          <div key={client.id} className="client-card" onClick={() => openClientProfile(client)}>
             <div className="client-header">
               <div className="client-name-section">
                 <div className="client-avatar">
@@ -326,24 +344,31 @@ const RecentClients = () => {
             <div className="card-actions">
               <button className="view-details-btn" onClick={(e) => {
                 e.stopPropagation();
-                setSelectedClient(client);
+                openClientProfile(client);
               }}>
                 <i className="fas fa-user"></i>
                 View Profile
               </button>
               <button className="view-resources-btn" onClick={(e) => {
                 e.stopPropagation();
-                setSelectedResourceClient(client);
-                setShowResourceModal(true);
+                openClientResources(client);
               }}>
                 <i className="fas fa-list"></i>
-                Resources ({clientResources[client.id]?.length || 0})
+                Resources ({clientResources[client.id]?.length ?? client.resourceCount ?? 0})
             </button>
             </div>
           </div>
         ))}
       </div>
 
+      {nextCursor && (
+        <div className="load-more">
+          <button className="load-more-btn" onClick={loadMoreClients} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load more clients'}
+          </button>
+        </div>
+      )}
+
       {selectedClient && (
         <div className="client-modal" onClick={() => setSelectedClient(null)}>
           <div className="modal-content" onClick={e => e.stopPropagation()}>
@@ -1,10 +1,18 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import './ResourceMatcher.css';
 
+// Clients shown in the picker; searching finds the rest
+const CLIENT_PICKER_LIMIT = 20;
+// Wait for typing to pause before searching
+const SEARCH_DELAY_MS = 300;
+
 const ResourceMatcher = () => {
   const [clients, setClients] = useState([]);
   const [selectedClient, setSelectedClient] = useState(null);
+  // True until the selected client's full record replaces its summary row
+  const [clientLoading, setClientLoading] = useState(false);
+  const selectedClientId = useRef(null);
   const [resourceType, setResourceType] = useState('housing');
   const [recommendations, setRecommendations] = useState(null);
   const [loading, setLoading] = useState(false);
@@ -16,9 +24,18 @@ const ResourceMatcher = () => {
   const [chatLoading, setChatLoading] = useState(false);
   const navigate = useNavigate();
 
+  // Search clients on the server once typing pauses; the list shows the latest search
   useEffect(() => {
-    fetchClients();
-  }, []);
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const matches = await fetchClients(clientSearchTerm.trim());
+      if (!cancelled) setClients(matches);
+    }, clientSearchTerm ? SEARCH_DELAY_MS : 0);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [clientSearchTerm]);
 
   // Close dropdown when clicking outside
   useEffect(() => {
@@ -34,31 +51,54 @@ const ResourceMatcher = () => {
     };
   }, [showClientDropdown]);
 
-  const fetchClients = async () => {
+  const fetchClients = async (search) => {
     try {
-      const response = await fetch('/api/recent-clients');
+      // The first page of summary rows matching the search; typing narrows it down
+      const params = new URLSearchParams({ limit: CLIENT_PICKER_LIMIT });
+      if (search) params.set('search', search);
+      const response = await fetch(`/api/recent-clients?${params}`);
       if (response.ok) {
-      const data = await response.json();
-      setClients(data.clients || []);
+        const data = await response.json();
+        return data.clients || [];
       }
     } catch (error) {
       console.error('Error fetching clients:', error);
     }
+    return [];
   };
 
-  const handleClientSelect = (client) => {
+  const handleClientSelect = async (client) => {
+    selectedClientId.current = client.id;
     setSelectedClient(client);
+    setClientLoading(true);
     setRecommendations(null);
     setError(null);
     setShowClientDropdown(false);
     setClientSearchTerm('');
+    // Matching uses the whole record (notes, needs, intake sections), not the summary row,
+    // so it stays disabled until the record has loaded
+    let record = null;
+    try {
+      const response = await fetch(`/api/clients/${client.id}`);
+      if (response.ok) {
+        const data = await response.json();
+        record = data.client;
+      }
+    } catch (error) {
+      console.error(`Error fetching client ${client.id}:`, error);
+    }
+    // Another client was picked while this one loaded
+    if (selectedClientId.current !== client.id) return;
+    setClientLoading(false);
+    if (record) {
+      setSelectedClient(record);
+    } else {
+      selectedClientId.current = null;
+      setSelectedClient(null);
+      setError('Could not load the client record. Please select the client again.');
+    }
   };
 
-  const filteredClients = clients.filter(client => {
-    const fullName = `${client.firstName} ${client.lastName}`.toLowerCase();
-    return fullName.includes(clientSearchTerm.toLowerCase());
-  });
-
   const handleResourceTypeChange = (type) => {
     setResourceType(type);
     setRecommendations(null);
@@ -70,10 +110,12 @@ const ResourceMatcher = () => {
       setError('Please select a client first');
       return;
     }
+    if (clientLoading) return;
     setLoading(true);
     setError(null);
     try {
-      const response = await fetch('/api/match-resources', {
+      // Streamed as NDJSON: resources arrive as soon as retrieval finishes, then the rationale fills in
+      const response = await fetch('/api/match-resources/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -83,12 +125,41 @@ const ResourceMatcher = () => {
           resource_type: resourceType,
         }),
       });
-      if (response.ok) {
-      const data = await response.json();
-        setRecommendations(data.recommendations); // Extract the recommendations object
-      } else {
+      if (!response.ok) {
         const errorData = await response.json();
         setError(errorData.detail || 'Failed to match resources');
+        return;
+      }
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const event = JSON.parse(line);
+          if (event.event === 'retrieved') {
+            setRecommendations({
+              recommendation_reason: '',
+              retrieved_recommendations: event.retrieved_recommendations,
+              client_question: event.client_question,
+            });
+            setLoading(false);
+          } else if (event.event === 'token') {
+            setRecommendations(prev => ({
+              ...prev,
+              recommendation_reason: (prev?.recommendation_reason || '') + event.text,
+            }));
+          } else if (event.event === 'done') {
+            setRecommendations(event.recommendations);
+          } else if (event.event === 'error') {
+            setError(event.detail || 'Failed to match resources');
+          }
+        }
       }
     } catch (error) {
       console.error('Error matching resources:', error);
@@ -471,8 +542,8 @@ const ResourceMatcher = () => {
                     </div>
                     
                     <div className="client-dropdown-list">
-                      {filteredClients.length > 0 ? (
-                        filteredClients.map((client) => (
+                      {clients.length > 0 ? (
+                        clients.map((client) => (
                           <div
                             key={client.id}
                             className={`client-dropdown-item ${selectedClient?.id === client.id ? 'selected' : ''}`}
@@ -498,7 +569,7 @@ const ResourceMatcher = () => {
                 )}
                     </div>
                     
-                    {clients.length === 0 && (
+                    {clients.length === 0 && !clientSearchTerm && (
                       <div className="no-clients">
                         <i className="fas fa-users"></i>
                         <p>No clients found. Add a client to get started.</p>
@@ -539,13 +610,18 @@ const ResourceMatcher = () => {
             <button
               className="match-btn"
               onClick={handleMatchResources}
-              disabled={!selectedClient || loading}
+              disabled={!selectedClient || clientLoading || loading}
             >
               {loading ? (
                 <>
                   <i className="fas fa-spinner fa-spin"></i>
                   Matching...
                 </>
+              ) : clientLoading ? (
+                <>
+                  <i className="fas fa-spinner fa-spin"></i>
+                  Loading client...
+                </>
               ) : (
                 <>
                   <i className="fas fa-magic"></i>
@@ -113,7 +113,8 @@ const VoiceAssistant = ({ onClose }) => {
           audioArray[i] = audioData.charCodeAt(i);
         }
         
-        const audioBlob = new Blob([audioArray], { type: 'audio/mpeg' });
+        const audioType = data.format === 'wav' ? 'audio/wav' : 'audio/mpeg';
+        const audioBlob = new Blob([audioArray], { type: audioType });
         const audioUrl = URL.createObjectURL(audioBlob);
         
         // Create and play audio
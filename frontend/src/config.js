@@ -15,9 +15,12 @@ export const API_BASE_URL = getBackendURL();
 export const API_ENDPOINTS = {
   ADD_CLIENT: `${API_BASE_URL}/api/add-client`,
   RECENT_CLIENTS: `${API_BASE_URL}/api/recent-clients`,
+  CLIENT_STATS: `${API_BASE_URL}/api/recent-clients/stats`,
+  CLIENT: (clientId) => `${API_BASE_URL}/api/clients/${clientId}`,
   DELETE_CLIENT: (clientId) => `${API_BASE_URL}/api/clients/${clientId}`,
   GET_TOKEN: `${API_BASE_URL}/api/get`,
   GET_RESOURCES: `${API_BASE_URL}/api/resources`,
   SEARCH_RESOURCES: `${API_BASE_URL}/api/search-resources`,
-  MATCH_RESOURCES: `${API_BASE_URL}/api/match-resources`
+  MATCH_RESOURCES: `${API_BASE_URL}/api/match-resources`,
+  MATCH_RESOURCES_STREAM: `${API_BASE_URL}/api/match-resources/stream`
 }; 
\ No newline at end of file